@@ -0,0 +1,5 @@
+#!/usr/bin/python3
+"""
+API package
+HTTP access to models.storage
+"""
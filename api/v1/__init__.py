@@ -0,0 +1,5 @@
+#!/usr/bin/python3
+"""
+v1 package
+First version of the REST API
+"""
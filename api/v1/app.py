@@ -0,0 +1,241 @@
+#!/usr/bin/python3
+"""
+App module
+HTTP/1.1 JSON server of the v1 API (stdlib only)
+
+Run it with: python3 -m api.v1.app
+Connections are kept alive between requests, and every request runs in
+its own thread.
+"""
+
+import json
+import os
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+from api.v1 import views
+from api.v1.views import ApiError, Stream, encode
+from models.engine.cache import CacheEntry
+
+PREFIX = "/api/v1"
+MAX_BODY = 16 * 1024 * 1024
+STREAM_BATCH = 256
+
+
+def route(method, parts):
+    """Return (view, arguments) for a request, or raise ApiError"""
+    if parts == ["status"] and method == "GET":
+        return views.status, ()
+    if parts == ["stats"] and method == "GET":
+        return views.stats, ()
+    if len(parts) == 1:
+        views.resource(parts[0])
+        if method == "GET":
+            return views.list_objects, tuple(parts)
+        if method == "POST":
+            return views.create, tuple(parts)
+    elif len(parts) == 2 and parts[1] == "bulk":
+        views.resource(parts[0])
+        if method in ("POST", "PUT", "DELETE"):
+            return views.bulk, parts[:1]
+    elif len(parts) == 2:
+        views.resource(parts[0])
+        handler = {"GET": views.show, "PUT": views.update,
+                   "DELETE": views.destroy}.get(method)
+        if handler is not None:
+            return handler, tuple(parts)
+    elif len(parts) == 3:
+        views.resource(parts[0])
+        if method == "GET":
+            return views.related, tuple(parts)
+    else:
+        raise ApiError(404, "Not found")
+    raise ApiError(405, "Method not allowed")
+
+
+class Request:
+    """The parts of an HTTP request the views use"""
+
+    def __init__(self, method, path, params, body):
+        """Initialize a request"""
+        self.method = method
+        self.path = path
+        self.params = params
+        self.body = body
+
+    def json(self):
+        """Return the decoded JSON body"""
+        try:
+            return json.loads(self.body or b"null")
+        except ValueError:
+            raise ApiError(400, "Not a JSON")
+
+    def url(self, params):
+        """Return the path of this request with other query parameters"""
+        return f"{self.path}?{urlencode(params)}"
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """Answers the API requests of one connection"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "HBNB/1.0"
+    disable_nagle_algorithm = True
+    quiet = True
+
+    def do_GET(self):
+        """Handle GET"""
+        self.__handle()
+
+    def do_POST(self):
+        """Handle POST"""
+        self.__handle()
+
+    def do_PUT(self):
+        """Handle PUT"""
+        self.__handle()
+
+    def do_DELETE(self):
+        """Handle DELETE"""
+        self.__handle()
+
+    def __handle(self):
+        """Route the request and send the view's response"""
+        url = urlsplit(self.path)
+        try:
+            body = self.__body()
+            if url.path != PREFIX and not url.path.startswith(PREFIX + "/"):
+                raise ApiError(404, "Not found")
+            parts = [p for p in url.path[len(PREFIX):].split("/") if p]
+            view, args = route(self.command, parts)
+            request = Request(self.command, url.path,
+                              dict(parse_qsl(url.query)), body)
+            status, result = view(request, *args)
+        except ApiError as error:
+            status, result = error.status, {"error": str(error)}
+        except ValueError as error:
+            status, result = 400, {"error": str(error)}
+        except Exception as error:
+            self.log_error("%s: %s", error.__class__.__name__, error)
+            status, result = 500, {"error": "Internal server error"}
+        if isinstance(result, Stream):
+            self.__stream(status, result)
+        elif isinstance(result, CacheEntry):
+            self.__send_entry(status, result)
+        else:
+            self.__send(status, result)
+
+    def __body(self):
+        """Read the request body"""
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            raise ApiError(400, "Invalid Content-Length")
+        if length > MAX_BODY:
+            self.close_connection = True
+            raise ApiError(413, "Request body too large")
+        return self.rfile.read(length) if length else b""
+
+    def __send(self, status, result):
+        """Send a JSON response with a Content-Length"""
+        payload = encode(result)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def __send_entry(self, status, entry):
+        """Send a cached JSON response with its ETag, or 304 Not
+        Modified if the client already has it
+        """
+        matches = self.headers.get("If-None-Match", "")
+        if entry.etag in [tag.strip() for tag in matches.split(",")]:
+            self.send_response(304)
+            self.send_header("ETag", entry.etag)
+            self.end_headers()
+            return
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(entry.value)))
+        self.send_header("ETag", entry.etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(entry.value)
+
+    def __stream(self, status, stream):
+        """Send one JSON document per line, in chunks"""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        lines = []
+        try:
+            for value in stream.values:
+                lines.append(json.dumps(value, separators=(",", ":")) +
+                             "\n")
+                if len(lines) == STREAM_BATCH:
+                    self.__chunk("".join(lines).encode("utf-8"))
+                    lines = []
+        except Exception as error:
+            self.log_error("%s: %s", error.__class__.__name__, error)
+            self.close_connection = True
+            return
+        if lines:
+            self.__chunk("".join(lines).encode("utf-8"))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def __chunk(self, data):
+        """Write one chunk of a chunked response"""
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+
+    def send_error(self, code, message=None, explain=None):
+        """Answer errors detected by the HTTP parser in JSON too"""
+        short, _ = self.responses.get(code, ("Error", ""))
+        self.log_error("code %d, message %s", code, message or short)
+        self.close_connection = True
+        self.send_response(code, message)
+        self.send_header("Connection", "close")
+        payload = json.dumps({"error": message or short}).encode("utf-8")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if getattr(self, "command", None) != "HEAD":
+            self.wfile.write(payload)
+
+    def log_request(self, code="-", size="-"):
+        """Log requests only when HBNB_API_LOG is set"""
+        if not self.quiet:
+            super().log_request(code, size)
+
+
+class ApiServer(ThreadingHTTPServer):
+    """Threaded HTTP server of the API"""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def main():
+    """Serve the API until interrupted"""
+    host = os.getenv("HBNB_API_HOST", "0.0.0.0")
+    port = int(os.getenv("HBNB_API_PORT", "5000"))
+    views.saver.interval = float(os.getenv("HBNB_API_SAVE_INTERVAL",
+                                           "0.5"))
+    ApiHandler.quiet = not os.getenv("HBNB_API_LOG")
+    server = ApiServer((host, port), ApiHandler)
+    print(f"serving on http://{host}:{port}{PREFIX}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        views.saver.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+#!/usr/bin/python3
+"""
+Views module
+Endpoints of the v1 REST API over models.storage
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from models import storage
+from models.base_model import BaseModel
+from models.user import User
+from models.state import State
+from models.city import City
+from models.amenity import Amenity
+from models.place import Place
+from models.review import Review
+from models.engine.cache import ResultCache
+from models.engine.indexes import to_number
+from models.engine.query import Query, QueryError
+
+RESOURCES = {
+    "base_models": BaseModel,
+    "users": User,
+    "states": State,
+    "cities": City,
+    "amenities": Amenity,
+    "places": Place,
+    "reviews": Review,
+}
+RESERVED = ("limit", "offset", "order_by", "desc", "where", "stream",
+            "cascade")
+PROTECTED = ("id", "created_at", "updated_at", "__class__")
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+class ApiError(Exception):
+    """An error answered with an HTTP status and a JSON message"""
+
+    def __init__(self, status, message):
+        """Initialize an error response"""
+        super().__init__(message)
+        self.status = status
+
+
+class Stream:
+    """Response body sent with chunked encoding: an iterable of
+    JSON-ready values, one per line (NDJSON)
+    """
+
+    def __init__(self, values):
+        """Initialize a stream of values"""
+        self.values = values
+
+
+class Saver:
+    """Writes storage to disk at most every interval seconds after
+    changes, instead of once per request
+    """
+
+    def __init__(self, interval=0.0):
+        """Initialize a saver; interval 0 saves on every change"""
+        self.interval = interval
+        self.__dirty = threading.Event()
+        self.__stop = threading.Event()
+        self.__thread = None
+
+    def changed(self):
+        """Record that storage has unsaved changes"""
+        if not self.interval:
+            storage.save()
+            return
+        self.__dirty.set()
+        if self.__thread is None:
+            self.__thread = threading.Thread(target=self.__run, daemon=True)
+            self.__thread.start()
+
+    def __run(self):
+        """Save pending changes every interval until stopped"""
+        while not self.__stop.wait(self.interval):
+            self.flush()
+
+    def flush(self):
+        """Save now if there are unsaved changes"""
+        if self.__dirty.is_set():
+            self.__dirty.clear()
+            storage.save()
+
+    def close(self):
+        """Stop the background thread and save pending changes"""
+        self.__stop.set()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+        self.flush()
+
+
+saver = Saver()
+_cache = None
+
+
+def encode(value):
+    """Return value as compact JSON bytes"""
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def response_cache():
+    """Return the ResultCache of the responses built from storage"""
+    global _cache
+    if _cache is None or _cache.storage is not storage:
+        if _cache is not None:
+            _cache.close()
+        _cache = ResultCache(storage,
+                             int(os.getenv("HBNB_API_CACHE_SIZE", "1024")))
+    return _cache
+
+
+def cached(request, compute, tags):
+    """Return the cache entry of the JSON response to request, built by
+    compute() unless cached; tags are the class names and object keys
+    it depends on
+    """
+    key = request.url(sorted(request.params.items()))
+    return response_cache().fetch(key, lambda: encode(compute()), tags)
+
+
+def resource(name):
+    """Return the model class served under name"""
+    cls = RESOURCES.get(name)
+    if cls is None:
+        raise ApiError(404, "Not found")
+    return cls
+
+
+def find(cls, obj_id):
+    """Return the cls object with id obj_id"""
+    obj = storage.get(f"{cls.__name__}.{obj_id}")
+    if obj is None:
+        raise ApiError(404, "Not found")
+    return obj
+
+
+def attributes(cls, body):
+    """Return the settable attributes of a JSON object body for cls
+
+    Private names and the methods and properties of cls (like to_dict
+    or a relation such as reviews) cannot be set.
+    """
+    if not isinstance(body, dict):
+        raise ApiError(400, "Not a JSON object")
+    attrs = {k: v for k, v in body.items() if k not in PROTECTED}
+    for key in attrs:
+        member = getattr(cls, key, None)
+        if key.startswith("_") or callable(member) or \
+                isinstance(member, property):
+            raise ApiError(400, f"Attribute {key} can't be set")
+    return attrs
+
+
+def integer(params, name, default, maximum=None):
+    """Return the non-negative integer query parameter name"""
+    value = params.get(name)
+    if value is None:
+        return default
+    number = to_number(value)
+    if not isinstance(number, int) or number < 0:
+        raise ApiError(400, f"{name} must be a non-negative integer")
+    return min(number, maximum) if maximum is not None else number
+
+
+def status(request):
+    """GET /status"""
+    return 200, {"status": "OK"}
+
+
+def stats(request):
+    """GET /stats: number of objects per resource"""
+    names = {cls.__name__: name for name, cls in RESOURCES.items()}
+
+    def compute():
+        """Count the objects of each resource"""
+        counts = dict.fromkeys(RESOURCES, 0)
+        with storage.snapshot() as objects:
+            for key in objects:
+                name = names.get(key.split(".", 1)[0])
+                if name is not None:
+                    counts[name] += 1
+        return counts
+    return 200, cached(request, compute, names)
+
+
+def build_query(cls, params):
+    """Return the Query selecting cls objects for query parameters:
+    attr=value equality filters, where=<conditions>, order_by and desc
+    """
+    query = Query(cls.__name__)
+    if params.get("where"):
+        try:
+            query = Query.parse(f"{cls.__name__} where {params['where']}")
+        except QueryError as error:
+            raise ApiError(400, str(error))
+        if query.order_by or query.limit is not None:
+            raise ApiError(400, "use order_by and limit parameters")
+    for attr, value in params.items():
+        if attr not in RESERVED:
+            number = to_number(value)
+            query.conditions.append(
+                (attr, "==", value if number is None else number))
+    if params.get("order_by"):
+        query.order_by = params["order_by"]
+        query.descending = params.get("desc", "") not in ("", "0", "false")
+    return query
+
+
+def list_objects(request, name):
+    """GET /<resource>: one page of objects, or all of them as a stream
+    with stream=1
+    """
+    cls = resource(name)
+    query = build_query(cls, request.params)
+    if request.params.get("stream") not in (None, "", "0", "false"):
+        return 200, Stream(obj.to_dict() for obj in
+                           storage.query(str(query)))
+    limit = integer(request.params, "limit", DEFAULT_LIMIT, MAX_LIMIT)
+    offset = integer(request.params, "offset", 0)
+    query.limit = offset + limit + 1
+
+    def compute():
+        """Build the page"""
+        results = storage.query(str(query))
+        page = {
+            "results": [obj.to_dict() for obj in
+                        results[offset:offset + limit]],
+            "offset": offset,
+            "limit": limit,
+            "next": None,
+        }
+        if len(results) > offset + limit:
+            params = dict(request.params, offset=str(offset + limit),
+                          limit=str(limit))
+            page["next"] = request.url(params)
+        return page
+    return 200, cached(request, compute, (cls.__name__,))
+
+
+def create(request, name):
+    """POST /<resource>: create an object from a JSON body"""
+    cls = resource(name)
+    obj = cls(**attributes(cls, request.json()))
+    saver.changed()
+    return 201, obj.to_dict()
+
+
+def show(request, name, obj_id):
+    """GET /<resource>/<id>"""
+    cls = resource(name)
+    return 200, cached(request, lambda: find(cls, obj_id).to_dict(),
+                       (f"{cls.__name__}.{obj_id}",))
+
+
+def update(request, name, obj_id):
+    """PUT /<resource>/<id>: set the attributes of a JSON body"""
+    cls = resource(name)
+    obj = find(cls, obj_id)
+    for attr, value in attributes(cls, request.json()).items():
+        setattr(obj, attr, value)
+    obj.updated_at = datetime.now()
+    storage.new(obj)
+    saver.changed()
+    return 200, obj.to_dict()
+
+
+def destroy(request, name, obj_id):
+    """DELETE /<resource>/<id>, with cascade=1 to remove dependents"""
+    obj = find(resource(name), obj_id)
+    cascade = request.params.get("cascade") not in (None, "", "0", "false")
+    storage.delete(obj, cascade=cascade)
+    saver.changed()
+    return 200, {}
+
+
+def related(request, name, obj_id, relation):
+    """GET /<resource>/<id>/<relation>, e.g. /states/<id>/cities"""
+    cls = resource(name)
+    target = RESOURCES.get(relation)
+    if target is None:
+        raise ApiError(404, "Not found")
+
+    def compute():
+        """List the related objects"""
+        try:
+            objs = storage.related(find(cls, obj_id), relation)
+        except AttributeError:
+            raise ApiError(404, "Not found")
+        return [o.to_dict() for o in objs]
+    return 200, cached(request, compute,
+                       (f"{cls.__name__}.{obj_id}", target.__name__))
+
+
+def bulk(request, name):
+    """POST, PUT or DELETE /<resource>/bulk
+
+    POST creates a list of objects, PUT updates a list of objects
+    (each with its id) and DELETE removes {"ids": [...]}; storage is
+    saved once for the whole batch.
+    """
+    cls = resource(name)
+    body = request.json()
+    if request.method == "DELETE":
+        ids = body.get("ids") if isinstance(body, dict) else None
+        if not isinstance(ids, list):
+            raise ApiError(400, "Expected {\"ids\": [...]}")
+        removed = 0
+        for obj_id in ids:
+            obj = storage.get(f"{cls.__name__}.{obj_id}")
+            if obj is not None:
+                removed += len(storage.delete(obj))
+        saver.changed()
+        return 200, {"removed": removed}
+    if not isinstance(body, list):
+        raise ApiError(400, "Expected a JSON list")
+    # Every item is checked before any object is created or changed,
+    # so a rejected batch leaves storage untouched
+    if request.method == "POST":
+        batch = [attributes(cls, item) for item in body]
+        objs = [cls(**attrs) for attrs in batch]
+        saver.changed()
+        return 201, [obj.to_dict() for obj in objs]
+    batch = [(find(cls, item.get("id") if isinstance(item, dict) else None),
+              attributes(cls, item)) for item in body]
+    for obj, attrs in batch:
+        for attr, value in attrs.items():
+            setattr(obj, attr, value)
+        obj.updated_at = datetime.now()
+        storage.new(obj)
+    saver.changed()
+    return 200, [obj.to_dict() for obj, _ in batch]
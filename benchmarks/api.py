@@ -0,0 +1,141 @@
+#!/usr/bin/python3
+"""
+API benchmark
+Load-tests the v1 REST API with keep-alive client threads and reports
+requests per second and latency percentiles
+Usage: python3 -m benchmarks.api [objects] [threads] [seconds] [url]
+Without url, a server is started in this process over a fresh store.
+"""
+
+import http.client
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+from benchmarks.fixtures import make_objects
+
+SCENARIOS = (
+    ("show", 0.6),
+    ("list", 0.25),
+    ("filter", 0.1),
+    ("create", 0.05),
+)
+
+
+def percentile(sorted_values, fraction):
+    """Return the value below which fraction of sorted_values fall"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def start_server(count):
+    """Serve a store of count objects in this process; return its url"""
+    import models
+    from api.v1 import views
+    from api.v1.app import ApiHandler, ApiServer
+    from models.engine.file_storage import FileStorage
+
+    directory = tempfile.mkdtemp()
+    storage = FileStorage()
+    storage._FileStorage__file_path = os.path.join(directory, "file.json")
+    storage._FileStorage__objects = {
+        f"{o.__class__.__name__}.{o.id}": o for o in make_objects(count)}
+    models.storage = views.storage = storage
+    views.saver.interval = 0.5
+    server = ApiServer(("127.0.0.1", 0), ApiHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}/api/v1"
+
+
+def worker(url, ids, deadline, latencies, errors):
+    """Send requests over one kept-alive connection until deadline"""
+    parts = urlsplit(url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port)
+    names = [name for name, _ in SCENARIOS]
+    weights = [weight for _, weight in SCENARIOS]
+    rng = random.Random()
+    while time.perf_counter() < deadline:
+        scenario = rng.choices(names, weights)[0]
+        body = None
+        method = "GET"
+        if scenario == "show":
+            path = f"/places/{rng.choice(ids)}"
+        elif scenario == "list":
+            path = f"/places?limit=20&offset={rng.randrange(0, 200)}"
+        elif scenario == "filter":
+            path = f"/places?where=price_by_night<{rng.randrange(50, 300)}" \
+                   "&order_by=price_by_night&limit=10"
+        else:
+            method, path = "POST", "/reviews"
+            body = json.dumps({"text": "benchmark"})
+        start = time.perf_counter()
+        try:
+            conn.request(method, parts.path + path, body,
+                         {"Content-Type": "application/json"})
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors[scenario] = errors.get(scenario, 0) + 1
+        except (OSError, http.client.HTTPException):
+            errors[scenario] = errors.get(scenario, 0) + 1
+            conn.close()
+            conn = http.client.HTTPConnection(parts.hostname, parts.port)
+            continue
+        latencies.setdefault(scenario, []).append(
+            time.perf_counter() - start)
+    conn.close()
+
+
+def main(count, threads, seconds, url=None):
+    """Print throughput and p50/p99 latency per scenario"""
+    if url is None:
+        url = start_server(count)
+    parts = urlsplit(url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port)
+    conn.request("GET", parts.path + "/places?limit=1000")
+    ids = [p["id"] for p in json.loads(conn.getresponse().read())["results"]]
+    conn.close()
+    if not ids:
+        sys.exit("the store has no places")
+    deadline = time.perf_counter() + seconds
+    results = [({}, {}) for _ in range(threads)]
+    pool = [threading.Thread(target=worker,
+                             args=(url, ids, deadline) + result)
+            for result in results]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    print(f"{threads} keep-alive connections for {elapsed:.1f}s "
+          f"against {url}")
+    print(f"{'scenario':<8} {'requests':>9} {'req/s':>9} {'p50 ms':>8} "
+          f"{'p99 ms':>8} {'errors':>7}")
+    every = []
+    for name, _ in SCENARIOS + (("all", 0),):
+        if name == "all":
+            samples = sorted(every)
+            failed = sum(sum(e.values()) for _, e in results)
+        else:
+            samples = sorted(s for lat, _ in results
+                             for s in lat.get(name, ()))
+            every.extend(samples)
+            failed = sum(e.get(name, 0) for _, e in results)
+        print(f"{name:<8} {len(samples):>9} {len(samples) / elapsed:>9.0f} "
+              f"{percentile(samples, 0.5) * 1000:>8.2f} "
+              f"{percentile(samples, 0.99) * 1000:>8.2f} {failed:>7}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 8,
+         float(sys.argv[3]) if len(sys.argv) > 3 else 5,
+         sys.argv[4] if len(sys.argv) > 4 else None)
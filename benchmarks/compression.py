@@ -0,0 +1,56 @@
+#!/usr/bin/python3
+"""
+Compression benchmark
+Compares file size and save/reload time of each storage codec
+Usage: python3 -m benchmarks.compression [number_of_objects]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.fixtures import make_objects
+from models.engine.file_storage import FileStorage
+
+
+def measure(objs, directory, codec):
+    """Return (size, save seconds, reload seconds) for one codec"""
+    path = os.path.join(directory, "bench.json")
+    storage = FileStorage()
+    storage._FileStorage__objects = {}
+    storage._FileStorage__file_path = path
+    storage._FileStorage__compression = codec or "none"
+    for obj in objs:
+        storage.new(obj)
+
+    start = time.perf_counter()
+    storage.save()
+    save_time = time.perf_counter() - start
+    size = os.path.getsize(path)
+
+    storage._FileStorage__objects = {}
+    start = time.perf_counter()
+    storage.reload()
+    reload_time = time.perf_counter() - start
+    os.remove(path)
+    return size, save_time, reload_time
+
+
+def main(count):
+    """Print the size/CPU trade-off of every codec"""
+    objs = make_objects(count)
+    print(f"{count} objects")
+    print(f"{'codec':<6} {'bytes':>12} {'ratio':>6} "
+          f"{'save s':>8} {'reload s':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        plain = None
+        for codec in (None, "gzip", "zlib", "lzma"):
+            size, save_time, reload_time = measure(objs, directory, codec)
+            plain = plain or size
+            print(f"{codec or 'none':<6} {size:>12} {plain / size:>6.1f} "
+                  f"{save_time:>8.3f} {reload_time:>9.3f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,368 @@
+#!/usr/bin/python3
+"""
+Dataset generator
+Writes large, referentially consistent stores for load testing
+Usage: python3 -m benchmarks.dataset output.json [--objects N]
+           [--skew S] [--seed N] [--workers N] [--ids uuid4|ulid]
+           [--compression gzip|zlib|lzma|none]
+
+States hold Cities, Places belong to a City and a User and list
+Amenities, and Reviews are written by Users about Places. Cities,
+owners, reviewers and amenities are drawn from Zipf distributions
+(exponent --skew), so some are far more popular than others, and the
+number of reviews per place is heavy-tailed.
+
+Records are serialized straight into the storage file format, without
+building model objects. Every id is derived from (seed, class, index),
+so any shard can refer to any object and the output only depends on
+the seed and the counts, not on the number of worker processes. With
+gzip or lzma each worker also compresses its own shards.
+"""
+
+import argparse
+import bisect
+import gzip
+import hashlib
+import json
+import lzma
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import accumulate
+
+from models.engine import ids
+from models.engine.compression import codec_for, open_compressed
+
+SHARD_SIZE = 20000
+START = datetime(2015, 1, 1)
+END = datetime(2025, 1, 1)
+REVIEWS_TAIL = 1.5
+UUID_MASK = ~(0xf << 76 | 0x3 << 62)
+UUID4_BITS = 0x4 << 76 | 0x2 << 62
+MASK_64 = (1 << 64) - 1
+MASK_32 = (1 << 32) - 1
+ENCODER = json.JSONEncoder(separators=(",", ":"))
+STATES = (
+    "Kigali", "Northern", "Southern", "Eastern", "Western", "California",
+    "Arizona", "Texas", "Nevada", "Oregon", "Louisiana", "Illinois",
+    "New York", "Florida", "Washington", "Colorado", "Utah", "Georgia",
+)
+FIRST_NAMES = ("Ada", "Alan", "Grace", "Linus", "Margaret", "Dennis",
+               "Barbara", "Ken", "Frances", "John", "Radia", "Guido")
+LAST_NAMES = ("Lovelace", "Turing", "Hopper", "Torvalds", "Hamilton",
+              "Ritchie", "Liskov", "Thompson", "Allen", "Doe", "Perlman")
+AMENITIES = ("WiFi", "TV", "Kitchen", "Washer", "Dryer", "Heating",
+             "Air conditioning", "Iron", "Hair dryer", "Pool", "Hot tub",
+             "Free parking", "Gym", "Breakfast", "Fireplace", "Oven",
+             "Workspace", "Crib", "Pet friendly", "Smoke alarm",
+             "Balcony", "Garden", "Elevator", "Radio")
+WORDS = ("bright", "quiet", "cozy", "spacious", "central", "modern",
+         "charming", "sunny", "renovated", "private", "historic",
+         "close to the station", "near the park", "with a view")
+REVIEWS = ("Great host, would stay again.", "Clean and quiet.",
+           "Exactly as described.", "A bit noisy at night.",
+           "Perfect location!", "Highly recommended!",
+           "The bed was comfortable and the kitchen well equipped.")
+
+
+class Plan:
+    """How many objects of each class a dataset holds"""
+
+    def __init__(self, objects, skew=1.1, seed=0, id_scheme="uuid4"):
+        """Split about objects objects between the classes"""
+        self.seed = seed
+        self.skew = skew
+        self.id_scheme = id_scheme
+        self.amenities = len(AMENITIES)
+        self.states = max(1, min(len(STATES) * 10, objects // 20000))
+        self.cities = max(self.states, objects // 500)
+        self.users = max(1, objects // 5)
+        self.places = max(1, objects // 4)
+        rest = objects - (self.amenities + self.states + self.cities +
+                          self.users + self.places)
+        self.reviews_per_place = max(0.0, rest / self.places)
+        self.__ids = {}
+
+    def ref(self, cls_name, index):
+        """Return the id of the index-th cls_name object, which may be
+        written by another shard
+        """
+        key = (cls_name, index)
+        obj_id = self.__ids.get(key)
+        if obj_id is None:
+            obj_id = self.__ids[key] = make_id(self, cls_name, index)
+        return obj_id
+
+    def __getstate__(self):
+        """Leave the id cache out of the copies sent to workers"""
+        state = self.__dict__.copy()
+        state["_Plan__ids"] = {}
+        return state
+
+
+def entity_hash(plan, cls_name, index):
+    """Return the 128-bit hash an object's id and creation time come
+    from
+    """
+    return int.from_bytes(hashlib.blake2b(
+        f"{plan.seed}:{cls_name}:{index}".encode(), digest_size=16).digest(),
+        "big")
+
+
+def make_id(plan, cls_name, index, created_at=None):
+    """Return the id of the index-th cls_name object of plan, created at
+    created_at (by default, at the time created() returns)
+    """
+    value = entity_hash(plan, cls_name, index)
+    if plan.id_scheme == "ulid":
+        if created_at is None:
+            created_at = created(plan, cls_name, index)
+        ms = int(created_at.timestamp() * 1000)
+        return ids.encode((ms << 80) | (value >> 48))
+    h = f"{value & UUID_MASK | UUID4_BITS:032x}"
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def created(plan, cls_name, index):
+    """Return the creation time of the index-th cls_name object"""
+    fraction = (entity_hash(plan, cls_name, index) & MASK_64) / 2 ** 64
+    return START + (END - START) * fraction
+
+
+def zipf_table(count, skew):
+    """Return the cumulative Zipf weights of count ranks"""
+    return list(accumulate(1.0 / (rank ** skew)
+                           for rank in range(1, count + 1)))
+
+
+def draw(rng, table):
+    """Return a rank drawn from a cumulative weights table"""
+    return min(bisect.bisect(table, rng.random() * table[-1]),
+               len(table) - 1)
+
+
+def record(cls_name, obj_id, created_at, **attributes):
+    """Return the '"<key>":{...}' text of one serialized object"""
+    stamp = created_at.isoformat()
+    data = {"id": obj_id, "created_at": stamp, "updated_at": stamp}
+    data.update(attributes)
+    data["__class__"] = cls_name
+    return f'"{cls_name}.{obj_id}":' + ENCODER.encode(data)
+
+
+def city_center(plan, index):
+    """Return the (latitude, longitude) of the index-th City"""
+    value = entity_hash(plan, "City", index) >> 64
+    return (-60 + 120 * (value >> 32) / 2 ** 32,
+            -180 + 360 * (value & MASK_32) / 2 ** 32)
+
+
+def places_shard(plan, start, stop):
+    """Yield the records of places start..stop and of their reviews"""
+    cities = zipf_table(plan.cities, plan.skew)
+    users = zipf_table(plan.users, plan.skew)
+    amenities = zipf_table(plan.amenities, plan.skew)
+    centers = {}
+    mean = plan.reviews_per_place
+    scale = mean * (REVIEWS_TAIL - 1) / REVIEWS_TAIL
+    rng = random.Random(f"{plan.seed}:Place:{start}")
+    for i in range(start, stop):
+        when = created(plan, "Place", i)
+        place_id = make_id(plan, "Place", i, when)
+        city = draw(rng, cities)
+        if city not in centers:
+            centers[city] = city_center(plan, city)
+        latitude, longitude = centers[city]
+        rooms = 1 + int(rng.paretovariate(2.5)) % 6
+        listed = sorted({draw(rng, amenities)
+                         for _ in range(rng.randint(0, 8))})
+        yield record(
+            "Place", place_id, when,
+            city_id=plan.ref("City", city),
+            user_id=plan.ref("User", draw(rng, users)),
+            name=f"{rng.choice(WORDS).capitalize()} place {i}",
+            description=" and ".join(rng.sample(WORDS, 2)).capitalize(),
+            number_rooms=rooms,
+            number_bathrooms=max(1, rooms - rng.randint(0, 2)),
+            max_guest=rooms * rng.randint(1, 3),
+            price_by_night=int(20 + rng.lognormvariate(4, 0.6)),
+            latitude=round(latitude + rng.gauss(0, 0.05), 6),
+            longitude=round(longitude + rng.gauss(0, 0.05), 6),
+            amenity_ids=[plan.ref("Amenity", a) for a in listed])
+        count = int(rng.paretovariate(REVIEWS_TAIL) * scale +
+                    rng.random()) if mean else 0
+        for j in range(count):
+            moment = when + (END - when) * rng.random()
+            yield record("Review",
+                         make_id(plan, "Review", f"{i}.{j}", moment), moment,
+                         place_id=place_id,
+                         user_id=plan.ref("User", draw(rng, users)),
+                         text=rng.choice(REVIEWS))
+
+
+def users_shard(plan, start, stop):
+    """Yield the records of users start..stop"""
+    rng = random.Random(f"{plan.seed}:User:{start}")
+    for i in range(start, stop):
+        first = rng.choice(FIRST_NAMES)
+        last = rng.choice(LAST_NAMES)
+        yield record("User", plan.ref("User", i), created(plan, "User", i),
+                     email=f"{first.lower()}.{last.lower()}{i}@example.com",
+                     password=f"pwd{i}",
+                     first_name=first, last_name=last)
+
+
+def catalog(plan):
+    """Yield the records of the amenities, states and cities"""
+    for i, name in enumerate(AMENITIES):
+        yield record("Amenity", plan.ref("Amenity", i),
+                     created(plan, "Amenity", i), name=name)
+    for i in range(plan.states):
+        name = STATES[i % len(STATES)]
+        if i >= len(STATES):
+            name = f"{name} {i // len(STATES) + 1}"
+        yield record("State", plan.ref("State", i),
+                     created(plan, "State", i), name=name)
+    rng = random.Random(f"{plan.seed}:City")
+    for i in range(plan.cities):
+        yield record("City", plan.ref("City", i), created(plan, "City", i),
+                     name=f"City {i}",
+                     state_id=plan.ref("State", rng.randrange(plan.states)))
+
+
+SHARDS = {
+    "catalog": lambda plan, start, stop: catalog(plan),
+    "users": users_shard,
+    "places": places_shard,
+}
+
+
+def write_shard(task):
+    """Write the records of one shard to a temporary file and return
+    (path, number of records per class)
+
+    The file holds the records joined by commas, compressed as a
+    standalone gzip or lzma stream when codec is one of those.
+    """
+    plan, kind, start, stop, directory, codec = task
+    path = os.path.join(directory, f"{kind}-{start:012d}.part")
+    counts = {}
+    if codec in ("gzip", "lzma"):
+        f = open_compressed(path, "w", codec)
+    else:
+        f = open(path, "w", encoding="utf-8")
+    with f:
+        for text in SHARDS[kind](plan, start, stop):
+            if counts:
+                f.write(",")
+            f.write(text)
+            cls_name = text[1:text.index(".")]
+            counts[cls_name] = counts.get(cls_name, 0) + 1
+    return path, counts
+
+
+def tasks(plan, directory, codec, shard_size=SHARD_SIZE):
+    """Return the shards of a dataset, in file order"""
+    shards = [(plan, "catalog", 0, 0, directory, codec)]
+    for kind, total in (("users", plan.users), ("places", plan.places)):
+        size = shard_size if kind == "users" else \
+            max(1, int(shard_size / (1 + plan.reviews_per_place)))
+        shards.extend((plan, kind, start, min(start + size, total),
+                       directory, codec)
+                      for start in range(0, total, size))
+    return shards
+
+
+def generate(path, objects, skew=1.1, seed=0, workers=None,
+             id_scheme="uuid4", compression=None):
+    """Write a dataset of about objects objects to path and return the
+    number of objects written per class
+    """
+    plan = Plan(objects, skew, seed, id_scheme)
+    codec = codec_for(path, compression)
+    directory = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        shards = tasks(plan, directory, codec)
+        if workers == 1 or len(shards) == 1:
+            parts = [write_shard(shard) for shard in shards]
+        else:
+            with ProcessPoolExecutor(workers) as pool:
+                parts = list(pool.map(write_shard, shards))
+        assemble(path, [part for part, counts in parts if counts], codec)
+    finally:
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+        os.rmdir(directory)
+    totals = {}
+    for _, counts in parts:
+        for cls_name, count in counts.items():
+            totals[cls_name] = totals.get(cls_name, 0) + count
+    return totals
+
+
+def assemble(path, parts, codec):
+    """Join the shard files into the storage file at path"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if codec in ("gzip", "lzma"):
+        with open(tmp_path, "wb") as out:
+            separator = compressed(",", codec)
+            out.write(compressed("{", codec))
+            for i, part in enumerate(parts):
+                if i:
+                    out.write(separator)
+                with open(part, "rb") as f:
+                    while chunk := f.read(1 << 20):
+                        out.write(chunk)
+            out.write(compressed("}", codec))
+    else:
+        out = open_compressed(tmp_path, "w", codec) if codec else \
+            open(tmp_path, "w", encoding="utf-8")
+        with out:
+            out.write("{")
+            for i, part in enumerate(parts):
+                if i:
+                    out.write(",")
+                with open(part, "r", encoding="utf-8") as f:
+                    while chunk := f.read(1 << 20):
+                        out.write(chunk)
+            out.write("}")
+    os.replace(tmp_path, path)
+
+
+def compressed(text, codec):
+    """Return text as one standalone gzip or lzma stream"""
+    data = text.encode("utf-8")
+    if codec == "gzip":
+        return gzip.compress(data, mtime=0)
+    return lzma.compress(data)
+
+
+def main(argv):
+    """Generate a dataset and print what it holds"""
+    parser = argparse.ArgumentParser(prog="benchmarks.dataset")
+    parser.add_argument("output")
+    parser.add_argument("--objects", type=int, default=100000)
+    parser.add_argument("--skew", type=float, default=1.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--ids", choices=("uuid4", "ulid"), default="uuid4")
+    parser.add_argument("--compression")
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    counts = generate(args.output, args.objects, args.skew, args.seed,
+                      args.workers, args.ids, args.compression)
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    print(f"{total} objects in {args.output} "
+          f"({os.path.getsize(args.output) / 1e6:.1f} MB) "
+          f"in {elapsed:.1f}s, {total / elapsed:.0f} objects/s")
+    for cls_name, count in counts.items():
+        print(f"{cls_name:<8} {count:>10}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
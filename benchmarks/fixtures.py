@@ -0,0 +1,50 @@
+#!/usr/bin/python3
+"""
+Fixtures module
+Seeded object factory shared by the benchmarks: the same seed and
+count always give the same objects, ids included
+"""
+
+import random
+import uuid
+from datetime import datetime
+
+from models.place import Place
+from models.review import Review
+from models.user import User
+
+CREATED_AT = datetime(2024, 1, 1).isoformat()
+
+
+def make_id(rng):
+    """Return a uuid4 string drawn from rng"""
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def make_objects(count, seed=0):
+    """Return count serialized-then-rebuilt objects of mixed classes"""
+    rng = random.Random(seed)
+    user_ids = [make_id(rng) for _ in range(max(1, count // 20))]
+    objs = []
+    for i in range(count):
+        base = {"id": make_id(rng), "created_at": CREATED_AT,
+                "updated_at": CREATED_AT}
+        if i % 3 == 0:
+            objs.append(Place(__class__="Place", **base,
+                              user_id=user_ids[i % len(user_ids)],
+                              city_id=make_id(rng),
+                              name=f"Place {i}",
+                              description="Bright room close to the "
+                                          "station, quiet street.",
+                              price_by_night=40 + i % 200,
+                              amenity_ids=user_ids[:3]))
+        elif i % 3 == 1:
+            objs.append(Review(__class__="Review", **base,
+                               user_id=user_ids[i % len(user_ids)],
+                               place_id=make_id(rng),
+                               text="Great host, would stay again."))
+        else:
+            objs.append(User(__class__="User", **base,
+                             email=f"user{i}@example.com",
+                             first_name="Ada", last_name="Lovelace"))
+    return objs
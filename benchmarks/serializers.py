@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+"""
+Serializers benchmark
+Compares the generated per-class decoder with the generic kwargs loop
+it replaced
+Usage: python3 -m benchmarks.serializers [number_of_objects]
+"""
+
+import sys
+import timeit
+from datetime import datetime
+
+from benchmarks.fixtures import make_objects
+from models.engine.interning import table
+
+
+def legacy_intern(name, value):
+    """Return value with its strings interned if name calls for it, as
+    the generic loader did for every attribute
+    """
+    if isinstance(value, str):
+        if name == "id" or name.endswith("_id") or \
+                len(value) <= table.short_length:
+            return table.intern(value)
+    elif isinstance(value, list) and name.endswith("_ids"):
+        return [table.intern(v) if isinstance(v, str) else v
+                for v in value]
+    return value
+
+
+def legacy_from_dict(cls, data):
+    """BaseModel(**kwargs) as it was before the generated decoders"""
+    obj = cls.__new__(cls)
+    for key, value in data.items():
+        if key == "created_at" or key == "updated_at":
+            value = datetime.fromisoformat(value)
+        else:
+            value = legacy_intern(key, value)
+        if key != "__class__":
+            setattr(obj, key, value)
+    return obj
+
+
+def main(count):
+    """Print the time per object of each implementation"""
+    objs = make_objects(count)
+    records = [obj.to_dict() for obj in objs]
+    classes = [obj.__class__ for obj in objs]
+    pairs = list(zip(classes, records))
+    rows = [
+        ("decode generic",
+         lambda: [legacy_from_dict(c, r) for c, r in pairs]),
+        ("decode compiled", lambda: [c.from_dict(r) for c, r in pairs]),
+    ]
+    print(f"{count} objects, best of 5 interleaved rounds")
+    results = {name: float("inf") for name, _ in rows}
+    for _ in range(5):
+        for name, statement in rows:
+            results[name] = min(results[name],
+                                timeit.timeit(statement, number=1))
+    for name, _ in rows:
+        print(f"{name:<18} {results[name] * 1e6 / count:>8.3f} us/object")
+    speedup = results["decode generic"] / results["decode compiled"]
+    print(f"decode speedup: {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+"""
+Startup benchmark
+Times fresh interpreters importing models and running console
+commands against a store of a given size, and compares the medians
+with saved results to catch regressions
+Usage: python3 -m benchmarks.startup [number_of_objects] [runs]
+           [--output FILE] [--baseline FILE] [--threshold FRACTION]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.fixtures import make_objects
+from benchmarks.suite import compare, git_commit, load, summarize
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIOS = (
+    ("import models", "startup.import", "import models"),
+    ("console help", "startup.console",
+     "import console; console.HBNBCommand().onecmd('help quit')"),
+    ("import + first access", "startup.access",
+     "import models; models.storage.all()"),
+)
+
+
+def run(code, directory):
+    """Return the wall time of one interpreter running code"""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], cwd=directory, env=env,
+                   check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def startup(count, runs):
+    """Print the best and median startup time of each scenario and
+    return the result rows, in the format of benchmarks.suite
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(directory, "file.json"), "w") as f:
+            json.dump({f"{o.__class__.__name__}.{o.id}": o.to_dict()
+                       for o in make_objects(count)}, f)
+        print(f"{count} objects in file.json, {runs} runs")
+        for name, key, code in SCENARIOS:
+            times = sorted(run(code, directory) for _ in range(runs))
+            print(f"{name:<22} best {times[0] * 1000:>8.1f} ms   "
+                  f"median {times[len(times) // 2] * 1000:>8.1f} ms")
+            results.append(summarize(key, count, times, None))
+    return results
+
+
+def main(argv):
+    """Run the scenarios, then save or compare the results"""
+    parser = argparse.ArgumentParser(prog="benchmarks.startup")
+    parser.add_argument("count", nargs="?", type=int, default=50000)
+    parser.add_argument("runs", nargs="?", type=int, default=5)
+    parser.add_argument("--output", help="save the results as JSON")
+    parser.add_argument("--baseline", help="compare with saved results")
+    parser.add_argument("--threshold", type=float, default=0.15)
+    args = parser.parse_args(argv)
+
+    report = {"meta": {"commit": git_commit(), "runs": args.runs},
+              "results": startup(args.count, args.runs)}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=1)
+    if args.baseline:
+        print()
+        if compare(load(args.baseline), report, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
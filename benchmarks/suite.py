@@ -0,0 +1,352 @@
+#!/usr/bin/python3
+"""
+Benchmark suite
+Times models, FileStorage and console commands at several store sizes
+and compares saved results to catch regressions
+Usage: python3 -m benchmarks.suite [--sizes 1000,100000,1000000]
+           [--only PREFIX,...] [--budget SECONDS] [--output FILE]
+           [--baseline FILE] [--threshold FRACTION] [--no-memory]
+       python3 -m benchmarks.suite compare OLD.json NEW.json
+"""
+
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import console
+import models
+from benchmarks.api import percentile
+from benchmarks.fixtures import make_objects
+from models.base_model import BaseModel
+from models.engine.file_storage import FileStorage
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIZES = (1000, 100000, 1000000)
+MIN_SAMPLES = 3
+MEMORY_SAMPLES = 10
+
+
+class Environment:
+    """A FileStorage of size objects, installed as the storage of models
+    and of the console for the duration of a with block
+    """
+
+    def __init__(self, size, directory, seed=0):
+        """Build a store of size objects saved under directory"""
+        self.size = size
+        self.path = os.path.join(directory, f"bench-{size}.json")
+        self.rng = random.Random(seed)
+        self.storage = FileStorage()
+        self.storage._FileStorage__file_path = self.path
+        objs = make_objects(size, seed)
+        self.objects = {f"{o.__class__.__name__}.{o.id}": o for o in objs}
+        self.objs = objs
+        self.records = [(o.__class__, o.to_dict())
+                        for o in self.rng.sample(objs, min(size, 10000))]
+        self.ids = {}
+        for obj in objs:
+            self.ids.setdefault(obj.__class__.__name__, []).append(obj.id)
+        self.doomed = []
+        self.cmd = console.HBNBCommand()
+        self.__saved = False
+        self.__previous = None
+        self.reset()
+
+    def reset(self):
+        """Bring the store back to its size objects, so that every
+        benchmark starts from the same state
+        """
+        self.storage._FileStorage__objects = dict(self.objects)
+        self.storage.query("Place where price_by_night == 0 limit 1")
+        self.doomed = list(self.ids["Review"])
+        self.rng.shuffle(self.doomed)
+
+    def pick(self, cls_name):
+        """Return a random stored id of cls_name"""
+        return self.rng.choice(self.ids[cls_name])
+
+    def saved(self):
+        """Return the path of the store, saving it the first time"""
+        if not self.__saved:
+            self.storage.save()
+            self.__saved = True
+        return self.path
+
+    def __enter__(self):
+        """Install the store"""
+        self.__previous = models.storage, console.storage
+        models.storage = console.storage = self.storage
+        return self
+
+    def __exit__(self, *exc):
+        """Restore the previous storage"""
+        models.storage, console.storage = self.__previous
+
+
+def reload_store(env):
+    """Load the saved store into a fresh FileStorage"""
+    storage = FileStorage()
+    storage._FileStorage__objects = {}
+    storage._FileStorage__file_path = env.saved()
+    storage.reload()
+
+
+def from_dict(env):
+    """Rebuild one stored object from its dictionary"""
+    cls, data = env.rng.choice(env.records)
+    cls.from_dict(data)
+
+
+def destroy(env):
+    """Destroy one Review through the console"""
+    env.cmd.onecmd(f"destroy Review {env.doomed.pop()}")
+
+
+BENCHMARKS = (
+    ("model.construct", 10000, lambda env: BaseModel()),
+    ("model.from_dict", 10000, from_dict),
+    ("model.to_dict", 10000,
+     lambda env: env.rng.choice(env.objs).to_dict()),
+    ("storage.new", 10000,
+     lambda env: env.storage.new(env.rng.choice(env.objs))),
+    ("storage.save", 50, lambda env: env.storage.save()),
+    ("storage.reload", 50, reload_store),
+    ("console.create", 1000,
+     lambda env: env.cmd.onecmd('create Place name="bench"')),
+    ("console.show", 10000,
+     lambda env: env.cmd.onecmd(f"show Place {env.pick('Place')}")),
+    ("console.all", 50, lambda env: env.cmd.onecmd("all Place")),
+    ("console.update", 1000,
+     lambda env: env.cmd.onecmd(
+         f'update Place {env.pick("Place")} name "renamed"')),
+    ("console.destroy", 300, destroy),
+)
+
+
+def run(env, operation, cap, budget):
+    """Return the seconds taken by each call of operation(env)
+
+    Runs up to cap calls, stopping after budget seconds once
+    MIN_SAMPLES calls are done.
+    """
+    gc.collect()
+    samples = []
+    deadline = time.perf_counter() + budget
+    for _ in range(cap):
+        start = time.perf_counter()
+        operation(env)
+        end = time.perf_counter()
+        samples.append(end - start)
+        if end > deadline and len(samples) >= MIN_SAMPLES:
+            break
+    return samples
+
+
+def peak_memory(env, operation, count, budget):
+    """Return the peak bytes allocated above the baseline while
+    operation(env) runs count times, or fewer once budget seconds
+    have passed
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        deadline = time.perf_counter() + budget
+        for _ in range(count):
+            operation(env)
+            if time.perf_counter() > deadline:
+                break
+        return tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+
+def summarize(name, size, samples, peak):
+    """Return the result row of a benchmark"""
+    ordered = sorted(samples)
+    total = sum(ordered)
+    return {
+        "name": name,
+        "size": size,
+        "ops": len(ordered),
+        "ops_per_sec": len(ordered) / total if total else 0.0,
+        "mean_us": total / len(ordered) * 1e6,
+        "p50_us": percentile(ordered, 0.5) * 1e6,
+        "p90_us": percentile(ordered, 0.9) * 1e6,
+        "p99_us": percentile(ordered, 0.99) * 1e6,
+        "max_us": ordered[-1] * 1e6,
+        "peak_bytes": peak,
+    }
+
+
+def git_commit():
+    """Return the commit the tree is at, or None"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata(args):
+    """Return what identifies the conditions of a run"""
+    return {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "sizes": args.sizes,
+        "budget": args.budget,
+        "seed": args.seed,
+    }
+
+
+def selected(only):
+    """Return the benchmarks whose name starts with a prefix of only"""
+    if not only:
+        return BENCHMARKS
+    return [b for b in BENCHMARKS
+            if any(b[0].startswith(prefix) for prefix in only)]
+
+
+def suite(args):
+    """Run the selected benchmarks at every size and return the results"""
+    results = []
+    benchmarks = selected(args.only)
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            start = time.perf_counter()
+            env = Environment(size, directory, args.seed)
+            print(f"# {size} objects (built in "
+                  f"{time.perf_counter() - start:.1f}s)", file=sys.stderr)
+            with env, open(os.devnull, "w") as sink, \
+                    contextlib.redirect_stdout(sink):
+                for name, cap, operation in benchmarks:
+                    env.reset()
+                    samples = run(env, operation, cap, args.budget)
+                    peak = None
+                    if args.memory:
+                        env.reset()
+                        peak = peak_memory(env, operation, MEMORY_SAMPLES,
+                                           args.budget)
+                    row = summarize(name, size, samples, peak)
+                    results.append(row)
+                    print(format_row(row), file=sys.stderr)
+            del env
+            gc.collect()
+    return results
+
+
+def format_size(count):
+    """Return a byte count in human units"""
+    if count is None:
+        return "-"
+    for unit in ("B", "KB", "MB"):
+        if abs(count) < 1024:
+            return f"{count:.0f}{unit}"
+        count /= 1024
+    return f"{count:.1f}GB"
+
+
+def format_row(row):
+    """Return one result as a table line"""
+    return (f"{row['name']:<16} {row['size']:>8} {row['ops']:>6} "
+            f"{row['ops_per_sec']:>11.1f} {row['p50_us']:>11.1f} "
+            f"{row['p99_us']:>11.1f} {format_size(row['peak_bytes']):>8}")
+
+
+def compare(old, new, threshold):
+    """Print new results against old ones and return the regressions
+
+    A benchmark regresses when its median latency or its peak memory
+    grows by more than threshold (a fraction).
+    """
+    before = {(r["name"], r["size"]): r for r in old["results"]}
+    regressions = []
+    print(f"{'benchmark':<16} {'size':>8} {'p50 before':>11} "
+          f"{'p50 after':>11} {'change':>8} {'memory':>8}")
+    for row in new["results"]:
+        base = before.get((row["name"], row["size"]))
+        if base is None:
+            continue
+        change = row["p50_us"] / base["p50_us"] - 1 if base["p50_us"] \
+            else 0.0
+        memory = None
+        if row.get("peak_bytes") and base.get("peak_bytes"):
+            memory = row["peak_bytes"] / base["peak_bytes"] - 1
+        flags = []
+        if change > threshold:
+            flags.append("slower")
+        if memory is not None and memory > threshold:
+            flags.append("more memory")
+        if flags:
+            regressions.append((row["name"], row["size"], flags))
+        print(f"{row['name']:<16} {row['size']:>8} {base['p50_us']:>11.1f} "
+              f"{row['p50_us']:>11.1f} {change:>+8.1%} "
+              f"{'-' if memory is None else format(memory, '+.1%'):>8} "
+              f"{' '.join(flags)}".rstrip())
+    return regressions
+
+
+def load(path):
+    """Return the results saved at path"""
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def main(argv):
+    """Run the suite, or compare two result files"""
+    if argv[:1] == ["compare"]:
+        parser = argparse.ArgumentParser(prog="benchmarks.suite compare")
+        parser.add_argument("old")
+        parser.add_argument("new")
+        parser.add_argument("--threshold", type=float, default=0.15)
+        args = parser.parse_args(argv[1:])
+        regressions = compare(load(args.old), load(args.new), args.threshold)
+        return 1 if regressions else 0
+
+    parser = argparse.ArgumentParser(prog="benchmarks.suite")
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)),
+                        type=lambda s: [int(n) for n in s.split(",")])
+    parser.add_argument("--only", default=[],
+                        type=lambda s: [p for p in s.split(",") if p])
+    parser.add_argument("--budget", type=float, default=5.0,
+                        help="seconds per benchmark and size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="save the results as JSON")
+    parser.add_argument("--baseline", help="compare with saved results")
+    parser.add_argument("--threshold", type=float, default=0.15)
+    parser.add_argument("--no-memory", dest="memory", action="store_false")
+    args = parser.parse_args(argv)
+
+    print(f"{'benchmark':<16} {'size':>8} {'ops':>6} {'ops/s':>11} "
+          f"{'p50 us':>11} {'p99 us':>11} {'peak':>8}", file=sys.stderr)
+    report = {"meta": metadata(args), "results": suite(args)}
+    report["meta"]["max_rss_kb"] = \
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=1)
+    if args.baseline:
+        print()
+        if compare(load(args.baseline), report, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -7,6 +7,8 @@ Entry point of the command interpreter
 import cmd
 from models.base_model import BaseModel
 from models import storage
+from models.engine.metrics import Metrics, prometheus, quantile
+from models.engine.query import QueryError
 from models.user import User
 from models.state import State
 from models.city import City
@@ -29,6 +31,16 @@ class HBNBCommand(cmd.Cmd):
         "Review": Review
     }
 
+    def onecmd(self, line):
+        """Run one command, timing it in the storage's metrics"""
+        command = self.parseline(line)[0]
+        metrics = getattr(storage, "metrics", None)
+        if not isinstance(metrics, Metrics) or \
+                not hasattr(self, f"do_{command}"):
+            return super().onecmd(line)
+        with metrics.timer(f"console.{command}"):
+            return super().onecmd(line)
+
     def do_quit(self, arg):
         """Quit command to exit the program"""
         return True
@@ -84,15 +96,20 @@ class HBNBCommand(cmd.Cmd):
             print("** instance id missing **")
             return
         key = f"{args[0]}.{args[1]}"
-        obj = storage.all().get(key)
+        obj = storage.get(key)
         if obj:
             print(obj)
         else:
             print("** no instance found **")
 
     def do_destroy(self, arg):
-        """Delete an instance based on class name and id"""
+        """Delete an instance based on class name and id
+        Usage: destroy <class> <id> [--cascade]
+        With --cascade, also delete every object that depends on it
+        """
         args = arg.split()
+        cascade = "--cascade" in args
+        args = [a for a in args if a != "--cascade"]
         if len(args) == 0:
             print("** class name missing **")
             return
@@ -103,30 +120,58 @@ class HBNBCommand(cmd.Cmd):
             print("** instance id missing **")
             return
         key = f"{args[0]}.{args[1]}"
-        all_objs = storage.all()
-        if key in all_objs:
-            del all_objs[key]
+        obj = storage.get(key)
+        if obj:
+            storage.delete(obj, cascade=cascade)
             storage.save()
         else:
             print("** no instance found **")
 
     def do_all(self, arg):
-        """Print all string representations of instances"""
+        """Print all string representations of instances
+        Usage: all [<class> [where <attr> <op> <value> [and ...]]
+                   [order by <attr> [asc|desc]] [limit N]]
+        """
         args = arg.split()
-        all_objs = storage.all()
 
         if len(args) == 0:
             # Print all instances
-            print([str(obj) for obj in all_objs.values()])
-        else:
-            class_name = args[0]
-            if class_name not in self.__classes:
-                print("** class doesn't exist **")
-                return
-            # Print instances of specific class
-            filtered = [str(obj) for key, obj in all_objs.items()
-                        if key.startswith(class_name + ".")]
-            print(filtered)
+            with storage.snapshot() as all_objs:
+                print([str(obj) for obj in all_objs.values()])
+            return
+        class_name = args[0]
+        if class_name not in self.__classes:
+            print("** class doesn't exist **")
+            return
+        try:
+            results = storage.query(arg)
+        except QueryError as e:
+            print(f"** invalid query: {e} **")
+            return
+        print([str(obj) for obj in results])
+
+    def do_explain(self, arg):
+        """Show the plan chosen for a query and the rows it examined
+        Usage: explain all <class> [where ...] [order by ...] [limit N]
+        """
+        args = arg.split()
+        if args and args[0] == "all":
+            args = args[1:]
+            arg = arg.split("all", 1)[1]
+        if len(args) == 0:
+            print("** class name missing **")
+            return
+        if args[0] not in self.__classes:
+            print("** class doesn't exist **")
+            return
+        try:
+            plan = storage.explain(arg)
+        except QueryError as e:
+            print(f"** invalid query: {e} **")
+            return
+        for name, value in plan.items():
+            if value is not None and value != []:
+                print(f"{name}: {value}")
 
     def do_update(self, arg):
         """Update an instance based on class name and id"""
@@ -142,8 +187,8 @@ class HBNBCommand(cmd.Cmd):
             return
 
         key = f"{args[0]}.{args[1]}"
-        all_objs = storage.all()
-        if key not in all_objs:
+        obj = storage.get(key)
+        if obj is None:
             print("** no instance found **")
             return
 
@@ -154,7 +199,6 @@ class HBNBCommand(cmd.Cmd):
             print("** value missing **")
             return
 
-        obj = all_objs[key]
         attr_name = args[2]
         attr_value = args[3]
 
@@ -162,6 +206,13 @@ class HBNBCommand(cmd.Cmd):
         if attr_name in ["id", "created_at", "updated_at"]:
             return
 
+        # Methods, relations and private names can't be overwritten
+        member = getattr(type(obj), attr_name, None)
+        if attr_name.startswith("_") or callable(member) or \
+                isinstance(member, property):
+            print("** attribute can't be set **")
+            return
+
         # Remove quotes if present
         if attr_value.startswith('"') and attr_value.endswith('"'):
             attr_value = attr_value[1:-1]
@@ -183,6 +234,131 @@ class HBNBCommand(cmd.Cmd):
         setattr(obj, attr_name, attr_value)
         obj.save()
 
+    def do_search(self, arg):
+        """Full-text search over Place and Review text
+        Usage: search [<class>] <terms> [--prefix] [--limit N]
+        """
+        args = arg.split()
+        prefix = "--prefix" in args
+        args = [a for a in args if a != "--prefix"]
+        limit = None
+        if "--limit" in args:
+            i = args.index("--limit")
+            try:
+                limit = int(args[i + 1])
+            except (IndexError, ValueError):
+                print("** invalid limit **")
+                return
+            del args[i:i + 2]
+        class_name = None
+        if args and args[0] in self.__classes:
+            class_name = args.pop(0)
+        if not args:
+            print("** search terms missing **")
+            return
+        results = storage.search(" ".join(args), class_name, prefix, limit)
+        print([str(obj) for obj in results])
+
+    def do_facet(self, arg):
+        """Filter Places by amenity ids: <id> or +<id> must be present,
+        ~<id> at least one of them, -<id> absent
+        Usage: facet [--counts] [+|~|-]<amenity_id> ...
+        """
+        args = arg.split()
+        counts = "--counts" in args
+        all_of, any_of, none_of = [], [], []
+        for token in args:
+            if token == "--counts":
+                continue
+            if token[0] == "~":
+                any_of.append(token[1:])
+            elif token[0] == "-":
+                none_of.append(token[1:])
+            else:
+                all_of.append(token.lstrip("+"))
+        places, totals = storage.facets(all_of, any_of, none_of)
+        if not counts:
+            print([str(obj) for obj in places])
+            return
+        amenities = storage.get_many(f"Amenity.{amenity_id}"
+                                     for amenity_id in totals)
+        for amenity_id, total in sorted(totals.items(),
+                                        key=lambda item: (-item[1], item[0])):
+            amenity = amenities.get(f"Amenity.{amenity_id}")
+            name = getattr(amenity, "name", "")
+            print(f"{total:>6} {amenity_id} {name}".rstrip())
+
+    def do_top(self, arg):
+        """Show the objects with the most related objects
+        Usage: top <class> <relation> [k], e.g. top Place reviews 5
+        """
+        args = arg.split()
+        if not args:
+            print("** class name missing **")
+            return
+        if args[0] not in self.__classes:
+            print("** class doesn't exist **")
+            return
+        if len(args) < 2:
+            print("** relation missing **")
+            return
+        k = 10
+        if len(args) > 2:
+            try:
+                k = int(args[2])
+            except ValueError:
+                print("** invalid count **")
+                return
+        try:
+            ranking = storage.top(args[0], args[1], k)
+        except AttributeError:
+            print("** relation doesn't exist **")
+            return
+        for obj, count in ranking:
+            name = getattr(obj, "name", "") or getattr(obj, "email", "")
+            print(f"{count:>6} {obj.id} {name}".rstrip())
+
+    def do_memory(self, arg):
+        """Show per-class string memory and the savings of interning"""
+        report = storage.memory_report()
+        print(f"{'class':<10} {'objects':>8} {'strings':>8} "
+              f"{'bytes':>10} {'shared':>10} {'saved':>10}")
+        for name, entry in sorted(report.items()):
+            print(f"{name:<10} {entry['objects']:>8} {entry['strings']:>8} "
+                  f"{entry['bytes']:>10} {entry['shared_bytes']:>10} "
+                  f"{entry['saved_bytes']:>10}")
+
+    def do_perf(self, arg):
+        """Show the count and latency of every storage and console
+        operation, the bytes written and read and the objects per class
+        Usage: perf [--prometheus] [--reset]
+        """
+        args = arg.split()
+        report = storage.perf_report(reset="--reset" in args)
+        if "--prometheus" in args:
+            print(prometheus(report), end="")
+            return
+        print(f"{'operation':<22} {'count':>8} {'errors':>6} "
+              f"{'mean ms':>9} {'p50 ms':>9} {'p99 ms':>9} {'total s':>9}")
+        for name, entry in sorted(report["operations"].items()):
+            count = entry["count"]
+            if not count:
+                continue
+            mean = entry["sum"] / count
+            print(f"{name:<22} {count:>8} {entry['errors']:>6} "
+                  f"{mean * 1e3:>9.3f} "
+                  f"{quantile(entry, 0.5) * 1e3:>9.3f} "
+                  f"{quantile(entry, 0.99) * 1e3:>9.3f} "
+                  f"{entry['sum']:>9.3f}")
+        if report["counters"]:
+            print(f"{'counter':<22} {'total':>8}")
+            for name, value in sorted(report["counters"].items()):
+                print(f"{name:<22} {value:>8}")
+        if report["objects"]:
+            print(f"{'class':<22} {'objects':>8}")
+            for name, count in sorted(report["objects"].items()):
+                print(f"{name:<22} {count:>8}")
+
     def do_help(self, arg):
         """Help command"""
         return super().do_help(arg)
@@ -1,10 +1,20 @@
 #!/usr/bin/python3
 """
 Initialization file for models package
-Creates a unique FileStorage instance
+Creates a unique storage instance: a FileStorage, a ClientStorage of
+the storage server when HBNB_TYPE_STORAGE is "server", or a
+ClusterStorage over HBNB_CLUSTER_NODES when it is "cluster"
+The file is loaded on the first storage access, not at import time
 """
 
-from models.engine.file_storage import FileStorage
+import os
 
-storage = FileStorage()
-storage.reload()
+if os.getenv("HBNB_TYPE_STORAGE") == "server":
+    from models.engine.client_storage import ClientStorage
+    storage = ClientStorage()
+elif os.getenv("HBNB_TYPE_STORAGE") == "cluster":
+    from models.engine.cluster import ClusterStorage
+    storage = ClusterStorage()
+else:
+    from models.engine.file_storage import FileStorage
+    storage = FileStorage()
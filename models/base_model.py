@@ -4,14 +4,25 @@ BaseModel module
 Defines all common attributes/methods for other classes
 """
 
+import os
 import uuid
 from datetime import datetime
 import models
+from models.engine import ids
+from models.engine.interning import table
+from models.engine.serializers import decoder
 
 
 class BaseModel:
     """Base class for all models in the AirBnB clone"""
 
+    id_scheme = os.getenv("HBNB_ID_SCHEME", "uuid4")
+
+    def __init_subclass__(cls, **kwargs):
+        """Generate the decoder of each model class once"""
+        super().__init_subclass__(**kwargs)
+        cls._BaseModel__decode = staticmethod(decoder(cls))
+
     def __init__(self, *args, **kwargs):
         """Initialize a new BaseModel"""
 
@@ -19,16 +30,12 @@ class BaseModel:
             # Check if this is a reload from storage (has __class__ key)
             is_reload = "__class__" in kwargs
 
-            for key, value in kwargs.items():
-                if key == "created_at" or key == "updated_at":
-                    value = datetime.fromisoformat(value)
-                if key != "__class__":
-                    setattr(self, key, value)
+            self.__decode(self, kwargs)
 
             # If it's not a reload, we still need to create id and timestamps
             if not is_reload:
                 if not hasattr(self, 'id'):
-                    self.id = str(uuid.uuid4())
+                    self.id = table.intern(self.generate_id())
                 if not hasattr(self, 'created_at'):
                     self.created_at = datetime.now()
                 if not hasattr(self, 'updated_at'):
@@ -36,11 +43,20 @@ class BaseModel:
                 models.storage.new(self)
         else:
             # Creating new instance
-            self.id = str(uuid.uuid4())
+            self.id = table.intern(self.generate_id())
             self.created_at = datetime.now()
             self.updated_at = self.created_at
             models.storage.new(self)
 
+    @classmethod
+    def generate_id(cls):
+        """Return a new id: a uuid4 string, or a time-ordered ULID when
+        id_scheme is "ulid"
+        """
+        if cls.id_scheme == "ulid":
+            return ids.ulid()
+        return str(uuid.uuid4())
+
     def __str__(self):
         """Return string representation of the object"""
         return f"[{self.__class__.__name__}] ({self.id}) {self.__dict__}"
@@ -48,6 +64,7 @@ class BaseModel:
     def save(self):
         """Update updated_at and save the object"""
         self.updated_at = datetime.now()
+        models.storage.new(self)
         models.storage.save()
 
     def to_dict(self):
@@ -57,3 +74,15 @@ class BaseModel:
         d["created_at"] = self.created_at.isoformat()
         d["updated_at"] = self.updated_at.isoformat()
         return d
+
+    @classmethod
+    def from_dict(cls, data):
+        """Return an instance rebuilt from a to_dict() dictionary,
+        without registering it in storage
+        """
+        obj = cls.__new__(cls)
+        cls.__decode(obj, data)
+        return obj
+
+
+BaseModel._BaseModel__decode = staticmethod(decoder(BaseModel))
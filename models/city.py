@@ -4,6 +4,7 @@ City module
 Defines City class that inherits from BaseModel
 """
 
+import models
 from models.base_model import BaseModel
 
 
@@ -12,3 +13,8 @@ class City(BaseModel):
 
     state_id = ""
     name = ""
+
+    @property
+    def places(self):
+        """Return the Place instances located in this City"""
+        return models.storage.related(self, "places")
@@ -0,0 +1,167 @@
+#!/usr/bin/python3
+"""
+Bitmap module
+Bitmap index of Place.amenity_ids for faceted search
+"""
+
+
+def set_bit(bits, ordinal):
+    """Set bit ordinal of the bytearray bits, growing it if needed"""
+    i = ordinal >> 3
+    if i >= len(bits):
+        bits.extend(bytes(max(i + 1 - len(bits), len(bits))))
+    bits[i] |= 1 << (ordinal & 7)
+
+
+def clear_bit(bits, ordinal):
+    """Clear bit ordinal of the bytearray bits"""
+    i = ordinal >> 3
+    if i < len(bits):
+        bits[i] &= ~(1 << (ordinal & 7)) & 0xFF
+
+
+class BitmapIndex:
+    """One bitset per Amenity id over Place ordinals
+
+    Every indexed Place gets a small integer ordinal, and freed ordinals
+    are reused, so the bitsets stay dense. Each bitset is a mutable
+    bytearray, so indexing or dropping one object sets or clears single
+    bits in place. Queries turn the bitsets they need into Python
+    integers (cached until the bitset changes), and AND/OR/NOT facet
+    queries become single integer operations.
+    """
+
+    def __init__(self, cls_name="Place", attr="amenity_ids"):
+        """Initialize an empty index on <cls_name>.<attr>"""
+        self.cls_name = cls_name
+        self.attr = attr
+        self.__ordinals = {}
+        self.__keys = []
+        self.__free = []
+        self.__values = {}
+        self.__bitmaps = {}
+        self.__sizes = {}
+        self.__integers = {}
+        self.__all = bytearray()
+        self.__all_integer = 0
+
+    def __len__(self):
+        """Return the number of indexed objects"""
+        return len(self.__ordinals)
+
+    def add(self, key, obj):
+        """Index obj under key, replacing any previous entry for key"""
+        if obj.__class__.__name__ != self.cls_name:
+            return
+        value = getattr(obj, self.attr, None)
+        if not isinstance(value, (list, tuple, set)):
+            value = ()
+        value = frozenset(v for v in value if isinstance(v, str))
+        ordinal = self.__ordinals.get(key)
+        if ordinal is None:
+            if self.__free:
+                ordinal = self.__free.pop()
+                self.__keys[ordinal] = key
+            else:
+                ordinal = len(self.__keys)
+                self.__keys.append(key)
+            self.__ordinals[key] = ordinal
+            set_bit(self.__all, ordinal)
+            self.__all_integer = None
+            previous = frozenset()
+        else:
+            previous = self.__values[key]
+        for amenity_id in previous - value:
+            self.__clear(amenity_id, ordinal)
+        for amenity_id in value - previous:
+            bits = self.__bitmaps.get(amenity_id)
+            if bits is None:
+                bits = self.__bitmaps[amenity_id] = bytearray()
+            set_bit(bits, ordinal)
+            self.__sizes[amenity_id] = self.__sizes.get(amenity_id, 0) + 1
+            self.__integers.pop(amenity_id, None)
+        self.__values[key] = value
+
+    def __clear(self, amenity_id, ordinal):
+        """Clear bit ordinal in the bitset of amenity_id"""
+        self.__integers.pop(amenity_id, None)
+        self.__sizes[amenity_id] -= 1
+        if self.__sizes[amenity_id]:
+            clear_bit(self.__bitmaps[amenity_id], ordinal)
+        else:
+            del self.__sizes[amenity_id]
+            del self.__bitmaps[amenity_id]
+
+    def __integer(self, amenity_id):
+        """Return the bitset of amenity_id as an integer"""
+        integer = self.__integers.get(amenity_id)
+        if integer is None:
+            bits = self.__bitmaps.get(amenity_id)
+            if bits is None:
+                return 0
+            integer = self.__integers[amenity_id] = \
+                int.from_bytes(bits, "little")
+        return integer
+
+    def __everything(self):
+        """Return the bitset of every indexed object as an integer"""
+        if self.__all_integer is None:
+            self.__all_integer = int.from_bytes(self.__all, "little")
+        return self.__all_integer
+
+    def remove(self, key):
+        """Drop the entry for key if there is one"""
+        ordinal = self.__ordinals.pop(key, None)
+        if ordinal is None:
+            return
+        for amenity_id in self.__values.pop(key):
+            self.__clear(amenity_id, ordinal)
+        clear_bit(self.__all, ordinal)
+        self.__all_integer = None
+        self.__keys[ordinal] = None
+        self.__free.append(ordinal)
+
+    def clear(self):
+        """Drop every entry"""
+        self.__init__(self.cls_name, self.attr)
+
+    def bitmap(self, all_of=(), any_of=(), none_of=()):
+        """Return the bitset of the objects having every all_of id, at
+        least one any_of id (if given) and none of the none_of ids
+        """
+        result = self.__everything()
+        for amenity_id in all_of:
+            result &= self.__integer(amenity_id)
+        if any_of:
+            union = 0
+            for amenity_id in any_of:
+                union |= self.__integer(amenity_id)
+            result &= union
+        for amenity_id in none_of:
+            result &= ~self.__integer(amenity_id)
+        return result
+
+    def keys(self, bitmap):
+        """Return the keys whose ordinals are set in bitmap"""
+        bits = format(bitmap, "b")[::-1]
+        keys = []
+        i = bits.find("1")
+        while i != -1:
+            keys.append(self.__keys[i])
+            i = bits.find("1", i + 1)
+        return keys
+
+    def query(self, all_of=(), any_of=(), none_of=()):
+        """Return the keys matching the facet selection"""
+        return self.keys(self.bitmap(all_of, any_of, none_of))
+
+    def counts(self, bitmap=None, facets=None):
+        """Return, for each amenity id (or each of facets), how many of
+        the objects in bitmap (default: all) have it
+        """
+        if bitmap is None:
+            bitmap = self.__everything()
+        if facets is None:
+            facets = list(self.__bitmaps)
+        return {amenity_id: (bitmap & self.__integer(amenity_id))
+                .bit_count() for amenity_id in facets}
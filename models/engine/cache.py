@@ -0,0 +1,156 @@
+#!/usr/bin/python3
+"""
+Cache module
+Results computed from storage, kept until the objects they depend on change
+
+Every entry is tagged with the class names and object keys
+("<class>.<id>") it was computed from. The cache subscribes to the
+storage's ChangeFeed and drops exactly the entries tagged with the
+class or the key of each created, updated or deleted object. Storages
+without a feed (like ClientStorage) keep an entry only while their
+version is unchanged.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+
+class CacheEntry:
+    """A cached value and the strong ETag identifying it"""
+
+    __slots__ = ("value", "etag", "version", "tags")
+
+    def __init__(self, value, etag, version, tags):
+        """Initialize an entry computed at storage version"""
+        self.value = value
+        self.etag = etag
+        self.version = version
+        self.tags = tags
+
+
+class ResultCache:
+    """Least recently used cache of results derived from storage"""
+
+    def __init__(self, storage, maxsize=1024):
+        """Initialize a cache of at most maxsize results of storage"""
+        self.storage = storage
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.__entries = OrderedDict()
+        self.__tagged = {}
+        self.__lock = threading.Lock()
+        self.__epoch = os.urandom(4).hex()
+        self.__generation = 0
+        feed = getattr(storage, "changes", None)
+        self.__feed = feed if hasattr(feed, "subscribe") else None
+        self.__version = None
+        if self.__feed is not None:
+            self.__version = storage.version
+            self.__feed.subscribe(self.__changed)
+
+    def __len__(self):
+        """Return the number of cached results"""
+        return len(self.__entries)
+
+    def fetch(self, key, compute, tags=()):
+        """Return the entry cached under key, calling compute() to build
+        it on a miss; tags are the class names and object keys the
+        result depends on
+        """
+        version = self.storage.version
+        with self.__lock:
+            self.__check(version)
+            entry = self.__entries.get(key)
+            if entry is not None and (self.__feed is not None or
+                                      entry.version == version):
+                self.__entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+            generation = self.__generation
+        entry = CacheEntry(compute(), f'"{self.__epoch}-{version}"',
+                           version, tuple(tags))
+        with self.__lock:
+            if generation == self.__generation:
+                self.__store(key, entry)
+        return entry
+
+    def __check(self, version):
+        """Drop every entry if storage changed without publishing it
+        (e.g. reload())
+        """
+        if self.__feed is not None and version > self.__version:
+            self.__clear()
+            self.__version = version
+
+    def __store(self, key, entry):
+        """Insert entry under key, evicting the least recently used"""
+        self.__discard(key)
+        self.__entries[key] = entry
+        for tag in entry.tags:
+            self.__tagged.setdefault(tag, set()).add(key)
+        while len(self.__entries) > self.maxsize:
+            self.__discard(next(iter(self.__entries)))
+
+    def __discard(self, key):
+        """Remove the entry under key and its tags"""
+        entry = self.__entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry.tags:
+            keys = self.__tagged.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.__tagged[tag]
+
+    def __changed(self, event):
+        """Invalidate the entries depending on the changed object"""
+        version = self.storage.version
+        with self.__lock:
+            self.__invalidate((event["key"], event["key"].split(".", 1)[0]))
+            self.__version = max(self.__version, version)
+
+    def invalidate(self, *tags):
+        """Drop the entries tagged with any of tags"""
+        with self.__lock:
+            self.__invalidate(tags)
+
+    def __invalidate(self, tags):
+        """Drop the entries tagged with any of tags (with the lock held)"""
+        self.__generation += 1
+        for tag in tags:
+            for key in list(self.__tagged.get(tag, ())):
+                self.__discard(key)
+                self.invalidations += 1
+
+    def clear(self):
+        """Drop every entry"""
+        with self.__lock:
+            self.__clear()
+
+    def __clear(self):
+        """Drop every entry (with the lock held)"""
+        self.__generation += 1
+        self.invalidations += len(self.__entries)
+        self.__entries.clear()
+        self.__tagged.clear()
+
+    def stats(self):
+        """Return the hit, miss and invalidation counters"""
+        return {
+            "entries": len(self.__entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+    def close(self):
+        """Stop following the storage's changes and drop every entry"""
+        if self.__feed is not None:
+            self.__feed.unsubscribe(self.__changed)
+            self.__feed = None
+        self.clear()
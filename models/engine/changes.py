@@ -0,0 +1,142 @@
+#!/usr/bin/python3
+"""
+Changes module
+Ordered stream of create/update/delete events published by storage
+"""
+
+import json
+import os
+import threading
+import time
+
+
+class ChangeFeed:
+    """Publishes storage mutations with increasing sequence numbers
+
+    Events go to in-process subscribers and, once a log is opened, are
+    appended as JSON lines to a change-log file that other processes
+    can read or follow from any sequence number.
+    """
+
+    def __init__(self, log_path=None):
+        """Initialize a feed, appending to log_path if given"""
+        self.seq = 0
+        self.__subscribers = []
+        self.__lock = threading.Lock()
+        self.__log = None
+        self.log_path = None
+        if log_path:
+            self.open_log(log_path)
+
+    @property
+    def active(self):
+        """Return True if anyone consumes the events"""
+        return bool(self.__subscribers) or self.__log is not None
+
+    def open_log(self, path):
+        """Append events to path, continuing its sequence numbers"""
+        with self.__lock:
+            self.close_log()
+            self.seq = max(self.seq, last_seq(path))
+            self.__log = open(path, "a")
+            self.log_path = path
+
+    def close_log(self):
+        """Stop appending events to the change-log file"""
+        if self.__log is not None:
+            self.__log.close()
+            self.__log = None
+
+    def subscribe(self, callback):
+        """Call callback(event) for every event published from now on"""
+        self.__subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        """Stop calling callback"""
+        if callback in self.__subscribers:
+            self.__subscribers.remove(callback)
+
+    def publish(self, op, key, data=None):
+        """Assign the next sequence number to an event and deliver it"""
+        with self.__lock:
+            self.seq += 1
+            event = {
+                "seq": self.seq,
+                "op": op,
+                "key": key,
+                "data": data,
+                "time": time.time(),
+            }
+            if self.__log is not None:
+                self.__log.write(json.dumps(event) + "\n")
+                self.__log.flush()
+            subscribers = list(self.__subscribers)
+        for callback in subscribers:
+            callback(event)
+        return event
+
+    def read(self, since=0, path=None):
+        """Yield the logged events whose seq is greater than since"""
+        path = path or self.log_path
+        if not path or not os.path.exists(path):
+            return
+        with open(path, "r") as f:
+            for line in f:
+                event = parse_line(line)
+                if event is not None and event["seq"] > since:
+                    yield event
+
+    def follow(self, since=0, path=None, interval=0.5, stop=None):
+        """Yield logged events after since, waiting for new ones
+
+        Runs until stop (a threading.Event) is set, like tail -f.
+        """
+        path = path or self.log_path
+        position = 0
+        while stop is None or not stop.is_set():
+            if path and os.path.exists(path):
+                with open(path, "r") as f:
+                    f.seek(position)
+                    while True:
+                        line = f.readline()
+                        if not line.endswith("\n"):
+                            break
+                        position = f.tell()
+                        event = parse_line(line)
+                        if event is not None and event["seq"] > since:
+                            since = event["seq"]
+                            yield event
+            if stop is None:
+                time.sleep(interval)
+            else:
+                stop.wait(interval)
+
+
+def parse_line(line):
+    """Return the event stored on a change-log line, or None"""
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+def last_seq(path):
+    """Return the last sequence number recorded in a change-log file"""
+    if not os.path.exists(path):
+        return 0
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        size = 4096
+        while True:
+            start = max(0, end - size)
+            f.seek(start)
+            lines = f.read(end - start).splitlines()
+            for line in reversed(lines if start == 0 else lines[1:]):
+                event = parse_line(line)
+                if event is not None:
+                    return event["seq"]
+            if start == 0:
+                return 0
+            size *= 2
@@ -0,0 +1,339 @@
+#!/usr/bin/python3
+"""
+ClientStorage module
+Storage engine backed by a storage server (models.engine.server)
+"""
+
+import contextlib
+import os
+import socket
+import threading
+from models.engine.protocol import CODES, ERROR, RemoteError, \
+    ProtocolError, SnapshotRequired, pack, read_message
+from models.engine.query import QueryError
+from models.base_model import BaseModel
+from models.user import User
+from models.state import State
+from models.city import City
+from models.amenity import Amenity
+from models.place import Place
+from models.review import Review
+
+
+class Connection:
+    """One socket to the server, sending requests in batches"""
+
+    def __init__(self, path, timeout=None):
+        """Connect to the server listening on path"""
+        self.__socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.__socket.settimeout(timeout)
+        try:
+            self.__socket.connect(path)
+        except OSError:
+            self.__socket.close()
+            raise
+        self.__reader = self.__socket.makefile("rb")
+        self.__next_id = 0
+
+    def request(self, calls):
+        """Send every (operation, args) of calls at once, then return
+        the (code, value) responses in the same order
+        """
+        first = self.__next_id
+        self.__next_id = (first + len(calls)) % 2 ** 32
+        self.__socket.sendall(b"".join(
+            pack((first + i) % 2 ** 32, CODES[op], list(args))
+            for i, (op, args) in enumerate(calls)))
+        responses = []
+        for i in range(len(calls)):
+            message = read_message(self.__reader)
+            if message is None:
+                raise ProtocolError("connection closed by the server")
+            request_id, code, value = message
+            if request_id != (first + i) % 2 ** 32:
+                raise ProtocolError("response out of order")
+            responses.append((code, value))
+        return responses
+
+    def close(self):
+        """Close the socket"""
+        self.__reader.close()
+        self.__socket.close()
+
+
+class ConnectionPool:
+    """Reuses up to size connections across threads"""
+
+    def __init__(self, path, size=4, timeout=None):
+        """Initialize an empty pool of connections to path"""
+        self.path = path
+        self.timeout = timeout
+        self.__idle = []
+        self.__lock = threading.Lock()
+        self.__slots = threading.BoundedSemaphore(size)
+
+    @contextlib.contextmanager
+    def connection(self):
+        """Lend a connection, opening one if none is idle
+
+        A connection that failed is closed instead of returned.
+        """
+        with self.__slots:
+            with self.__lock:
+                conn = self.__idle.pop() if self.__idle else None
+            if conn is None:
+                conn = Connection(self.path, self.timeout)
+            try:
+                yield conn
+            except BaseException:
+                conn.close()
+                raise
+            with self.__lock:
+                self.__idle.append(conn)
+
+    def close(self):
+        """Close the idle connections"""
+        with self.__lock:
+            while self.__idle:
+                self.__idle.pop().close()
+
+
+class Pipeline:
+    """Collects requests and sends them in one round trip
+
+    with storage.pipeline() as pipe:
+        pipe.new(obj)
+        pipe.save()
+    """
+
+    def __init__(self, storage):
+        """Initialize an empty pipeline on storage"""
+        self.__storage = storage
+        self.__calls = []
+        self.results = []
+
+    def call(self, op, *args):
+        """Queue operation op"""
+        self.__calls.append((op, args))
+        return self
+
+    def new(self, obj):
+        """Queue adding obj"""
+        return self.call("new", obj.to_dict())
+
+    def delete(self, obj, cascade=False):
+        """Queue removing obj"""
+        return self.call("delete", f"{obj.__class__.__name__}.{obj.id}",
+                         cascade)
+
+    def save(self):
+        """Queue writing the store file"""
+        return self.call("save")
+
+    def execute(self):
+        """Send the queued requests and return their raw results"""
+        calls, self.__calls = self.__calls, []
+        self.results = self.__storage.request(calls) if calls else []
+        return self.results
+
+    def __enter__(self):
+        """Return the pipeline"""
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        """Send the queued requests unless the block raised"""
+        if exc_type is None:
+            self.execute()
+
+
+class ClientStorage:
+    """Drop-in replacement for FileStorage talking to a storage server"""
+
+    __classes = {
+        "BaseModel": BaseModel,
+        "User": User,
+        "State": State,
+        "City": City,
+        "Amenity": Amenity,
+        "Place": Place,
+        "Review": Review,
+    }
+    __errors = {
+        "AttributeError": AttributeError,
+        "KeyError": KeyError,
+        "PermissionError": PermissionError,
+        "QueryError": QueryError,
+        "SnapshotRequired": SnapshotRequired,
+        "TypeError": TypeError,
+        "ValueError": ValueError,
+    }
+
+    def __init__(self, path=None, pool_size=None, timeout=None):
+        """Initialize a client of the server listening on path
+
+        Connections are opened on first use.
+        """
+        if path is None:
+            path = os.getenv("HBNB_STORAGE_SOCKET", "hbnb.sock")
+        if pool_size is None:
+            pool_size = int(os.getenv("HBNB_STORAGE_POOL", "4"))
+        self.pool = ConnectionPool(path, pool_size, timeout)
+
+    def request(self, calls):
+        """Send (operation, args) calls in one round trip and return
+        their results, raising the first error
+        """
+        with self.pool.connection() as conn:
+            responses = conn.request(calls)
+        results = []
+        for code, value in responses:
+            if code == ERROR:
+                name, message = value
+                raise self.__errors.get(name, RemoteError)(message)
+            results.append(value)
+        return results
+
+    def __call(self, op, *args):
+        """Send one request and return its result"""
+        return self.request([(op, args)])[0]
+
+    def pipeline(self):
+        """Return a Pipeline sending several requests at once"""
+        return Pipeline(self)
+
+    def __object(self, data):
+        """Return the object serialized in data"""
+        return self.__classes[data["__class__"]].from_dict(data)
+
+    def ping(self):
+        """Return True if the server answers"""
+        return self.__call("ping") == "pong"
+
+    @property
+    def version(self):
+        """Return the server's store version"""
+        return self.__call("version")
+
+    def all(self):
+        """Return a copy of every stored object"""
+        objects = {}
+        for data in self.__call("all"):
+            obj = self.__object(data)
+            objects[f"{obj.__class__.__name__}.{obj.id}"] = obj
+        return objects
+
+    def snapshot(self):
+        """Return a context manager over a copy of every object"""
+        return contextlib.nullcontext(self.all())
+
+    def get(self, key):
+        """Return a copy of the object stored under key, or None"""
+        data = self.__call("get", key)
+        return self.__object(data) if data is not None else None
+
+    def get_many(self, keys):
+        """Return {key: copy} for the keys that are stored, fetched in
+        one round trip
+        """
+        keys = list(keys)
+        pipe = self.pipeline()
+        for key in keys:
+            pipe.call("get", key)
+        return {key: self.__object(data)
+                for key, data in zip(keys, pipe.execute())
+                if data is not None}
+
+    def new(self, obj):
+        """Add obj to the server's store (or replace it)"""
+        self.__call("new", obj.to_dict())
+
+    def delete(self, obj=None, cascade=False):
+        """Remove obj (and its dependents with cascade) from the store
+        and return the removed objects
+        """
+        if obj is None:
+            return []
+        return [self.__object(data) for data in self.__call(
+            "delete", f"{obj.__class__.__name__}.{obj.id}", cascade)]
+
+    def save(self):
+        """Have the server write its store file"""
+        self.__call("save")
+
+    def reload(self):
+        """Have the server read its store file again"""
+        self.__call("reload")
+
+    def query(self, text):
+        """Return the objects selected by a query"""
+        return [self.__object(data) for data in self.__call("query", text)]
+
+    def explain(self, text):
+        """Run a query and return its plan and row counters"""
+        return self.__call("explain", text)
+
+    def search(self, query, cls_name=None, prefix=False, limit=None):
+        """Return the objects matching a full-text query, best first"""
+        return [self.__object(data) for data in
+                self.__call("search", query, cls_name, prefix, limit)]
+
+    def related(self, obj, name):
+        """Return the objects reached from obj through relation name"""
+        return self.prefetch([obj], name).get(obj.id, [])
+
+    def prefetch(self, objs, name):
+        """Resolve relation name for every object of objs in one request"""
+        found = self.__call("prefetch", [obj.to_dict() for obj in objs],
+                            name)
+        return {obj_id: [self.__object(data) for data in related]
+                for obj_id, related in found.items()}
+
+    def top(self, cls_name, name, k=10):
+        """Return the k cls_name objects with the most related objects"""
+        return [(self.__object(data), count)
+                for data, count in self.__call("top", cls_name, name, k)]
+
+    def ranking(self, cls_name, name, k=None):
+        """Return up to k (id, count) pairs of the cls_name ids with the
+        most related objects through relation name
+        """
+        return [tuple(pair) for pair in
+                self.__call("ranking", cls_name, name, k)]
+
+    def facets(self, all_of=(), any_of=(), none_of=()):
+        """Return the Places matching a facet selection and the counts"""
+        places, counts = self.__call("facets", list(all_of), list(any_of),
+                                     list(none_of))
+        return [self.__object(data) for data in places], counts
+
+    def memory_report(self):
+        """Return the server's per-class string memory report"""
+        return self.__call("memory_report")
+
+    def perf_report(self, reset=False):
+        """Return the server's operation metrics and objects per class"""
+        return self.__call("perf_report", reset)
+
+    def replication_changes(self, since, timeout=0, epoch=None):
+        """Return {"epoch", "seq", "events"} with the primary's events
+        after since, waiting up to timeout seconds for one
+        """
+        return self.__call("changes", since, timeout, epoch)
+
+    def replication_snapshot(self):
+        """Return {"epoch", "seq", "objects"}: every serialized object
+        and the position of the change stream they reflect
+        """
+        return self.__call("snapshot")
+
+    def status(self):
+        """Return the server's replication role and position"""
+        return self.__call("status")
+
+    def promote(self):
+        """Make a follower server the primary"""
+        return self.__call("promote")
+
+    def close(self):
+        """Close the pooled connections"""
+        self.pool.close()
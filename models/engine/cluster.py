@@ -0,0 +1,406 @@
+#!/usr/bin/python3
+"""
+Cluster module
+Spreads objects over several storage servers by consistent hashing
+
+Each node is a storage server (models.engine.server) with its own data
+file. ClusterStorage routes every key to its node, fans reads out to
+all nodes in parallel and merges the results. Adding or removing a
+node only moves the keys whose position on the hash ring changed.
+Start local nodes with: python3 -m models.engine.cluster <dir> <count>
+"""
+
+import contextlib
+import hashlib
+import os
+import subprocess
+import sys
+import threading
+import time
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from models.engine.client_storage import ClientStorage
+from models.engine.metrics import merge
+from models.engine.query import Query, sort_objects
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+
+class HashRing:
+    """Consistent hash ring placing each node at several points"""
+
+    def __init__(self, nodes=(), replicas=64):
+        """Initialize a ring over nodes"""
+        self.replicas = replicas
+        self.__points = []
+        self.__owners = []
+        for node in nodes:
+            self.add(node)
+
+    @staticmethod
+    def hash(text):
+        """Return the ring position of text"""
+        digest = hashlib.md5(text.encode("utf-8")).digest()
+        return int.from_bytes(digest[:8], "big")
+
+    @property
+    def nodes(self):
+        """Return the nodes on the ring"""
+        return list(dict.fromkeys(self.__owners))
+
+    def add(self, node):
+        """Place node on the ring"""
+        points = dict(zip(self.__points, self.__owners))
+        for i in range(self.replicas):
+            points[self.hash(f"{node}#{i}")] = node
+        self.__points = sorted(points)
+        self.__owners = [points[p] for p in self.__points]
+
+    def remove(self, node):
+        """Take node off the ring"""
+        kept = [(p, n) for p, n in zip(self.__points, self.__owners)
+                if n != node]
+        self.__points = [p for p, _ in kept]
+        self.__owners = [n for _, n in kept]
+
+    def node_for(self, key):
+        """Return the node owning key"""
+        if not self.__points:
+            raise LookupError("the ring has no nodes")
+        i = bisect_right(self.__points, self.hash(key))
+        return self.__owners[i % len(self.__owners)]
+
+
+class ClusterStorage:
+    """Storage API routed over several storage servers"""
+
+    __references = (
+        ("City", "state_id", "State"),
+        ("Place", "city_id", "City"),
+        ("Place", "user_id", "User"),
+        ("Review", "place_id", "Place"),
+        ("Review", "user_id", "User"),
+    )
+
+    def __init__(self, paths=None, replicas=64):
+        """Initialize a router over the servers listening on paths"""
+        if paths is None:
+            paths = [p for p in os.getenv(
+                "HBNB_CLUSTER_NODES", "").split(",") if p]
+        self.ring = HashRing((), replicas)
+        self.__nodes = {}
+        self.__executor = None
+        self.__lock = threading.Lock()
+        self.__version = 0
+        self.__observed = None
+        for path in paths:
+            self.__nodes[path] = ClientStorage(path)
+            self.ring.add(path)
+
+    @property
+    def nodes(self):
+        """Return the ClientStorage of every node, by socket path"""
+        return dict(self.__nodes)
+
+    def node(self, key):
+        """Return the ClientStorage owning key"""
+        return self.__nodes[self.ring.node_for(key)]
+
+    def __fan_out(self, call):
+        """Return call(node) for every node, run in parallel, in node
+        order
+        """
+        nodes = list(self.__nodes.values())
+        if len(nodes) == 1:
+            return [call(nodes[0])]
+        if self.__executor is None:
+            self.__executor = ThreadPoolExecutor(max_workers=8)
+        futures = [self.__executor.submit(call, node) for node in nodes]
+        return [future.result() for future in futures]
+
+    @property
+    def version(self):
+        """Return a number that grows with every write on any node
+
+        The sum of the node versions drops when a node leaves, so the
+        cluster keeps its own counter: it moves on with every write and
+        membership change made here, and whenever that sum changed.
+        """
+        observed = sum(self.__fan_out(lambda node: node.version))
+        with self.__lock:
+            if observed != self.__observed:
+                self.__observed = observed
+                self.__version += 1
+            return self.__version
+
+    def __changed(self):
+        """Move the cluster version on"""
+        with self.__lock:
+            self.__version += 1
+
+    def all(self):
+        """Return a copy of every object of every node"""
+        objects = {}
+        for part in self.__fan_out(lambda node: node.all()):
+            objects.update(part)
+        return objects
+
+    def snapshot(self):
+        """Return a context manager over a copy of every object"""
+        return contextlib.nullcontext(self.all())
+
+    def get(self, key):
+        """Return a copy of the object stored under key, or None"""
+        return self.node(key).get(key)
+
+    def get_many(self, keys):
+        """Return {key: copy} for the keys that are stored, with one
+        round trip per node owning some of them
+        """
+        keys = list(keys)
+        by_node = {}
+        for key in keys:
+            by_node.setdefault(self.ring.node_for(key), []).append(key)
+        found = {}
+        for name, part in by_node.items():
+            found.update(self.__nodes[name].get_many(part))
+        return {key: found[key] for key in keys if key in found}
+
+    def new(self, obj):
+        """Store obj on the node owning its key"""
+        self.node(f"{obj.__class__.__name__}.{obj.id}").new(obj)
+        self.__changed()
+
+    def delete(self, obj=None, cascade=False):
+        """Remove obj and return the removed objects
+
+        With cascade, the objects referencing a removed object are
+        looked up on every node, since references cross partitions.
+        """
+        if obj is None:
+            return []
+        removed = []
+        pending = [obj]
+        while pending:
+            current = pending.pop()
+            key = f"{current.__class__.__name__}.{current.id}"
+            gone = self.node(key).delete(current)
+            removed.extend(gone)
+            if cascade and gone:
+                pending.extend(self.dependents(current))
+        self.__changed()
+        return removed
+
+    def dependents(self, obj):
+        """Return the objects holding a reference to obj's id"""
+        found = []
+        for cls_name, attr, target in self.__references:
+            if target == obj.__class__.__name__:
+                found.extend(self.query(f'{cls_name} where {attr} == '
+                                        f'"{obj.id}"'))
+        return found
+
+    def save(self):
+        """Have every node write its data file"""
+        self.__fan_out(lambda node: node.save())
+
+    def reload(self):
+        """Have every node read its data file again"""
+        self.__fan_out(lambda node: node.reload())
+        self.__changed()
+
+    def query(self, text):
+        """Run a query on every node and merge the results
+
+        Each node applies the query's order and limit, so the merged
+        results only need one more sort and cut.
+        """
+        query = Query.parse(text)
+        parts = self.__fan_out(lambda node: node.query(text))
+        results = [obj for part in parts for obj in part]
+        if query.order_by:
+            results = sort_objects(results, query.order_by,
+                                   query.descending)
+        if query.limit is not None:
+            results = results[:query.limit]
+        return results
+
+    def explain(self, text):
+        """Return the plan of the first node with the row counters of
+        all nodes added up
+        """
+        plans = self.__fan_out(lambda node: node.explain(text))
+        plan = dict(plans[0])
+        for key in ("estimated_rows", "rows_examined", "rows_returned"):
+            plan[key] = sum(p[key] or 0 for p in plans)
+        plan["nodes"] = len(plans)
+        return plan
+
+    def search(self, query, cls_name=None, prefix=False, limit=None):
+        """Return the objects matching a full-text query
+
+        Scores are relative to each node's documents, so the per-node
+        rankings are interleaved instead of compared.
+        """
+        parts = self.__fan_out(
+            lambda node: node.search(query, cls_name, prefix, limit))
+        results = []
+        for rank in range(max((len(p) for p in parts), default=0)):
+            results.extend(p[rank] for p in parts if rank < len(p))
+        return results[:limit] if limit is not None else results
+
+    def related(self, obj, name):
+        """Return the objects reached from obj through relation name"""
+        return self.prefetch([obj], name).get(obj.id, [])
+
+    def prefetch(self, objs, name):
+        """Resolve relation name for every object of objs on all nodes"""
+        result = {obj.id: [] for obj in objs}
+        for part in self.__fan_out(
+                lambda node: node.prefetch(objs, name)):
+            for obj_id, related in part.items():
+                result[obj_id].extend(related)
+        return result
+
+    def ranking(self, cls_name, name, k=None):
+        """Return up to k (id, count) pairs with the counts of all nodes
+        added up, most related objects first
+        """
+        totals = {}
+        for part in self.__fan_out(
+                lambda node: node.ranking(cls_name, name)):
+            for ref_id, count in part:
+                totals[ref_id] = totals.get(ref_id, 0) + count
+        ranking = sorted(totals.items(), key=lambda item: -item[1])
+        return ranking[:k] if k is not None else ranking
+
+    def top(self, cls_name, name, k=10):
+        """Return the k cls_name objects with the most related objects"""
+        found = []
+        for ref_id, count in self.ranking(cls_name, name):
+            if len(found) >= k:
+                break
+            obj = self.get(f"{cls_name}.{ref_id}")
+            if obj is not None:
+                found.append((obj, count))
+        return found
+
+    def facets(self, all_of=(), any_of=(), none_of=()):
+        """Return the Places matching a facet selection and the counts"""
+        places, counts = [], {}
+        for part, part_counts in self.__fan_out(
+                lambda node: node.facets(all_of, any_of, none_of)):
+            places.extend(part)
+            for amenity_id, count in part_counts.items():
+                counts[amenity_id] = counts.get(amenity_id, 0) + count
+        return places, counts
+
+    def memory_report(self):
+        """Return the per-class string memory of all nodes added up"""
+        report = {}
+        for part in self.__fan_out(lambda node: node.memory_report()):
+            for name, entry in part.items():
+                total = report.setdefault(name, dict.fromkeys(entry, 0))
+                for field, value in entry.items():
+                    total[field] += value
+        return report
+
+    def perf_report(self, reset=False):
+        """Return the operation metrics of all nodes added up"""
+        return merge(self.__fan_out(lambda node: node.perf_report(reset)))
+
+    def add_node(self, path):
+        """Add the server listening on path and move its keys to it"""
+        self.__nodes[path] = ClientStorage(path)
+        self.ring.add(path)
+        self.__changed()
+        return self.rebalance()
+
+    def remove_node(self, path):
+        """Move every key of the node on path elsewhere and drop it
+
+        The last node cannot be removed: its objects would have nowhere
+        to go.
+        """
+        if path not in self.__nodes:
+            raise KeyError(f"no node listens on {path}")
+        if len(self.__nodes) == 1:
+            raise ValueError("cannot remove the last node of the cluster")
+        self.ring.remove(path)
+        self.__changed()
+        moved = self.rebalance()
+        self.__nodes.pop(path).close()
+        return moved
+
+    def rebalance(self):
+        """Move every object to the node now owning its key and return
+        the number of objects moved
+        """
+        moved = 0
+        for path, node in list(self.__nodes.items()):
+            moves = {}
+            for key, obj in node.all().items():
+                owner = self.ring.node_for(key) if self.ring.nodes else path
+                if owner != path:
+                    moves.setdefault(owner, []).append(obj)
+            for owner, objs in moves.items():
+                with self.__nodes[owner].pipeline() as pipe:
+                    for obj in objs:
+                        pipe.new(obj)
+                    pipe.save()
+                with node.pipeline() as pipe:
+                    for obj in objs:
+                        pipe.delete(obj)
+                    pipe.save()
+                moved += len(objs)
+        return moved
+
+    def close(self):
+        """Close the connections to every node"""
+        for node in self.__nodes.values():
+            node.close()
+        if self.__executor is not None:
+            self.__executor.shutdown()
+            self.__executor = None
+
+
+def spawn_nodes(directory, count):
+    """Start count storage servers, each in its own sub-directory of
+    directory, and return (socket paths, processes)
+    """
+    paths, processes = [], []
+    for i in range(count):
+        node_dir = os.path.abspath(os.path.join(directory, f"node{i}"))
+        os.makedirs(node_dir, exist_ok=True)
+        path = os.path.join(node_dir, "hbnb.sock")
+        env = dict(os.environ, HBNB_TYPE_STORAGE="file",
+                   PYTHONPATH=ROOT)
+        processes.append(subprocess.Popen(
+            [sys.executable, "-m", "models.engine.server", path],
+            cwd=node_dir, env=env, stdout=subprocess.DEVNULL))
+        paths.append(path)
+    deadline = time.monotonic() + 10
+    for path in paths:
+        while not os.path.exists(path) and time.monotonic() < deadline:
+            time.sleep(0.05)
+    return paths, processes
+
+
+def main(argv):
+    """Run count local nodes until interrupted"""
+    directory = argv[1] if len(argv) > 1 else "cluster"
+    count = int(argv[2]) if len(argv) > 2 else 3
+    paths, processes = spawn_nodes(directory, count)
+    print(f"HBNB_TYPE_STORAGE=cluster HBNB_CLUSTER_NODES={','.join(paths)}")
+    try:
+        for process in processes:
+            process.wait()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,206 @@
+#!/usr/bin/python3
+"""
+Compression module
+Streaming access to compressed storage files
+"""
+
+import gzip
+import io
+import json
+import lzma
+import zlib
+
+CODECS = ("gzip", "zlib", "lzma")
+EXTENSIONS = {
+    ".gz": "gzip",
+    ".gzip": "gzip",
+    ".zz": "zlib",
+    ".zlib": "zlib",
+    ".xz": "lzma",
+    ".lzma": "lzma",
+}
+MAGIC = (
+    (b"\x1f\x8b", "gzip"),
+    (b"\xfd7zXZ\x00", "lzma"),
+    (b"\x5d\x00\x00", "lzma"),
+)
+CHUNK_SIZE = 64 * 1024
+
+
+def codec_for(path, configured=None):
+    """Return the codec to use for path, or None for plain JSON
+
+    A configured codec ("gzip", "zlib", "lzma" or "none") wins over
+    the file extension.
+    """
+    if configured:
+        configured = configured.lower()
+        if configured == "none":
+            return None
+        if configured not in CODECS:
+            raise ValueError(f"unknown compression '{configured}'")
+        return configured
+    for extension, codec in EXTENSIONS.items():
+        if path.endswith(extension):
+            return codec
+    return None
+
+
+def detect_codec(f):
+    """Return the codec the data of the open file f was written with,
+    from its first bytes, or None for plain JSON; nothing is consumed
+
+    A zlib stream starts with 0x78 and a header checksum; JSON text
+    never starts with any of these bytes.
+    """
+    head = getattr(f, "buffer", f).peek(6)[:6]
+    if not isinstance(head, bytes):
+        return None
+    for magic, codec in MAGIC:
+        if head.startswith(magic):
+            return codec
+    if len(head) >= 2 and head[0] == 0x78 and \
+            (head[0] << 8 | head[1]) % 31 == 0:
+        return "zlib"
+    return None
+
+
+def open_compressed(path, mode, codec):
+    """Open path in text mode ("r" or "w") through codec"""
+    if codec == "gzip":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    if codec == "lzma":
+        return lzma.open(path, mode + "t", encoding="utf-8")
+    if codec == "zlib":
+        raw = ZlibWriter(path) if mode == "w" else ZlibReader(path)
+        return io.TextIOWrapper(io.BufferedReader(raw) if mode == "r"
+                                else io.BufferedWriter(raw),
+                                encoding="utf-8")
+    raise ValueError(f"unknown compression '{codec}'")
+
+
+class ZlibWriter(io.RawIOBase):
+    """Write-only stream compressing into a zlib file"""
+
+    def __init__(self, path):
+        """Open path for writing"""
+        self.__file = open(path, "wb")
+        self.__compressor = zlib.compressobj()
+
+    def writable(self):
+        """Return True"""
+        return True
+
+    def write(self, data):
+        """Compress data into the file"""
+        self.__file.write(self.__compressor.compress(data))
+        return len(data)
+
+    def close(self):
+        """Flush the compressor and close the file"""
+        if not self.closed:
+            self.__file.write(self.__compressor.flush())
+            self.__file.close()
+        super().close()
+
+
+class ZlibReader(io.RawIOBase):
+    """Read-only stream decompressing a zlib file"""
+
+    def __init__(self, path):
+        """Open path for reading"""
+        self.__file = open(path, "rb")
+        self.__decompressor = zlib.decompressobj()
+        self.__buffer = b""
+
+    def readable(self):
+        """Return True"""
+        return True
+
+    def readinto(self, buffer):
+        """Fill buffer with decompressed bytes"""
+        while not self.__buffer:
+            chunk = self.__file.read(CHUNK_SIZE)
+            if not chunk:
+                self.__buffer = self.__decompressor.flush()
+                break
+            self.__buffer = self.__decompressor.decompress(chunk)
+        size = min(len(buffer), len(self.__buffer))
+        buffer[:size] = self.__buffer[:size]
+        self.__buffer = self.__buffer[size:]
+        return size
+
+    def close(self):
+        """Close the file"""
+        if not self.closed:
+            self.__file.close()
+        super().close()
+
+
+def iter_records(f):
+    """Yield the (key, value) pairs of a JSON object read from f
+
+    Only one chunk plus the record being decoded is held in memory, so
+    large stores can be streamed out of a decompressor.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def fill():
+        """Read more text; return False at end of file"""
+        nonlocal buffer, pos, eof
+        chunk = f.read(CHUNK_SIZE)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+
+    def skip_space():
+        """Advance past whitespace, reading more text as needed"""
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos < len(buffer) or not fill():
+                return
+
+    def expect(chars):
+        """Consume and return one of chars"""
+        nonlocal pos
+        skip_space()
+        if pos >= len(buffer) or buffer[pos] not in chars:
+            raise json.JSONDecodeError(f"Expecting one of {chars!r}",
+                                       buffer, pos)
+        pos += 1
+        return buffer[pos - 1]
+
+    def value():
+        """Decode the next JSON value"""
+        nonlocal pos
+        skip_space()
+        while True:
+            try:
+                result, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof or not fill():
+                    raise
+                continue
+            if end == len(buffer) and not eof and fill():
+                continue
+            pos = end
+            return result
+
+    expect("{")
+    skip_space()
+    if pos < len(buffer) and buffer[pos] == "}":
+        return
+    while True:
+        key = value()
+        expect(":")
+        yield key, value()
+        if expect(",}") == "}":
+            return
@@ -5,6 +5,20 @@ Serializes instances to a JSON file & deserializes back
 """
 
 import json
+import os
+import threading
+import time
+from models.engine.bitmap import BitmapIndex
+from models.engine.changes import ChangeFeed
+from models.engine.compression import codec_for, detect_codec, \
+    iter_records, open_compressed
+from models.engine.indexes import HashIndex, RankedIndex, SortedIndex
+from models.engine.interning import memory_report
+from models.engine.metrics import Metrics, write_prometheus
+from models.engine.mvcc import VersionedDict
+from models.engine.query import Query, execute
+from models.engine.search import SearchIndex
+from models.engine.shared import write_snapshot
 from models.base_model import BaseModel
 from models.user import User
 from models.state import State
@@ -19,41 +33,607 @@ class FileStorage:
 
     __file_path = "file.json"
     __objects = {}
+    __classes = {
+        "BaseModel": BaseModel,
+        "User": User,
+        "State": State,
+        "City": City,
+        "Amenity": Amenity,
+        "Place": Place,
+        "Review": Review,
+    }
+    __references = (
+        ("City", "state_id", "State"),
+        ("Place", "city_id", "City"),
+        ("Place", "user_id", "User"),
+        ("Review", "place_id", "Place"),
+        ("Review", "user_id", "User"),
+    )
+    __relations = {
+        "State": {"cities": ("City", "state_id", False)},
+        "City": {"places": ("Place", "city_id", False)},
+        "User": {
+            "places": ("Place", "user_id", False),
+            "reviews": ("Review", "user_id", False),
+        },
+        "Place": {
+            "reviews": ("Review", "place_id", False),
+            "amenities": ("Amenity", "amenity_ids", True),
+        },
+    }
+    __sorted_attributes = (
+        ("Place", "price_by_night"),
+        ("Place", "max_guest"),
+    )
+    __persist_search = bool(os.getenv("HBNB_PERSIST_SEARCH"))
+    __compression = os.getenv("HBNB_FILE_COMPRESSION")
+    __watch_interval = float(os.getenv("HBNB_WATCH_INTERVAL") or 0)
+    __metrics_file = os.getenv("HBNB_METRICS_FILE")
+    __metrics_interval = float(os.getenv("HBNB_METRICS_INTERVAL") or 15)
+    __index_specs = None
+    __indexes = None
+    __class_indexes = None
+    __indexed = None
+    __partitions = None
+    __search = None
+    __changes = None
+    __mvcc = None
+    __loaded = False
+    __file_identity = None
+    __watcher = None
+    __metrics = None
+    __exporter = None
+    __unsaved = None
+
+    def __load_once(self):
+        """Load the file on first access instead of at import time
+
+        An instance whose __objects was replaced by its owner is
+        considered loaded already.
+        """
+        if not self.__loaded and \
+                self.__objects is FileStorage.__objects:
+            self.reload()
+            if self.__watch_interval:
+                self.watch(self.__watch_interval)
+            if self.__metrics_file:
+                self.export_metrics(self.__metrics_file,
+                                    self.__metrics_interval)
+
+    def __sync_indexes(self):
+        """Return the indexes, rebuilding them if __objects was replaced"""
+        self.__load_once()
+        if self.__indexes is None or self.__indexed is not self.__objects:
+            if self.__index_specs is None:
+                self.__index_specs = [
+                    (cls_name, attr, RankedIndex)
+                    for cls_name, attr, _ in self.__references
+                ] + [
+                    (cls_name, attr, SortedIndex)
+                    for cls_name, attr in self.__sorted_attributes
+                ] + [("Place", "amenity_ids", BitmapIndex)]
+            self.__indexes = {}
+            self.__class_indexes = {}
+            for cls_name, attr, kind in self.__index_specs:
+                self.__add_index(kind(cls_name, attr))
+            self.__partitions = {}
+            self.__search = None
+            self.__indexed = self.__objects
+            for key, obj in self.__objects.items():
+                self.__index_add(key, obj)
+        return self.__indexes
+
+    def __add_index(self, index):
+        """Register index so it is maintained for its class"""
+        self.__indexes[(index.cls_name, index.attr)] = index
+        self.__class_indexes.setdefault(index.cls_name, []).append(index)
+
+    def __index_add(self, key, obj):
+        """Record obj under key in every derived structure"""
+        cls_name = obj.__class__.__name__
+        partition = self.__partitions.get(cls_name)
+        if partition is None:
+            partition = self.__partitions[cls_name] = {}
+        partition[key] = None
+        for index in self.__class_indexes.get(cls_name, ()):
+            index.add(key, obj)
+        if self.__search is not None:
+            self.__search.add(key, obj)
+
+    def __index_remove(self, key):
+        """Forget key in every derived structure"""
+        cls_name = key.split(".", 1)[0]
+        self.__partitions.get(cls_name, {}).pop(key, None)
+        for index in self.__class_indexes.get(cls_name, ()):
+            index.remove(key)
+        if self.__search is not None:
+            self.__search.remove(key)
+
+    def __search_index(self):
+        """Return the full-text index, building it on first use"""
+        self.__sync_indexes()
+        if self.__search is None:
+            self.__search = SearchIndex()
+            if self.__persist_search:
+                self.__load_search()
+            for cls_name in SearchIndex.fields:
+                for key in self.partition(cls_name):
+                    self.__search.add(key, self.__objects[key])
+        return self.__search
+
+    def partition(self, cls_name):
+        """Return the keys of the cls_name objects, in insertion order"""
+        self.__sync_indexes()
+        return self.__partitions.get(cls_name, {}).keys()
+
+    def index(self, cls_name, attr):
+        """Return the index on <cls_name>.<attr>, or None"""
+        return self.__sync_indexes().get((cls_name, attr))
+
+    def create_index(self, cls_name, attr, ordered=False):
+        """Maintain a hash (or, with ordered, a sorted) index on an attr"""
+        indexes = self.__sync_indexes()
+        if (cls_name, attr) in indexes:
+            return indexes[(cls_name, attr)]
+        kind = SortedIndex if ordered else HashIndex
+        self.__index_specs.append((cls_name, attr, kind))
+        index = kind(cls_name, attr)
+        self.__add_index(index)
+        for key in self.partition(cls_name):
+            index.add(key, self.__objects[key])
+        return index
+
+    def query(self, text):
+        """Return the objects selected by a query such as
+        'Place where price_by_night < 100 order by name limit 10'
+        """
+        with self.metrics.timer("storage.query"):
+            return execute(self, Query.parse(text))[0]
+
+    def explain(self, text):
+        """Run a query and return its plan and row counters"""
+        query = Query.parse(text)
+        return execute(self, query)[1].describe(query)
+
+    def __versions(self):
+        """Return the VersionedDict wrapping the current __objects"""
+        self.__load_once()
+        if self.__mvcc is None or self.__mvcc.objects is not self.__objects:
+            previous = self.__mvcc
+            self.__mvcc = VersionedDict(self.__objects)
+            if previous is not None:
+                self.__mvcc.version = previous.version + 1
+        return self.__mvcc
+
+    def __writable(self):
+        """Return the dictionary to mutate, copying it if a snapshot
+        still reads the current version
+        """
+        objects = self.__versions().writable()
+        if objects is not self.__objects:
+            if self.__indexed is self.__objects:
+                self.__indexed = objects
+            self.__objects = objects
+        return objects
 
     def all(self):
         """Return all stored objects"""
+        self.__load_once()
         return self.__objects
 
+    def get(self, key):
+        """Return the object stored under key ("<class>.<id>"), or None"""
+        self.__load_once()
+        return self.__objects.get(key)
+
+    def get_many(self, keys):
+        """Return {key: object} for the keys that are stored"""
+        self.__load_once()
+        objects = self.__objects
+        return {key: objects[key] for key in keys if key in objects}
+
+    def snapshot(self):
+        """Return a consistent read-only view of the stored objects
+
+        Writers are never blocked by it: the first write after a
+        snapshot is opened works on a copy. Close it (or use it as a
+        context manager) once done.
+        """
+        return self.__versions().snapshot()
+
+    @property
+    def version(self):
+        """Return a counter increased by every write"""
+        return self.__versions().version
+
+    @property
+    def changes(self):
+        """Return the ChangeFeed publishing this storage's mutations"""
+        if self.__changes is None:
+            self.__changes = ChangeFeed(os.getenv("HBNB_CHANGE_LOG"))
+        return self.__changes
+
+    @property
+    def metrics(self):
+        """Return the Metrics recording this storage's operations"""
+        if self.__metrics is None:
+            self.__metrics = Metrics()
+        return self.__metrics
+
     def new(self, obj):
-        """Add new object to storage dictionary"""
+        """Add new object to storage dictionary (or re-index it)"""
         key = f"{obj.__class__.__name__}.{obj.id}"
-        self.__objects[key] = obj
+        start = time.perf_counter()
+        with self.__versions().lock:
+            created = key not in self.__objects
+            self.__put(key, obj)
+            if self.changes.active:
+                self.changes.publish("create" if created else "update",
+                                     key, obj.to_dict())
+        self.metrics.histogram("storage.new").observe(
+            time.perf_counter() - start)
+
+    def __put(self, key, obj):
+        """Store and index obj under key"""
+        self.__sync_indexes()
+        self.__writable()[key] = obj
+        self.__index_add(key, obj)
+        self.__unsaved_keys().add(key)
+
+    def __unsaved_keys(self):
+        """Return the keys added, changed or removed since the last save
+        or load
+        """
+        if self.__unsaved is None:
+            self.__unsaved = set()
+        return self.__unsaved
+
+    def referrers(self, obj, cls_name, attr):
+        """Return the cls_name objects whose attr holds obj's id"""
+        index = self.__sync_indexes()[(cls_name, attr)]
+        found = []
+        for key in index.lookup(obj.id):
+            child = self.__objects.get(key)
+            if child is not None and getattr(child, attr, None) == obj.id:
+                found.append(child)
+        return found
+
+    def dependents(self, obj):
+        """Return the objects holding a reference to obj's id"""
+        found = []
+        for cls_name, attr, target in self.__references:
+            if target == obj.__class__.__name__:
+                found.extend(self.referrers(obj, cls_name, attr))
+        return found
+
+    def related(self, obj, name):
+        """Return the objects reached from obj through relation name"""
+        return self.prefetch([obj], name).get(obj.id, [])
+
+    def ranking(self, cls_name, name):
+        """Yield (id, count) for the cls_name ids referenced through
+        relation name, most related objects first
+        """
+        relation = self.__relations.get(cls_name, {}).get(name)
+        if relation is None or relation[2]:
+            raise AttributeError(f"{cls_name} has no relation '{name}'")
+        return self.__sync_indexes()[relation[:2]].top()
+
+    def top(self, cls_name, name, k=10):
+        """Return the k cls_name objects with the most related objects
+        through relation name, as (object, count) pairs
+
+        For example top("Place", "reviews") lists the most reviewed
+        places. Counts are maintained on every write, so this does not
+        group the related objects.
+        """
+        found = []
+        if k <= 0:
+            return found
+        for ref_id, count in self.ranking(cls_name, name):
+            obj = self.__objects.get(f"{cls_name}.{ref_id}")
+            if obj is not None:
+                found.append((obj, count))
+                if len(found) == k:
+                    break
+        return found
+
+    def prefetch(self, objs, name):
+        """Resolve relation name for every object of objs in one pass
+
+        Returns a dictionary mapping each object id to its related
+        objects, so rendering a list does not look relations up per item.
+        """
+        self.__load_once()
+        result = {}
+        for obj in objs:
+            relations = self.__relations.get(obj.__class__.__name__, {})
+            if name not in relations:
+                raise AttributeError(
+                    f"{obj.__class__.__name__} has no relation '{name}'")
+            cls_name, attr, forward = relations[name]
+            if not forward:
+                result[obj.id] = self.referrers(obj, cls_name, attr)
+                continue
+            found = []
+            for ref_id in getattr(obj, attr, None) or ():
+                ref = self.__objects.get(f"{cls_name}.{ref_id}")
+                if ref is not None:
+                    found.append(ref)
+            result[obj.id] = found
+        return result
+
+    def delete(self, obj=None, cascade=False):
+        """Remove obj from storage and return the removed objects
+
+        With cascade, every object that references obj (directly or
+        through other removed objects) is removed as well. Nothing is
+        written to disk: call save() once afterwards.
+        """
+        if obj is None:
+            return []
+        with self.metrics.timer("storage.delete"), self.__versions().lock:
+            return self.__delete(obj, cascade)
+
+    def __delete(self, obj, cascade):
+        """Remove obj (and its dependents with cascade)"""
+        self.__sync_indexes()
+        removed = []
+        pending = [obj]
+        while pending:
+            current = pending.pop()
+            key = f"{current.__class__.__name__}.{current.id}"
+            if self.__objects.get(key) is not current:
+                continue
+            if cascade:
+                pending.extend(self.dependents(current))
+            del self.__writable()[key]
+            self.__index_remove(key)
+            self.__unsaved_keys().add(key)
+            if self.changes.active:
+                self.changes.publish("delete", key)
+            removed.append(current)
+        return removed
+
+    def search(self, query, cls_name=None, prefix=False, limit=None):
+        """Return the objects matching a full-text query, best first"""
+        hits = self.__search_index().search(query, cls_name, prefix, limit)
+        return [self.__objects[key] for key, _ in hits
+                if key in self.__objects]
+
+    def facets(self, all_of=(), any_of=(), none_of=()):
+        """Return the Places having every amenity id of all_of, one of
+        any_of (if given) and none of none_of, with the number of those
+        Places offering each amenity
+        """
+        index = self.__sync_indexes()[("Place", "amenity_ids")]
+        bitmap = index.bitmap(all_of, any_of, none_of)
+        places = [self.__objects[key] for key in index.keys(bitmap)]
+        return places, index.counts(bitmap)
+
+    def memory_report(self):
+        """Return per-class string memory and the bytes saved by sharing"""
+        with self.snapshot() as objects:
+            return memory_report(objects)
+
+    def perf_report(self, reset=False):
+        """Return {"operations", "counters", "objects"}: the timings and
+        byte counters of this storage's operations (see Metrics.report)
+        and the number of stored objects per class
+        """
+        report = self.metrics.report(reset)
+        report["objects"] = self.__class_counts()
+        return report
+
+    def __class_counts(self):
+        """Return the number of stored objects per class"""
+        self.__load_once()
+        if self.__indexes is not None and self.__indexed is self.__objects:
+            return {cls_name: len(keys)
+                    for cls_name, keys in self.__partitions.items() if keys}
+        counts = {}
+        with self.snapshot() as objects:
+            for key in objects:
+                cls_name = key[:key.index(".")]
+                counts[cls_name] = counts.get(cls_name, 0) + 1
+        return counts
+
+    def dump_metrics(self, path):
+        """Write perf_report() to path in the Prometheus text format"""
+        write_prometheus(path, self.perf_report())
+
+    def export_metrics(self, path, interval=15.0):
+        """Dump the metrics to path every interval seconds in a
+        background thread
+        """
+        self.stop_metrics_export()
+        stop = self.__exporter = threading.Event()
+
+        def run():
+            """Dump until stopped"""
+            while not stop.wait(interval):
+                try:
+                    self.dump_metrics(path)
+                except OSError:
+                    pass
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def stop_metrics_export(self):
+        """Stop dumping the metrics periodically"""
+        if self.__exporter is not None:
+            self.__exporter.set()
+            self.__exporter = None
 
     def save(self):
         """Serialize objects to JSON file"""
-        with open(self.__file_path, "w") as f:
-            json.dump({k: v.to_dict() for k, v in self.__objects.items()}, f)
+        lock = self.__versions().lock
+        with self.metrics.timer("storage.save"):
+            with lock:
+                snapshot = self.snapshot()
+                saving, self.__unsaved = self.__unsaved_keys(), set()
+            try:
+                with snapshot as objects:
+                    data = {k: v.to_dict() for k, v in objects.items()}
+                codec = codec_for(self.__file_path, self.__compression)
+                if codec is None:
+                    with open(self.__file_path, "w") as f:
+                        json.dump(data, f)
+                else:
+                    with open_compressed(self.__file_path, "w", codec) as f:
+                        json.dump(data, f)
+            except BaseException:
+                with lock:
+                    self.__unsaved |= saving
+                raise
+            with lock:
+                identity = self.__file_identity = self.__identity()
+        if identity is not None:
+            self.metrics.count("storage.bytes_written", identity[2])
+        if self.__persist_search:
+            self.__search_index().dump(self.__file_path + ".search")
+
+    def publish(self, path):
+        """Write a memory-mappable snapshot of every object to path for
+        reader processes (see SharedSnapshot); return its generation
+        """
+        with self.snapshot() as objects:
+            return write_snapshot(objects, path)
 
     def reload(self):
         """Deserialize JSON file back to objects"""
+        self.__loaded = True
+        identity = self.__identity()
+        with self.metrics.timer("storage.reload"):
+            try:
+                self.__load(data for _, data in self.__read())
+            except FileNotFoundError:
+                return
+        self.__file_identity = identity
+        if identity is not None:
+            self.metrics.count("storage.bytes_read", identity[2])
+
+    def __read(self):
+        """Yield the (key, serialized object) pairs of the file
+
+        The codec comes from the file's first bytes, so a store written
+        with another compression setting still loads.
+        """
+        with open(self.__file_path, "r") as f:
+            codec = detect_codec(f)
+            if codec is None:
+                yield from json.load(f).items()
+                return
+        with open_compressed(self.__file_path, "r", codec) as f:
+            yield from iter_records(f)
+
+    def __identity(self):
+        """Return the inode, modification time and size of the file"""
+        try:
+            stat = os.stat(self.__file_path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def refresh(self):
+        """Apply the changes another process wrote to the file
+
+        Only the objects added, changed or removed in the file are
+        rebuilt, and the objects this process added, changed or removed
+        since its last save or load are left alone. Returns those keys
+        as {"added", "changed", "removed"} lists, or None if the file is
+        unchanged (or was written by this process), missing or still
+        being written.
+        """
+        if not self.__loaded and self.__objects is FileStorage.__objects:
+            self.__load_once()
+            return None
+        identity = self.__identity()
+        if identity is None or identity == self.__file_identity:
+            return None
+        try:
+            with self.metrics.timer("storage.refresh"):
+                records = dict(self.__read())
+        except (OSError, ValueError):
+            return None
+        self.metrics.count("storage.bytes_read", identity[2])
+        delta = {"added": [], "changed": [], "removed": []}
+        with self.__versions().lock:
+            if identity == self.__file_identity:
+                return None
+            unsaved = self.__unsaved_keys()
+            for key, data in records.items():
+                current = self.__objects.get(key)
+                cls = self.__classes.get(data.get("__class__"))
+                if key in unsaved or cls is None or (
+                        current is not None and current.to_dict() == data):
+                    continue
+                self.new(cls.from_dict(data))
+                unsaved.discard(key)
+                delta["added" if current is None else "changed"].append(key)
+            for key in [k for k in self.__objects
+                        if k not in records and k not in unsaved]:
+                self.delete(self.__objects[key])
+                unsaved.discard(key)
+                delta["removed"].append(key)
+            self.__file_identity = identity
+        return delta
+
+    def watch(self, interval=1.0, callback=None):
+        """Poll the file every interval seconds in a background thread
+        and refresh() when it changes, calling callback(delta) after
+        each applied change
+        """
+        self.unwatch()
+        stop = self.__watcher = threading.Event()
+
+        def run():
+            """Refresh until stopped"""
+            while not stop.wait(interval):
+                delta = self.refresh()
+                if delta is not None and callback is not None:
+                    callback(delta)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def unwatch(self):
+        """Stop watching the file"""
+        if self.__watcher is not None:
+            self.__watcher.set()
+            self.__watcher = None
+
+    def restore(self, records):
+        """Replace every object with the objects serialized in records"""
+        with self.__versions().lock:
+            self.__loaded = True
+            self.__writable().clear()
+            self.__load(records)
+
+    def __load(self, records):
+        """Rebuild and store an object from each serialized record
+
+        Indexes are dropped and rebuilt in one pass on their next use.
+        """
+        with self.__versions().lock:
+            objects = self.__writable()
+            self.__unsaved = set()
+            try:
+                for obj_data in records:
+                    cls = self.__classes.get(obj_data["__class__"])
+                    if cls is not None:
+                        obj = cls.from_dict(obj_data)
+                        objects[f"{cls.__name__}.{obj.id}"] = obj
+            finally:
+                self.__indexes = None
+
+    def __load_search(self):
+        """Seed the search index from the copy saved next to the store,
+        dropping the documents that are no longer stored
+        """
         try:
-            with open(self.__file_path, "r") as f:
-                data = json.load(f)
-                for obj_data in data.values():
-                    cls_name = obj_data["__class__"]
-                    if cls_name == "BaseModel":
-                        self.new(BaseModel(**obj_data))
-                    elif cls_name == "User":
-                        self.new(User(**obj_data))
-                    elif cls_name == "State":
-                        self.new(State(**obj_data))
-                    elif cls_name == "City":
-                        self.new(City(**obj_data))
-                    elif cls_name == "Amenity":
-                        self.new(Amenity(**obj_data))
-                    elif cls_name == "Place":
-                        self.new(Place(**obj_data))
-                    elif cls_name == "Review":
-                        self.new(Review(**obj_data))
-        except FileNotFoundError:
-            pass
+            self.__search.load(self.__file_path + ".search")
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            self.__search.clear()
+        for key in self.__search.keys():
+            if key not in self.__objects:
+                self.__search.remove(key)
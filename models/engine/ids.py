@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+"""
+Ids module
+Time-ordered, compact identifiers (ULID layout)
+
+A ULID is 26 Crockford base32 characters: 48 bits of milliseconds since
+the epoch followed by 80 random bits. Ids generated in the same
+millisecond increase monotonically, so ids sort in creation order.
+Existing uuid4 ids remain valid: they are simply not time-ordered.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+LENGTH = 26
+_DECODE = {c: i for i, c in enumerate(ALPHABET)}
+_lock = threading.Lock()
+_last = [0, 0]
+
+
+def encode(value):
+    """Return the 26-character base32 form of a 128-bit integer"""
+    chars = []
+    for _ in range(LENGTH):
+        chars.append(ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+def decode(text):
+    """Return the 128-bit integer of a ULID string"""
+    value = 0
+    for char in text.upper():
+        value = (value << 5) | _DECODE[char]
+    return value
+
+
+def is_ulid(text):
+    """Return True if text has the ULID layout"""
+    return (isinstance(text, str) and len(text) == LENGTH and
+            text[0] in "01234567" and
+            all(c in _DECODE for c in text.upper()))
+
+
+def ulid(timestamp=None):
+    """Return a new ULID, monotonic within this process
+
+    With timestamp (seconds since the epoch), return a ULID for that
+    moment instead, outside the monotonic sequence.
+    """
+    if timestamp is not None:
+        random = int.from_bytes(os.urandom(10), "big")
+        return encode((int(timestamp * 1000) << 80) | random)
+    ms = int(time.time() * 1000)
+    with _lock:
+        if ms <= _last[0]:
+            ms = _last[0]
+            random = _last[1] + 1
+            if random >> 80:
+                ms += 1
+                random = int.from_bytes(os.urandom(10), "big")
+        else:
+            random = int.from_bytes(os.urandom(10), "big")
+        _last[0], _last[1] = ms, random
+    return encode((ms << 80) | random)
+
+
+def timestamp(text):
+    """Return the creation datetime encoded in a ULID, or None"""
+    if not is_ulid(text):
+        return None
+    return datetime.fromtimestamp((decode(text) >> 80) / 1000)
+
+
+def lower_bound(moment):
+    """Return the smallest ULID that can be generated at moment
+
+    Every id created at or after moment sorts >= this value.
+    """
+    if isinstance(moment, datetime):
+        moment = moment.timestamp()
+    return encode(int(moment * 1000) << 80)
@@ -0,0 +1,251 @@
+#!/usr/bin/python3
+"""
+Indexes module
+Secondary indexes maintained by the storage engine
+"""
+
+from bisect import bisect_left, bisect_right, insort
+
+
+class HashIndex:
+    """Maps the values of one attribute of one class to object keys"""
+
+    def __init__(self, cls_name, attr):
+        """Initialize an empty index on <cls_name>.<attr>"""
+        self.cls_name = cls_name
+        self.attr = attr
+        self.__entries = {}
+        self.__values = {}
+
+    def __len__(self):
+        """Return the number of indexed objects"""
+        return len(self.__values)
+
+    def add(self, key, obj):
+        """Index obj under key, replacing any previous entry for key"""
+        if obj.__class__.__name__ != self.cls_name:
+            return
+        value = getattr(obj, self.attr, None)
+        if key in self.__values:
+            if self.__values[key] == value:
+                return
+            self.remove(key)
+        if value is None or value == "":
+            return
+        try:
+            self.__entries.setdefault(value, set()).add(key)
+        except TypeError:
+            return
+        self.__values[key] = value
+
+    def remove(self, key):
+        """Drop the entry for key if there is one"""
+        if key not in self.__values:
+            return
+        value = self.__values.pop(key)
+        keys = self.__entries[value]
+        keys.discard(key)
+        if not keys:
+            del self.__entries[value]
+
+    def lookup(self, value):
+        """Return the keys of the objects whose attribute equals value"""
+        try:
+            return set(self.__entries.get(value, ()))
+        except TypeError:
+            return set()
+
+    def get(self, key):
+        """Return the value indexed for key, or None"""
+        return self.__values.get(key)
+
+    def count(self, value):
+        """Return how many objects have an attribute equal to value"""
+        try:
+            return len(self.__entries.get(value, ()))
+        except TypeError:
+            return 0
+
+    def clear(self):
+        """Drop every entry"""
+        self.__entries.clear()
+        self.__values.clear()
+
+
+class RankedIndex(HashIndex):
+    """Hash index that also ranks its values by number of objects
+
+    Values are kept in buckets by count, and the distinct counts in a
+    sorted list, so adding or removing an object moves one value to the
+    neighbouring bucket and top(k) reads k values from the largest
+    buckets down.
+    """
+
+    def __init__(self, cls_name, attr):
+        """Initialize an empty index on <cls_name>.<attr>"""
+        super().__init__(cls_name, attr)
+        self.__counts = {}
+        self.__buckets = {}
+        self.__levels = []
+
+    def add(self, key, obj):
+        """Index obj under key, replacing any previous entry for key"""
+        previous = self.get(key)
+        super().add(key, obj)
+        value = self.get(key)
+        if value != previous:
+            self.__rerank(previous)
+            self.__rerank(value)
+
+    def remove(self, key):
+        """Drop the entry for key if there is one"""
+        value = self.get(key)
+        super().remove(key)
+        self.__rerank(value)
+
+    def __rerank(self, value):
+        """Move value to the bucket of its current count"""
+        if value is None:
+            return
+        old = self.__counts.get(value, 0)
+        new = self.count(value)
+        if old == new:
+            return
+        if old:
+            bucket = self.__buckets[old]
+            del bucket[value]
+            if not bucket:
+                del self.__buckets[old]
+                del self.__levels[bisect_left(self.__levels, old)]
+        if new:
+            self.__counts[value] = new
+            bucket = self.__buckets.get(new)
+            if bucket is None:
+                bucket = self.__buckets[new] = {}
+                insort(self.__levels, new)
+            bucket[value] = None
+        else:
+            del self.__counts[value]
+
+    def top(self):
+        """Yield (value, count) pairs, most frequent values first
+
+        Consuming k pairs costs O(k): stop iterating once done.
+        """
+        for level in reversed(self.__levels):
+            for value in self.__buckets[level]:
+                yield value, level
+
+    def clear(self):
+        """Drop every entry"""
+        super().clear()
+        self.__counts.clear()
+        self.__buckets.clear()
+        self.__levels.clear()
+
+
+class SortedIndex:
+    """Keeps the numeric values of one attribute of one class in order"""
+
+    def __init__(self, cls_name, attr):
+        """Initialize an empty index on <cls_name>.<attr>"""
+        self.cls_name = cls_name
+        self.attr = attr
+        self.__entries = []
+        self.__values = {}
+
+    def __len__(self):
+        """Return the number of indexed objects"""
+        return len(self.__values)
+
+    def __contains__(self, key):
+        """Return True if key is indexed"""
+        return key in self.__values
+
+    def add(self, key, obj):
+        """Index obj under key, replacing any previous entry for key"""
+        if obj.__class__.__name__ != self.cls_name:
+            return
+        value = to_number(getattr(obj, self.attr, None))
+        if key in self.__values:
+            if self.__values[key] == value:
+                return
+            self.remove(key)
+        if value is None:
+            return
+        insort(self.__entries, (value, key))
+        self.__values[key] = value
+
+    def remove(self, key):
+        """Drop the entry for key if there is one"""
+        if key not in self.__values:
+            return
+        entry = (self.__values.pop(key), key)
+        i = bisect_left(self.__entries, entry)
+        del self.__entries[i]
+
+    def __bounds(self, op, value):
+        """Return the slice of entries satisfying <attr> <op> <value>"""
+        if op == "<":
+            return 0, bisect_left(self.__entries, (value,))
+        if op == "<=":
+            return 0, bisect_right(self.__entries, (value, _TOP))
+        if op == ">":
+            return bisect_right(self.__entries, (value, _TOP)), None
+        if op == ">=":
+            return bisect_left(self.__entries, (value,)), None
+        return (bisect_left(self.__entries, (value,)),
+                bisect_right(self.__entries, (value, _TOP)))
+
+    def count(self, op, value):
+        """Return how many keys satisfy <attr> <op> <value>"""
+        start, stop = self.__bounds(op, value)
+        return (len(self.__entries) if stop is None else stop) - start
+
+    def range(self, op, value):
+        """Return the keys satisfying <attr> <op> <value>, in order"""
+        start, stop = self.__bounds(op, value)
+        return [key for _, key in self.__entries[start:stop]]
+
+    def ordered(self, descending=False):
+        """Yield every indexed key ordered by value"""
+        entries = reversed(self.__entries) if descending else self.__entries
+        for _, key in entries:
+            yield key
+
+    def clear(self):
+        """Drop every entry"""
+        self.__entries.clear()
+        self.__values.clear()
+
+
+class _Top:
+    """Sorts after every string, to bound searches on (value, key)"""
+
+    def __lt__(self, other):
+        """Never smaller than anything"""
+        return False
+
+    def __gt__(self, other):
+        """Always greater than anything else"""
+        return other is not self
+
+
+_TOP = _Top()
+
+
+def to_number(value):
+    """Return value as an int or float, or None if it is not numeric"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        try:
+            value = int(value)
+        except ValueError:
+            try:
+                value = float(value)
+            except ValueError:
+                return None
+    if not isinstance(value, (int, float)) or value != value:
+        return None
+    return value
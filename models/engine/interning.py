@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+"""
+Interning module
+Bounded table sharing one string object per repeated value
+"""
+
+import os
+import sys
+
+
+class InternTable:
+    """Maps each string to a canonical copy, up to maxsize entries
+
+    Once full, the table stops growing: known strings are still shared
+    and new ones are returned unchanged.
+    """
+
+    short_length = 16
+
+    def __init__(self, maxsize=1 << 20):
+        """Initialize an empty table holding at most maxsize strings"""
+        self.maxsize = maxsize
+        self.__table = {}
+
+    def __len__(self):
+        """Return the number of interned strings"""
+        return len(self.__table)
+
+    def intern(self, value):
+        """Return the canonical copy of value"""
+        canonical = self.__table.get(value)
+        if canonical is not None:
+            return canonical
+        if len(self.__table) < self.maxsize:
+            self.__table[value] = value
+        return value
+
+    def clear(self):
+        """Drop every entry"""
+        self.__table.clear()
+
+
+table = InternTable(int(os.getenv("HBNB_INTERN_SIZE", 1 << 20)))
+
+
+def memory_report(objects):
+    """Return per-class string memory with and without sharing
+
+    objects maps storage keys to instances. For each class, "bytes" is
+    what its string attributes would take as separate objects and
+    "shared_bytes" what they take once identical objects are counted
+    once (across the whole store).
+    """
+    seen = set()
+    report = {}
+    for key, obj in objects.items():
+        cls_name = key.split(".", 1)[0]
+        entry = report.setdefault(cls_name, {
+            "objects": 0, "strings": 0, "bytes": 0, "shared_bytes": 0,
+        })
+        entry["objects"] += 1
+        for value in obj.__dict__.values():
+            values = value if isinstance(value, list) else (value,)
+            for item in values:
+                if not isinstance(item, str):
+                    continue
+                size = sys.getsizeof(item)
+                entry["strings"] += 1
+                entry["bytes"] += size
+                if id(item) not in seen:
+                    seen.add(id(item))
+                    entry["shared_bytes"] += size
+    for entry in report.values():
+        entry["saved_bytes"] = entry["bytes"] - entry["shared_bytes"]
+    return report
@@ -0,0 +1,230 @@
+#!/usr/bin/python3
+"""
+Metrics module
+Operation counts, latency histograms and byte counters of a process
+
+Timings go into fixed buckets (upper bounds in seconds), so recording
+one costs a clock read and a bisect, reports from several processes
+can be added up, and quantiles are estimated from the buckets. A
+report is a plain dictionary that can be sent over the storage
+protocol or rendered in the Prometheus text format.
+"""
+
+import bisect
+import os
+import threading
+import time
+
+BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+PREFIX = "hbnb"
+
+
+class Histogram:
+    """Count, error count, sum and bucket counts of an operation's
+    durations
+    """
+
+    __slots__ = ("count", "errors", "sum", "buckets", "lock")
+
+    def __init__(self):
+        """Initialize an empty histogram"""
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        """Forget every recorded duration"""
+        self.count = 0
+        self.errors = 0
+        self.sum = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def observe(self, seconds, error=False):
+        """Record one duration of seconds"""
+        with self.lock:
+            self.count += 1
+            self.sum += seconds
+            self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+            if error:
+                self.errors += 1
+
+    def entry(self, reset=False):
+        """Return the histogram as a dictionary, then clear it if reset
+        is set
+        """
+        with self.lock:
+            entry = {"count": self.count, "errors": self.errors,
+                     "sum": self.sum, "buckets": list(self.buckets)}
+            if reset:
+                self.clear()
+        return entry
+
+
+class Timer:
+    """Context manager recording the duration of one operation"""
+
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        """Initialize a timer of the operation name"""
+        self.metrics = metrics
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        """Start timing"""
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        """Record the duration, and an error if the operation raised"""
+        self.metrics.observe(self.name, time.perf_counter() - self.start,
+                             exc_type is not None)
+
+
+class Metrics:
+    """Thread-safe registry of operation timings and counters"""
+
+    def __init__(self):
+        """Initialize an empty registry"""
+        self.__lock = threading.Lock()
+        self.__operations = {}
+        self.__counters = {}
+
+    def histogram(self, name):
+        """Return the Histogram of the operation name"""
+        histogram = self.__operations.get(name)
+        if histogram is None:
+            with self.__lock:
+                histogram = self.__operations.setdefault(name, Histogram())
+        return histogram
+
+    def timer(self, name):
+        """Return a context manager timing the operation name"""
+        return Timer(self, name)
+
+    def observe(self, name, seconds, error=False):
+        """Record one name operation that took seconds"""
+        self.histogram(name).observe(seconds, error)
+
+    def count(self, name, amount=1):
+        """Add amount to the counter name"""
+        with self.__lock:
+            self.__counters[name] = self.__counters.get(name, 0) + amount
+
+    def report(self, reset=False):
+        """Return {"operations", "counters"}: every timing (count,
+        errors, sum of seconds, per-bucket counts) and counter, then
+        clear them if reset is set
+        """
+        with self.__lock:
+            operations = list(self.__operations.items())
+            counters = dict(self.__counters)
+            if reset:
+                self.__counters.clear()
+        return {
+            "operations": {name: histogram.entry(reset)
+                           for name, histogram in operations},
+            "counters": counters,
+        }
+
+
+def merge(reports):
+    """Return the sum of several reports"""
+    total = {"operations": {}, "counters": {}, "objects": {}}
+    for report in reports:
+        for name, entry in report.get("operations", {}).items():
+            into = total["operations"].get(name)
+            if into is None:
+                total["operations"][name] = dict(
+                    entry, buckets=list(entry["buckets"]))
+                continue
+            for field in ("count", "errors", "sum"):
+                into[field] += entry[field]
+            into["buckets"] = [a + b for a, b in zip(into["buckets"],
+                                                     entry["buckets"])]
+        for section in ("counters", "objects"):
+            for name, value in report.get(section, {}).items():
+                total[section][name] = total[section].get(name, 0) + value
+    return total
+
+
+def quantile(entry, fraction):
+    """Return an estimate of the fraction quantile of an operation's
+    durations, interpolated within its bucket
+    """
+    if not entry["count"]:
+        return 0.0
+    rank = fraction * entry["count"]
+    seen = 0
+    for i, count in enumerate(entry["buckets"]):
+        if count and seen + count >= rank:
+            if i == len(BUCKETS):
+                return BUCKETS[-1]
+            lower = BUCKETS[i - 1] if i else 0.0
+            return lower + (BUCKETS[i] - lower) * (rank - seen) / count
+        seen += count
+    return BUCKETS[-1]
+
+
+def label(value):
+    """Return value escaped for a Prometheus label"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"') \
+        .replace("\n", "\\n")
+
+
+def metric_name(name):
+    """Return a counter name as a Prometheus metric name"""
+    return PREFIX + "_" + "".join(c if c.isalnum() else "_" for c in name)
+
+
+def prometheus(report):
+    """Return report in the Prometheus text exposition format"""
+    lines = []
+    operations = report.get("operations", {})
+    if operations:
+        name = f"{PREFIX}_operation_duration_seconds"
+        lines.append(f"# HELP {name} Duration of storage and console "
+                     f"operations.")
+        lines.append(f"# TYPE {name} histogram")
+        for operation, entry in sorted(operations.items()):
+            op = label(operation)
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ("+Inf",), entry["buckets"]):
+                cumulative += count
+                lines.append(f'{name}_bucket{{operation="{op}",'
+                             f'le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_sum{{operation="{op}"}} {entry["sum"]!r}')
+            lines.append(f'{name}_count{{operation="{op}"}} '
+                         f'{entry["count"]}')
+        name = f"{PREFIX}_operation_errors_total"
+        lines.append(f"# HELP {name} Operations that raised an error.")
+        lines.append(f"# TYPE {name} counter")
+        for operation, entry in sorted(operations.items()):
+            lines.append(f'{name}{{operation="{label(operation)}"}} '
+                         f'{entry["errors"]}')
+    for counter, value in sorted(report.get("counters", {}).items()):
+        name = metric_name(counter) + "_total"
+        lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name} {value}")
+    objects = report.get("objects")
+    if objects:
+        name = f"{PREFIX}_objects"
+        lines.append(f"# HELP {name} Stored objects per class.")
+        lines.append(f"# TYPE {name} gauge")
+        for cls_name, count in sorted(objects.items()):
+            lines.append(f'{name}{{class="{label(cls_name)}"}} {count}')
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path, report):
+    """Write report to path in the Prometheus text format, atomically
+    so that a collector never reads a partial file
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(prometheus(report))
+    os.replace(tmp_path, path)
@@ -0,0 +1,93 @@
+#!/usr/bin/python3
+"""
+MVCC module
+Copy-on-write versions of the storage dictionary for snapshot reads
+"""
+
+import threading
+from collections.abc import Mapping
+
+
+class VersionedDict:
+    """Owns the live objects dictionary and hands out snapshots
+
+    Opening a snapshot only pins the current dictionary. The first write
+    after that copies it, so the snapshot keeps the old version while
+    writers move on. A version is freed as soon as no snapshot holds it.
+    """
+
+    def __init__(self, objects):
+        """Initialize with the live dictionary objects"""
+        self.objects = objects
+        self.version = 0
+        self.lock = threading.RLock()
+        self.__pins = 0
+
+    def writable(self):
+        """Return the live dictionary, copying it if a snapshot holds it"""
+        if self.__pins:
+            self.objects = dict(self.objects)
+            self.__pins = 0
+        self.version += 1
+        return self.objects
+
+    def snapshot(self):
+        """Return a read-only Snapshot of the current version"""
+        with self.lock:
+            self.__pins += 1
+            return Snapshot(self, self.objects, self.version)
+
+    def release(self, objects):
+        """Unpin objects once a snapshot of it is closed"""
+        with self.lock:
+            if objects is self.objects and self.__pins:
+                self.__pins -= 1
+
+    @property
+    def pinned(self):
+        """Return the number of open snapshots on the live version"""
+        return self.__pins
+
+
+class Snapshot(Mapping):
+    """Read-only, consistent view of the stored objects at one version"""
+
+    def __init__(self, owner, objects, version):
+        """Initialize a snapshot of objects taken at version"""
+        self.__owner = owner
+        self.__objects = objects
+        self.version = version
+
+    def __getitem__(self, key):
+        """Return the object stored under key"""
+        return self.__objects[key]
+
+    def __iter__(self):
+        """Iterate over the keys"""
+        return iter(self.__objects)
+
+    def __len__(self):
+        """Return the number of objects"""
+        return len(self.__objects)
+
+    def __contains__(self, key):
+        """Return True if key exists in this version"""
+        return key in self.__objects
+
+    def close(self):
+        """Release the snapshot so its version can be freed"""
+        if self.__owner is not None:
+            self.__owner.release(self.__objects)
+            self.__owner = None
+
+    def __enter__(self):
+        """Return the snapshot itself"""
+        return self
+
+    def __exit__(self, *exc):
+        """Close the snapshot"""
+        self.close()
+
+    def __del__(self):
+        """Close the snapshot when it is garbage-collected"""
+        self.close()
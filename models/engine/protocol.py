@@ -0,0 +1,72 @@
+#!/usr/bin/python3
+"""
+Protocol module
+Framing shared by the storage server and its clients
+
+Every message is a 9-byte header (payload length, request id, code)
+followed by a compact JSON payload. A request's code is the operation
+and its payload the list of arguments; a response echoes the request
+id, with code OK and the result or code ERROR and [error type, message].
+Clients may send several requests before reading: responses come back
+in request order.
+"""
+
+import json
+import struct
+
+HEADER = struct.Struct("!IIB")
+OK = 0
+ERROR = 1
+OPERATIONS = (
+    "ping", "version", "all", "get", "new", "delete", "save", "reload",
+    "query", "explain", "search", "prefetch", "top", "facets",
+    "memory_report", "ranking", "changes", "snapshot", "status",
+    "promote", "perf_report",
+)
+CODES = {name: code for code, name in enumerate(OPERATIONS, 1)}
+
+
+class ProtocolError(ConnectionError):
+    """Raised on a malformed or truncated message"""
+
+
+class RemoteError(RuntimeError):
+    """Raised for a server-side error that has no local equivalent"""
+
+
+class SnapshotRequired(LookupError):
+    """Raised when a follower cannot continue from its position and
+    must start again from a snapshot
+    """
+
+
+def encode(value):
+    """Return value as compact JSON bytes"""
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def decode(payload):
+    """Return the value of JSON bytes"""
+    return json.loads(payload.decode("utf-8")) if payload else None
+
+
+def pack(request_id, code, value):
+    """Return the bytes of one message"""
+    payload = encode(value)
+    return HEADER.pack(len(payload), request_id, code) + payload
+
+
+def read_message(stream):
+    """Return (request id, code, value) read from a binary stream, or
+    None if the peer closed the connection between messages
+    """
+    header = stream.read(HEADER.size)
+    if not header:
+        return None
+    if len(header) < HEADER.size:
+        raise ProtocolError("truncated header")
+    length, request_id, code = HEADER.unpack(header)
+    payload = stream.read(length)
+    if len(payload) < length:
+        raise ProtocolError("truncated payload")
+    return request_id, code, decode(payload)
@@ -0,0 +1,297 @@
+#!/usr/bin/python3
+"""
+Query module
+Parses and plans filter queries such as
+    Place where price_by_night < 100 and city_id == "..." order by
+    price_by_night desc limit 20
+"""
+
+import operator
+import re
+from models.engine.indexes import HashIndex, SortedIndex, to_number
+
+
+class QueryError(ValueError):
+    """Raised when a query cannot be parsed"""
+
+
+class Query:
+    """A parsed query: class, conditions, ordering and limit"""
+
+    operators = {
+        "==": operator.eq,
+        "!=": operator.ne,
+        "<": operator.lt,
+        "<=": operator.le,
+        ">": operator.gt,
+        ">=": operator.ge,
+    }
+    __token = re.compile(r'''\s*(?:
+        (?P<string>"(?:[^"\\]|\\.)*")
+        |(?P<op>==|!=|<=|>=|<|>)
+        |(?P<word>[^\s"<>=!]+)
+    )''', re.VERBOSE)
+
+    def __init__(self, cls_name=None, conditions=(), order_by=None,
+                 descending=False, limit=None):
+        """Initialize a query"""
+        self.cls_name = cls_name
+        self.conditions = list(conditions)
+        self.order_by = order_by
+        self.descending = descending
+        self.limit = limit
+
+    @classmethod
+    def tokenize(cls, text):
+        """Split text into (kind, value) tokens"""
+        tokens = []
+        pos = 0
+        text = text.rstrip()
+        while pos < len(text):
+            match = cls.__token.match(text, pos)
+            if not match or match.end() == pos:
+                raise QueryError(f"unexpected input at '{text[pos:]}'")
+            kind = match.lastgroup
+            value = match.group(kind)
+            if kind == "string":
+                value = re.sub(r'\\(.)', r'\1', value[1:-1])
+            tokens.append((kind, value))
+            pos = match.end()
+        return tokens
+
+    @classmethod
+    def parse(cls, text):
+        """Build a Query from its text form"""
+        tokens = cls.tokenize(text)
+        query = cls()
+        i = 0
+
+        def word(n):
+            """Return token n lower-cased if it is a bare word"""
+            if n < len(tokens) and tokens[n][0] == "word":
+                return tokens[n][1].lower()
+            return None
+
+        if tokens and word(0) not in ("where", "order", "limit"):
+            query.cls_name = tokens[0][1]
+            i = 1
+        if word(i) == "where":
+            i += 1
+            while True:
+                if i + 3 > len(tokens):
+                    raise QueryError("incomplete condition")
+                attr, op, value = tokens[i:i + 3]
+                if attr[0] != "word" or op[0] != "op":
+                    raise QueryError(f"invalid condition near '{attr[1]}'")
+                if value[0] == "op":
+                    raise QueryError(f"missing value after '{op[1]}'")
+                literal = value[1]
+                if value[0] == "word":
+                    number = to_number(literal)
+                    literal = literal if number is None else number
+                query.conditions.append((attr[1], op[1], literal))
+                i += 3
+                if word(i) != "and":
+                    break
+                i += 1
+        if word(i) == "order":
+            if word(i + 1) != "by" or word(i + 2) is None:
+                raise QueryError("expected 'order by <attribute>'")
+            query.order_by = tokens[i + 2][1]
+            i += 3
+            if word(i) in ("asc", "desc"):
+                query.descending = word(i) == "desc"
+                i += 1
+        if word(i) == "limit":
+            if i + 1 >= len(tokens):
+                raise QueryError("missing limit")
+            limit = to_number(tokens[i + 1][1])
+            if not isinstance(limit, int) or limit < 0:
+                raise QueryError("limit must be a non-negative integer")
+            query.limit = limit
+            i += 2
+        if i != len(tokens):
+            raise QueryError(f"unexpected '{tokens[i][1]}'")
+        return query
+
+    def matches(self, obj, condition):
+        """Return True if obj satisfies condition
+
+        A numeric literal compares numerically against attribute values
+        that can be read as numbers; any other literal compares as text.
+        """
+        attr, op, value = condition
+        if not hasattr(obj, attr):
+            return False
+        current = getattr(obj, attr)
+        if isinstance(value, str):
+            current = str(current)
+        else:
+            current = to_number(current)
+            if current is None:
+                return False
+        return self.operators[op](current, value)
+
+    def __str__(self):
+        """Return the text form of the query"""
+        parts = [self.cls_name] if self.cls_name else []
+        if self.conditions:
+            parts.append("where " + " and ".join(
+                format_condition(c) for c in self.conditions))
+        if self.order_by:
+            parts.append(f"order by {self.order_by} "
+                         f"{'desc' if self.descending else 'asc'}")
+        if self.limit is not None:
+            parts.append(f"limit {self.limit}")
+        return " ".join(parts)
+
+
+def format_condition(condition):
+    """Return the text form of an (attr, op, value) condition"""
+    attr, op, value = condition
+    if isinstance(value, str):
+        value = '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+    return f"{attr} {op} {value}"
+
+
+class Plan:
+    """The access path chosen for a query and its execution counters"""
+
+    def __init__(self, access, cost, keys, condition=None, index=None):
+        """Initialize a plan reading keys through access"""
+        self.access = access
+        self.cost = cost
+        self.keys = keys
+        self.condition = condition
+        self.index = index
+        self.ordered = False
+        self.examined = 0
+        self.returned = 0
+
+    def describe(self, query):
+        """Return the plan as a dictionary"""
+        return {
+            "access": self.access,
+            "index": (f"{self.index.cls_name}.{self.index.attr}"
+                      if self.index is not None else None),
+            "condition": (format_condition(self.condition)
+                          if self.condition else None),
+            "filter": [format_condition(c) for c in query.conditions
+                       if c is not self.condition],
+            "order_by": query.order_by,
+            "ordered_by_index": self.ordered,
+            "limit": query.limit,
+            "estimated_rows": self.cost,
+            "rows_examined": self.examined,
+            "rows_returned": self.returned,
+        }
+
+
+def plan(storage, query, objects=None):
+    """Return the cheapest Plan for query over storage
+
+    Candidates are a key lookup on id, a hash or sorted index on a
+    condition, the class partition and, without a class, a full scan.
+    """
+    if objects is None:
+        objects = storage.all()
+    if not query.cls_name:
+        return Plan("full scan", len(objects), lambda: list(objects))
+    partition = storage.partition(query.cls_name)
+    best = Plan("class partition", len(partition), lambda: list(partition))
+    for condition in query.conditions:
+        attr, op, value = condition
+        candidate = None
+        if attr == "id" and op == "==" and isinstance(value, str):
+            key = f"{query.cls_name}.{value}"
+            candidate = Plan("key lookup", 1,
+                             lambda key=key: [key] if key in objects else [],
+                             condition)
+        index = storage.index(query.cls_name, attr)
+        if isinstance(index, HashIndex) and op == "==" and \
+                isinstance(value, str):
+            keys = index.lookup(value)
+            candidate = Plan("hash index", len(keys),
+                             lambda keys=keys: list(keys), condition, index)
+        elif isinstance(index, SortedIndex) and op != "!=" and \
+                not isinstance(value, str):
+            candidate = Plan("sorted index", index.count(op, value),
+                             lambda i=index, o=op, v=value: i.range(o, v),
+                             condition, index)
+        if candidate is not None and candidate.cost < best.cost:
+            best = candidate
+    if best.access == "class partition" and query.order_by and \
+            query.limit is not None:
+        index = storage.index(query.cls_name, query.order_by)
+        if isinstance(index, SortedIndex):
+            best.access = "sorted index scan"
+            best.index = index
+            best.ordered = True
+    return best
+
+
+def execute(storage, query):
+    """Run query against storage and return (objects, plan)
+
+    Rows are read from a snapshot, so concurrent writes neither block
+    the query nor show up half-applied in its results.
+    """
+    with storage.snapshot() as objects:
+        return _run(storage, query, objects)
+
+
+def _run(storage, query, objects):
+    """Execute query over the objects of a snapshot"""
+    chosen = plan(storage, query, objects)
+    prefix = f"{query.cls_name}." if query.cls_name else ""
+    conditions = [c for c in query.conditions if c is not chosen.condition]
+
+    def accept(key):
+        """Return the object for key if it satisfies the query"""
+        chosen.examined += 1
+        obj = objects.get(key)
+        if obj is None or not key.startswith(prefix):
+            return None
+        if all(query.matches(obj, c) for c in conditions):
+            return obj
+        return None
+
+    if chosen.ordered:
+        results = []
+        for key in chosen.index.ordered(query.descending):
+            if len(results) >= query.limit:
+                break
+            obj = accept(key)
+            if obj is not None:
+                results.append(obj)
+        if len(results) < query.limit:
+            rest = [obj for obj in map(accept, [
+                k for k in chosen.keys() if k not in chosen.index])
+                if obj is not None]
+            results.extend(sort_objects(rest, query.order_by,
+                                        query.descending))
+    else:
+        results = [obj for obj in map(accept, chosen.keys())
+                   if obj is not None]
+        if query.order_by:
+            results = sort_objects(results, query.order_by,
+                                   query.descending)
+    if query.limit is not None:
+        results = results[:query.limit]
+    chosen.returned = len(results)
+    return results, chosen
+
+
+def sort_objects(objs, attr, descending=False):
+    """Sort objs on attr: numbers first, then any other value as text"""
+    numbers = []
+    others = []
+    for obj in objs:
+        value = to_number(getattr(obj, attr, None))
+        if value is None:
+            others.append((str(getattr(obj, attr, "")), obj))
+        else:
+            numbers.append((value, obj))
+    numbers.sort(key=lambda item: item[0], reverse=descending)
+    others.sort(key=lambda item: item[0], reverse=descending)
+    return [obj for _, obj in numbers] + [obj for _, obj in others]
@@ -0,0 +1,212 @@
+#!/usr/bin/python3
+"""
+Replication module
+Primary/follower replication of a storage server
+
+The primary keeps its recent change events (ReplicationLog) and hands
+them out by sequence number. A Follower polls them into its own
+FileStorage, starting from a full snapshot, and can be promoted to
+primary when the old one is gone.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from models.engine.client_storage import ClientStorage
+from models.engine.protocol import SnapshotRequired
+from models.base_model import BaseModel
+from models.user import User
+from models.state import State
+from models.city import City
+from models.amenity import Amenity
+from models.place import Place
+from models.review import Review
+
+
+class ReplicationLog:
+    """The last maxlen events of a ChangeFeed, readable by seq
+
+    Events must be published one at a time, as the storage server
+    does, so that they arrive in sequence order.
+    """
+
+    def __init__(self, feed, maxlen=10000, epoch=None):
+        """Start recording the events of feed"""
+        self.feed = feed
+        self.epoch = epoch or uuid.uuid4().hex
+        self.seq = feed.seq
+        self.__events = deque(maxlen=maxlen)
+        self.__changed = threading.Condition()
+        feed.subscribe(self.__append)
+
+    def __append(self, event):
+        """Record event and wake up the waiting readers"""
+        with self.__changed:
+            self.__events.append(event)
+            self.seq = event["seq"]
+            self.__changed.notify_all()
+
+    def since(self, seq, timeout=0, epoch=None):
+        """Return the events after seq, waiting up to timeout seconds
+        for one if there are none yet
+
+        Raises SnapshotRequired if the events were already dropped, or
+        if seq or epoch belong to another history.
+        """
+        with self.__changed:
+            if epoch != self.epoch or seq > self.seq:
+                raise SnapshotRequired(f"resync from epoch {self.epoch}")
+            if timeout:
+                self.__changed.wait_for(lambda: self.seq > seq, timeout)
+            if self.seq == seq:
+                return []
+            if not self.__events or self.__events[0]["seq"] > seq + 1:
+                raise SnapshotRequired(f"events after {seq} are gone")
+            start = seq + 1 - self.__events[0]["seq"]
+            return [self.__events[i]
+                    for i in range(start, len(self.__events))]
+
+    def restart(self):
+        """Start a new epoch with no events, after the store was
+        replaced without publishing events (reload or restore), so that
+        every follower resyncs from a snapshot
+        """
+        with self.__changed:
+            self.epoch = uuid.uuid4().hex
+            self.seq = self.feed.seq
+            self.__events.clear()
+            self.__changed.notify_all()
+
+    def close(self):
+        """Stop recording events"""
+        self.feed.unsubscribe(self.__append)
+
+
+class Follower:
+    """Keeps a FileStorage in sync with a primary storage server"""
+
+    __classes = {
+        "BaseModel": BaseModel,
+        "User": User,
+        "State": State,
+        "City": City,
+        "Amenity": Amenity,
+        "Place": Place,
+        "Review": Review,
+    }
+
+    def __init__(self, storage, primary_path, checkpoint=None,
+                 interval=1.0, lock=None):
+        """Initialize a follower of the server on primary_path
+
+        checkpoint is a file recording the epoch and seq of the saved
+        store, so that a restart only needs the events since then.
+        """
+        self.storage = storage
+        self.primary_path = primary_path
+        self.primary = ClientStorage(primary_path, pool_size=1)
+        self.checkpoint = checkpoint
+        self.interval = interval
+        self.lock = lock or threading.RLock()
+        self.epoch = None
+        self.seq = None
+        self.primary_seq = None
+        self.delay = 0.0
+        self.connected = False
+        self.__stop = threading.Event()
+        self.__thread = None
+        if checkpoint and os.path.exists(checkpoint):
+            with open(checkpoint, "r") as f:
+                state = json.load(f)
+            self.epoch, self.seq = state["epoch"], state["seq"]
+
+    def start(self):
+        """Follow the primary in a background thread"""
+        self.__stop.clear()
+        self.__thread = threading.Thread(target=self.run, daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        """Stop following"""
+        self.__stop.set()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+        self.primary.close()
+
+    def run(self):
+        """Apply the primary's changes until stopped"""
+        while not self.__stop.is_set():
+            try:
+                self.poll(self.interval)
+                self.connected = True
+            except OSError:
+                self.connected = False
+                self.__stop.wait(self.interval)
+
+    def poll(self, timeout=0):
+        """Apply the events published since the last poll, after a
+        snapshot if the follower has no usable position
+        """
+        if self.seq is None:
+            self.resync()
+            return
+        try:
+            reply = self.primary.replication_changes(self.seq, timeout,
+                                                     self.epoch)
+        except SnapshotRequired:
+            self.resync()
+            return
+        with self.lock:
+            for event in reply["events"]:
+                self.apply(event)
+        self.primary_seq = reply["seq"]
+
+    def resync(self):
+        """Replace the store with a snapshot of the primary"""
+        snapshot = self.primary.replication_snapshot()
+        with self.lock:
+            self.storage.restore(snapshot["objects"])
+            self.epoch = snapshot["epoch"]
+            self.seq = self.primary_seq = snapshot["seq"]
+            self.storage.changes.seq = self.seq
+
+    def apply(self, event):
+        """Apply one change event"""
+        if event["op"] == "delete":
+            obj = self.storage.all().get(event["key"])
+            if obj is not None:
+                self.storage.delete(obj)
+        else:
+            data = event["data"]
+            self.storage.new(
+                self.__classes[data["__class__"]].from_dict(data))
+        self.seq = event["seq"]
+        self.delay = max(0.0, time.time() - event["time"])
+
+    def save(self):
+        """Write the store and the checkpoint of its position"""
+        with self.lock:
+            self.storage.save()
+            if self.checkpoint and self.seq is not None:
+                with open(self.checkpoint, "w") as f:
+                    json.dump({"epoch": self.epoch, "seq": self.seq}, f)
+
+    def status(self):
+        """Return the replication position and lag"""
+        lag = None
+        if self.seq is not None and self.primary_seq is not None:
+            lag = max(0, self.primary_seq - self.seq)
+        return {
+            "role": "follower",
+            "primary": self.primary_path,
+            "connected": self.connected,
+            "epoch": self.epoch,
+            "seq": self.seq,
+            "primary_seq": self.primary_seq,
+            "lag": lag,
+            "delay": self.delay,
+        }
@@ -0,0 +1,152 @@
+#!/usr/bin/python3
+"""
+Search module
+Inverted index over the free-text fields of Place and Review
+"""
+
+import json
+import math
+import re
+import zlib
+from bisect import bisect_left
+
+
+class SearchIndex:
+    """Inverted index ranked with BM25"""
+
+    fields = {
+        "Place": ("name", "description"),
+        "Review": ("text",),
+    }
+    k1 = 1.2
+    b = 0.75
+    __token = re.compile(r"\w+")
+
+    def __init__(self):
+        """Initialize an empty index"""
+        self.__postings = {}
+        self.__docs = {}
+        self.__total_length = 0
+        self.__vocabulary = None
+
+    def __len__(self):
+        """Return the number of indexed documents"""
+        return len(self.__docs)
+
+    @classmethod
+    def tokenize(cls, text):
+        """Split text into case-folded word tokens"""
+        return cls.__token.findall(str(text).casefold())
+
+    def __text(self, obj):
+        """Return the indexed text of obj, or None if it has none"""
+        fields = self.fields.get(obj.__class__.__name__)
+        if fields is None:
+            return None
+        return "\n".join(str(getattr(obj, f, "") or "") for f in fields)
+
+    def add(self, key, obj):
+        """Index obj under key, replacing any previous entry for key"""
+        text = self.__text(obj)
+        if text is None:
+            return
+        checksum = zlib.crc32(text.encode("utf-8"))
+        doc = self.__docs.get(key)
+        if doc is not None and doc[0] == checksum:
+            return
+        self.remove(key)
+        counts = {}
+        tokens = self.tokenize(text)
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for token, tf in counts.items():
+            if token not in self.__postings:
+                self.__postings[token] = {}
+                self.__vocabulary = None
+            self.__postings[token][key] = tf
+        self.__docs[key] = (checksum, len(tokens), tuple(counts))
+        self.__total_length += len(tokens)
+
+    def remove(self, key):
+        """Drop the entry for key if there is one"""
+        doc = self.__docs.pop(key, None)
+        if doc is None:
+            return
+        self.__total_length -= doc[1]
+        for token in doc[2]:
+            postings = self.__postings[token]
+            del postings[key]
+            if not postings:
+                del self.__postings[token]
+                self.__vocabulary = None
+
+    def keys(self):
+        """Return the keys of the indexed documents"""
+        return list(self.__docs)
+
+    def clear(self):
+        """Drop every entry"""
+        self.__postings.clear()
+        self.__docs.clear()
+        self.__total_length = 0
+        self.__vocabulary = None
+
+    def __expand(self, token):
+        """Return the indexed terms starting with token"""
+        if self.__vocabulary is None:
+            self.__vocabulary = sorted(self.__postings)
+        terms = []
+        i = bisect_left(self.__vocabulary, token)
+        while (i < len(self.__vocabulary) and
+               self.__vocabulary[i].startswith(token)):
+            terms.append(self.__vocabulary[i])
+            i += 1
+        return terms
+
+    def search(self, query, cls_name=None, prefix=False, limit=None):
+        """Return (key, score) pairs matching query, best first
+
+        With prefix, each query term also matches the indexed terms it
+        is a prefix of. cls_name restricts results to one class.
+        """
+        if not self.__docs:
+            return []
+        n = len(self.__docs)
+        avg_length = self.__total_length / n or 1
+        scores = {}
+        for token in set(self.tokenize(query)):
+            terms = self.__expand(token) if prefix else [token]
+            for term in terms:
+                postings = self.__postings.get(term)
+                if not postings:
+                    continue
+                df = len(postings)
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                for key, tf in postings.items():
+                    if cls_name and not key.startswith(cls_name + "."):
+                        continue
+                    length = self.__docs[key][1]
+                    norm = self.k1 * (1 - self.b +
+                                      self.b * length / avg_length)
+                    score = idf * tf * (self.k1 + 1) / (tf + norm)
+                    scores[key] = scores.get(key, 0.0) + score
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit] if limit else ranked
+
+    def dump(self, path):
+        """Write the index to path"""
+        with open(path, "w") as f:
+            json.dump({
+                "postings": self.__postings,
+                "docs": self.__docs,
+            }, f)
+
+    def load(self, path):
+        """Replace the index with the one stored at path"""
+        with open(path, "r") as f:
+            data = json.load(f)
+        self.clear()
+        self.__postings = data["postings"]
+        self.__docs = {k: (d[0], d[1], tuple(d[2]))
+                       for k, d in data["docs"].items()}
+        self.__total_length = sum(d[1] for d in self.__docs.values())
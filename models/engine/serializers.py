@@ -0,0 +1,112 @@
+#!/usr/bin/python3
+"""
+Serializers module
+Per-class from-dict decoders, generated once
+
+The generic loader tests every key for created_at/updated_at and calls
+setattr per attribute. The generated decoder bakes the declared
+attributes of one model class into straight-line code instead. It
+fills the instance dictionary directly and only goes through setattr
+for the names with a class-level data descriptor (properties), so
+setters run as they did with BaseModel(**kwargs). Values stored under
+read-only properties, which the property would hide anyway, are
+dropped. to_dict stays a plain method: its cost is the dictionary copy
+and the two isoformat() calls, which generated code cannot avoid.
+"""
+
+from datetime import datetime
+from models.engine.interning import table
+
+_decoders = {}
+
+
+def _declared(cls):
+    """Return the attributes declared by the model classes of cls
+    (everything above BaseModel and object in its MRO)
+    """
+    names = {}
+    for klass in reversed(cls.__mro__[:-2]):
+        for name, value in vars(klass).items():
+            if not name.startswith("_") and \
+                    isinstance(value, (str, int, float, list)):
+                names[name] = value
+    return names
+
+
+def _descriptors(cls):
+    """Return {name: settable} for the public data descriptors of cls,
+    which writes to the instance dictionary would bypass; read-only
+    properties (relations such as Place.reviews) are not settable
+    """
+    names = {}
+    for klass in cls.__mro__:
+        for name, value in vars(klass).items():
+            if not name.startswith("__") and \
+                    hasattr(type(value), "__set__"):
+                settable = not isinstance(value, property) or \
+                    value.fset is not None
+                names.setdefault(name, settable)
+    return names
+
+
+def _compile(name, source, namespace):
+    """Compile source and return the function called name in it"""
+    exec(compile(source, f"<{name}>", "exec"), namespace)
+    return namespace[name]
+
+
+def decoder(cls):
+    """Return the function loading a serialized dictionary into a cls
+    instance: decode(obj, data)
+    """
+    decode = _decoders.get(cls)
+    if decode is not None:
+        return decode
+    lines = [
+        "def decode(obj, data):",
+        "    d = obj.__dict__",
+        "    d.update(data)",
+        "    d.pop('__class__', None)",
+        "    if 'created_at' in d:",
+        "        d['created_at'] = fromisoformat(d['created_at'])",
+        "    if 'updated_at' in d:",
+        "        d['updated_at'] = fromisoformat(d['updated_at'])",
+    ]
+    declared = _declared(cls)
+    for name in ["id"] + [n for n in declared if n != "id"]:
+        if name == "id" or name.endswith("_id"):
+            lines += [
+                f"    value = d.get({name!r})",
+                "    if value.__class__ is str:",
+                f"        d[{name!r}] = intern(value)",
+            ]
+        elif isinstance(declared[name], str):
+            lines += [
+                f"    value = d.get({name!r})",
+                "    if value.__class__ is str and "
+                "len(value) <= short_length:",
+                f"        d[{name!r}] = intern(value)",
+            ]
+        elif name.endswith("_ids"):
+            lines += [
+                f"    value = d.get({name!r})",
+                "    if value.__class__ is list:",
+                f"        d[{name!r}] = [intern(v) if v.__class__ is str",
+                "                       else v for v in value]",
+            ]
+    for name, settable in sorted(_descriptors(cls).items()):
+        if settable:
+            lines += [
+                f"    if {name!r} in d:",
+                f"        setattr(obj, {name!r}, d.pop({name!r}))",
+            ]
+        else:
+            lines.append(f"    d.pop({name!r}, None)")
+    namespace = {
+        "fromisoformat": datetime.fromisoformat,
+        "intern": table.intern,
+        "short_length": table.short_length,
+    }
+    decode = _decoders[cls] = _compile("decode", "\n".join(lines) + "\n",
+                                       namespace)
+    return decode
@@ -0,0 +1,294 @@
+#!/usr/bin/python3
+"""
+Server module
+Long-running process owning the one in-memory store
+
+Clients (ClientStorage) talk to it over a Unix domain socket, so the
+file is loaded once and every console or script sees the same objects.
+Run it with: python3 -m models.engine.server [socket] [--primary]
+or, as a read-only replica of a primary:
+    python3 -m models.engine.server [socket] --follow <primary socket>
+"""
+
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import models
+from models.engine.file_storage import FileStorage
+from models.engine.protocol import ERROR, OK, OPERATIONS, pack, \
+    read_message
+from models.engine.replication import Follower, ReplicationLog
+from models.base_model import BaseModel
+from models.user import User
+from models.state import State
+from models.city import City
+from models.amenity import Amenity
+from models.place import Place
+from models.review import Review
+
+SOCKET_PATH = os.getenv("HBNB_STORAGE_SOCKET", "hbnb.sock")
+
+
+class StorageHandler(socketserver.StreamRequestHandler):
+    """Serves the requests of one client connection in order"""
+
+    def handle(self):
+        """Answer requests until the client disconnects"""
+        while True:
+            try:
+                message = read_message(self.rfile)
+            except ConnectionError:
+                return
+            if message is None:
+                return
+            request_id, code, args = message
+            try:
+                result = OK, self.server.dispatch(code, args)
+            except Exception as error:
+                result = ERROR, [error.__class__.__name__, str(error)]
+            try:
+                self.wfile.write(pack(request_id, *result))
+            except ConnectionError:
+                return
+
+
+class StorageServer(socketserver.ThreadingMixIn,
+                    socketserver.UnixStreamServer):
+    """Unix socket server applying requests to one FileStorage"""
+
+    daemon_threads = True
+    __classes = {
+        "BaseModel": BaseModel,
+        "User": User,
+        "State": State,
+        "City": City,
+        "Amenity": Amenity,
+        "Place": Place,
+        "Review": Review,
+    }
+
+    __unlocked = ("changes", "promote")
+    __writes = ("new", "delete", "reload")
+
+    def __init__(self, path=SOCKET_PATH, storage=None, primary=False,
+                 follow=None, checkpoint="replica.json"):
+        """Listen on path, replacing a stale socket file
+
+        With primary, followers can replicate this server. With follow,
+        the store is a read-only replica of the server on that path.
+        """
+        if os.path.exists(path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(path)
+            except OSError:
+                os.remove(path)
+            else:
+                raise OSError(f"a server already listens on {path}")
+            finally:
+                probe.close()
+        self.storage = storage if storage is not None else FileStorage()
+        self.lock = threading.RLock()
+        self.replication = None
+        self.follower = None
+        if primary:
+            self.replication = ReplicationLog(self.storage.changes)
+        super().__init__(path, StorageHandler)
+        if follow:
+            self.follower = Follower(self.storage, follow, checkpoint,
+                                     lock=self.lock)
+            self.follower.start()
+
+    def server_close(self):
+        """Stop following, stop listening and remove the socket file"""
+        if self.follower is not None:
+            self.follower.stop()
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+    def dispatch(self, code, args):
+        """Apply one request and return its JSON-ready result"""
+        if not 1 <= code <= len(OPERATIONS):
+            raise ValueError(f"unknown operation {code}")
+        name = OPERATIONS[code - 1]
+        if self.follower is not None and name in self.__writes:
+            raise PermissionError(
+                f"read-only follower of {self.follower.primary_path}")
+        handler = getattr(self, "op_" + name)
+        if name in self.__unlocked:
+            return handler(*(args or ()))
+        with self.lock:
+            return handler(*(args or ()))
+
+    def __rebuild(self, data):
+        """Return the object serialized in data"""
+        cls = self.__classes.get(data.get("__class__"))
+        if cls is None:
+            raise ValueError(f"unknown class '{data.get('__class__')}'")
+        return cls.from_dict(data)
+
+    def op_ping(self):
+        """Return "pong" """
+        return "pong"
+
+    def op_version(self):
+        """Return the store version"""
+        return self.storage.version
+
+    def op_all(self):
+        """Return every object, serialized"""
+        with self.storage.snapshot() as objects:
+            return [obj.to_dict() for obj in objects.values()]
+
+    def op_get(self, key):
+        """Return the object under key, or None"""
+        obj = self.storage.all().get(key)
+        return obj.to_dict() if obj is not None else None
+
+    def op_new(self, data):
+        """Add or replace the object serialized in data"""
+        self.storage.new(self.__rebuild(data))
+
+    def op_delete(self, key, cascade=False):
+        """Remove the object under key and return the removed objects"""
+        obj = self.storage.all().get(key)
+        return [o.to_dict() for o in self.storage.delete(obj, cascade)]
+
+    def op_save(self):
+        """Write the store to its file (and a follower's checkpoint)"""
+        if self.follower is not None:
+            self.follower.save()
+        else:
+            self.storage.save()
+
+    def op_reload(self):
+        """Read the store file again; a primary starts a new replication
+        epoch, since the reload publishes no events
+        """
+        self.storage.reload()
+        if self.replication is not None:
+            self.replication.restart()
+
+    def op_query(self, text):
+        """Return the objects selected by a query"""
+        return [obj.to_dict() for obj in self.storage.query(text)]
+
+    def op_explain(self, text):
+        """Return the plan of a query"""
+        return self.storage.explain(text)
+
+    def op_search(self, query, cls_name=None, prefix=False, limit=None):
+        """Return the objects matching a full-text query"""
+        return [obj.to_dict() for obj in
+                self.storage.search(query, cls_name, prefix, limit)]
+
+    def op_prefetch(self, objs, name):
+        """Return the objects related to each serialized object of objs
+        through name
+        """
+        objs = [self.__rebuild(data) for data in objs]
+        return {obj_id: [o.to_dict() for o in related] for obj_id, related
+                in self.storage.prefetch(objs, name).items()}
+
+    def op_top(self, cls_name, name, k=10):
+        """Return the k objects with the most related objects"""
+        return [[obj.to_dict(), count]
+                for obj, count in self.storage.top(cls_name, name, k)]
+
+    def op_ranking(self, cls_name, name, k=None):
+        """Return up to k (id, count) pairs, most related first"""
+        ranking = self.storage.ranking(cls_name, name)
+        return [list(pair) for pair, _ in zip(ranking, range(k))] \
+            if k is not None else [list(pair) for pair in ranking]
+
+    def op_facets(self, all_of=(), any_of=(), none_of=()):
+        """Return the Places matching a facet selection and the counts"""
+        places, counts = self.storage.facets(all_of, any_of, none_of)
+        return [[obj.to_dict() for obj in places], counts]
+
+    def op_memory_report(self):
+        """Return the string memory report"""
+        return self.storage.memory_report()
+
+    def op_perf_report(self, reset=False):
+        """Return the operation metrics and the objects per class"""
+        return self.storage.perf_report(reset)
+
+    def __primary(self):
+        """Return the ReplicationLog, or fail if this is no primary"""
+        if self.replication is None:
+            raise ValueError("replication is not enabled on this server")
+        return self.replication
+
+    def op_changes(self, since, timeout=0, epoch=None):
+        """Return the events after since, waiting up to timeout seconds
+        (at most 30) for one
+        """
+        log = self.__primary()
+        events = log.since(since, min(timeout or 0, 30), epoch)
+        return {"epoch": log.epoch, "seq": log.seq, "events": events}
+
+    def op_snapshot(self):
+        """Return every object and the change position they reflect"""
+        log = self.__primary()
+        with self.storage.snapshot() as objects:
+            return {"epoch": log.epoch, "seq": log.seq,
+                    "objects": [obj.to_dict() for obj in objects.values()]}
+
+    def op_status(self):
+        """Return the replication role and position"""
+        if self.follower is not None:
+            return self.follower.status()
+        if self.replication is not None:
+            return {"role": "primary", "epoch": self.replication.epoch,
+                    "seq": self.replication.seq}
+        return {"role": "standalone", "seq": self.storage.changes.seq}
+
+    def op_promote(self):
+        """Turn this follower into a primary continuing its history"""
+        follower = self.follower
+        if follower is None:
+            raise ValueError("this server is not a follower")
+        follower.stop()
+        with self.lock:
+            self.storage.changes.seq = follower.seq or 0
+            self.replication = ReplicationLog(self.storage.changes,
+                                              epoch=follower.epoch)
+            self.follower = None
+            return self.op_status()
+
+
+def _terminate(signum, frame):
+    """Leave serve_forever so the socket file gets removed"""
+    raise SystemExit(0)
+
+
+def main(argv):
+    """Serve the store until interrupted or terminated"""
+    args = argv[1:]
+    primary = "--primary" in args
+    follow = None
+    if "--follow" in args:
+        i = args.index("--follow")
+        follow = args[i + 1]
+        del args[i:i + 2]
+    args = [a for a in args if a != "--primary"]
+    path = args[0] if args else SOCKET_PATH
+    storage = models.storage = FileStorage()
+    server = StorageServer(path, storage, primary, follow)
+    signal.signal(signal.SIGTERM, _terminate)
+    print(f"serving {len(storage.all())} objects on {path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
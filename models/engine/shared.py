@@ -0,0 +1,198 @@
+#!/usr/bin/python3
+"""
+Shared module
+Immutable snapshot files that worker processes map instead of loading
+
+A snapshot holds every object serialized as compact JSON, followed by
+the keys in sorted order and an offset index. Readers mmap the file,
+so all processes share one copy of the pages and only the objects
+they look up get decoded. A new generation is written next to the
+file and renamed over it, and readers switch to it on refresh().
+"""
+
+import json
+import mmap
+import os
+import struct
+from models.base_model import BaseModel
+from models.user import User
+from models.state import State
+from models.city import City
+from models.amenity import Amenity
+from models.place import Place
+from models.review import Review
+
+MAGIC = b"HBNBSNP1"
+HEADER = struct.Struct("!8sQIQQ")
+ENTRY = struct.Struct("!QIQI")
+
+
+def write_snapshot(objects, path):
+    """Write objects (a key to object mapping) as the next snapshot
+    generation at path and return its generation number
+    """
+    generation = 1
+    try:
+        with open(path, "rb") as f:
+            magic, previous, _, _, _ = HEADER.unpack(f.read(HEADER.size))
+        if magic == MAGIC:
+            generation = previous + 1
+    except (OSError, struct.error):
+        pass
+    keys = sorted(objects)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(b"\0" * HEADER.size)
+        offset = HEADER.size
+        records = []
+        for key in keys:
+            record = json.dumps(objects[key].to_dict(),
+                                separators=(",", ":")).encode("utf-8")
+            f.write(record)
+            records.append((offset, len(record)))
+            offset += len(record)
+        keys_offset = offset
+        entries = []
+        for key, (record_offset, record_length) in zip(keys, records):
+            encoded = key.encode("utf-8")
+            f.write(encoded)
+            entries.append(ENTRY.pack(offset, len(encoded),
+                                      record_offset, record_length))
+            offset += len(encoded)
+        f.write(b"".join(entries))
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, generation, len(keys), keys_offset,
+                            offset))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return generation
+
+
+class SharedSnapshot:
+    """Read-only, memory-mapped view of a snapshot file"""
+
+    __classes = {
+        "BaseModel": BaseModel,
+        "User": User,
+        "State": State,
+        "City": City,
+        "Amenity": Amenity,
+        "Place": Place,
+        "Review": Review,
+    }
+
+    def __init__(self, path):
+        """Map the current generation of the snapshot at path"""
+        self.path = path
+        self.generation = 0
+        self.__map = None
+        self.__identity = None
+        self.__count = 0
+        self.__index = 0
+        self.refresh()
+
+    def refresh(self):
+        """Map the newest generation if the file was replaced; return
+        True if it was
+        """
+        stat = os.stat(self.path)
+        identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if identity == self.__identity:
+            return False
+        with open(self.path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, generation, count, _, index = HEADER.unpack_from(mapped)
+        if magic != MAGIC:
+            mapped.close()
+            raise ValueError(f"{self.path} is not a storage snapshot")
+        if self.__map is not None:
+            self.__map.close()
+        self.__map = mapped
+        self.__identity = identity
+        self.generation = generation
+        self.__count = count
+        self.__index = index
+        return True
+
+    def __len__(self):
+        """Return the number of objects"""
+        return self.__count
+
+    def __entry(self, i):
+        """Return (key bytes, record offset, record length) of entry i"""
+        key_offset, key_length, offset, length = ENTRY.unpack_from(
+            self.__map, self.__index + i * ENTRY.size)
+        return self.__map[key_offset:key_offset + key_length], \
+            offset, length
+
+    def __search(self, key):
+        """Return the position of the first key >= key"""
+        lo, hi = 0, self.__count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.__entry(mid)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def raw(self, key):
+        """Return the serialized bytes of the object under key, or None"""
+        encoded = key.encode("utf-8")
+        i = self.__search(encoded)
+        if i < self.__count:
+            found, offset, length = self.__entry(i)
+            if found == encoded:
+                return self.__map[offset:offset + length]
+        return None
+
+    def __contains__(self, key):
+        """Return True if key is in the snapshot"""
+        return self.raw(key) is not None
+
+    def get(self, key):
+        """Return a new object decoded from the record under key, or
+        None
+        """
+        record = self.raw(key)
+        return self.__decode(record) if record is not None else None
+
+    def __decode(self, record):
+        """Return the object serialized in record"""
+        data = json.loads(record)
+        return self.__classes[data["__class__"]].from_dict(data)
+
+    def keys(self, prefix=""):
+        """Yield the keys starting with prefix (e.g. "Place."), sorted"""
+        encoded = prefix.encode("utf-8")
+        for i in range(self.__search(encoded), self.__count):
+            key = self.__entry(i)[0]
+            if not key.startswith(encoded):
+                return
+            yield key.decode("utf-8")
+
+    def items(self, prefix=""):
+        """Yield (key, object) for the keys starting with prefix"""
+        encoded = prefix.encode("utf-8")
+        for i in range(self.__search(encoded), self.__count):
+            key, offset, length = self.__entry(i)
+            if not key.startswith(encoded):
+                return
+            yield key.decode("utf-8"), self.__decode(
+                self.__map[offset:offset + length])
+
+    def close(self):
+        """Unmap the snapshot"""
+        if self.__map is not None:
+            self.__map.close()
+            self.__map = None
+            self.__identity = None
+
+    def __enter__(self):
+        """Return the snapshot"""
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        """Unmap the snapshot"""
+        self.close()
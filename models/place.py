@@ -4,6 +4,7 @@ Place module
 Defines Place class that inherits from BaseModel
 """
 
+import models
 from models.base_model import BaseModel
 
 
@@ -21,3 +22,13 @@ class Place(BaseModel):
     latitude = 0.0
     longitude = 0.0
     amenity_ids = []
+
+    @property
+    def reviews(self):
+        """Return the Review instances of this Place"""
+        return models.storage.related(self, "reviews")
+
+    @property
+    def amenities(self):
+        """Return the Amenity instances listed in amenity_ids"""
+        return models.storage.related(self, "amenities")
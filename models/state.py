@@ -4,6 +4,7 @@ State module
 Defines State class that inherits from BaseModel
 """
 
+import models
 from models.base_model import BaseModel
 
 
@@ -11,3 +12,8 @@ class State(BaseModel):
     """State class that inherits from BaseModel"""
 
     name = ""
+
+    @property
+    def cities(self):
+        """Return the City instances of this State"""
+        return models.storage.related(self, "cities")
@@ -4,6 +4,7 @@ User module
 Defines User class that inherits from BaseModel
 """
 
+import models
 from models.base_model import BaseModel
 
 
@@ -14,3 +15,8 @@ class User(BaseModel):
     password = ""
     first_name = ""
     last_name = ""
+
+    @property
+    def places(self):
+        """Return the Place instances owned by this User"""
+        return models.storage.related(self, "places")
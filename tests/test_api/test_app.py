@@ -0,0 +1,226 @@
+#!/usr/bin/python3
+
+import http.client
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+import models
+from api.v1 import views
+from api.v1.app import ApiHandler, ApiServer
+from models.engine.file_storage import FileStorage
+from models.city import City
+from models.place import Place
+from models.state import State
+
+
+class TestApi(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.storage = FileStorage()
+        self.storage._FileStorage__objects = {}
+        self.storage._FileStorage__file_path = os.path.join(
+            self.directory, "file.json")
+        for target in (models, views):
+            patcher = patch.object(target, "storage", self.storage)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.server = ApiServer(("127.0.0.1", 0), ApiHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever,
+                                       args=(0.05,))
+        self.thread.start()
+        self.conn = http.client.HTTPConnection(
+            "127.0.0.1", self.server.server_address[1], timeout=5)
+
+    def tearDown(self):
+        self.conn.close()
+        self.server.shutdown()
+        self.thread.join()
+        self.server.server_close()
+        shutil.rmtree(self.directory)
+
+    def request(self, method, path, body=None, headers=None):
+        data = json.dumps(body) if body is not None else None
+        self.conn.request(method, "/api/v1" + path, data,
+                          dict(headers or {},
+                               **{"Content-Type": "application/json"}))
+        response = self.conn.getresponse()
+        payload = response.read()
+        self.response = response
+        if response.status == 304:
+            return response.status, None
+        if response.getheader("Content-Type") == "application/x-ndjson":
+            return response.status, [json.loads(line)
+                                     for line in payload.splitlines()]
+        return response.status, json.loads(payload)
+
+    def test_status_and_errors(self):
+        self.assertEqual(self.request("GET", "/status"),
+                         (200, {"status": "OK"}))
+        self.assertEqual(self.request("GET", "/nope")[0], 404)
+        self.assertEqual(self.request("GET", "/places/missing")[0], 404)
+        self.assertEqual(self.request("PATCH", "/places")[0], 501)
+        self.assertEqual(self.request("DELETE", "/places")[0], 405)
+        self.assertEqual(self.request("POST", "/places", [1])[0], 400)
+        self.assertEqual(self.request("GET", "/places?limit=-1")[0], 400)
+        self.assertEqual(self.request("GET", "/places?where=name%20~%20x")[0],
+                         400)
+
+    def test_invalid_query_parameters(self):
+        self.storage.new(Place(name="p"))
+        for path in ("/places?name%20x=1", "/places?name%20x=1&stream=1",
+                     "/places?order_by=name%20x"):
+            with self.subTest(path=path):
+                status, body = self.request("GET", path)
+                self.assertEqual(status, 400)
+                self.assertIn("error", body)
+        self.assertEqual(self.request("GET", "/status")[0], 200)
+
+    def test_invalid_content_length(self):
+        for length in ("abc", "-5"):
+            with self.subTest(length=length):
+                self.conn.putrequest("POST", "/api/v1/places")
+                self.conn.putheader("Content-Length", length)
+                self.conn.endheaders()
+                response = self.conn.getresponse()
+                self.assertEqual(response.status, 400)
+                self.assertEqual(json.loads(response.read()),
+                                 {"error": "Invalid Content-Length"})
+                self.conn.close()
+
+    def test_methods_and_properties_cannot_be_set(self):
+        status, place = self.request("POST", "/places", {"name": "Loft"})
+        path = f"/places/{place['id']}"
+        for body in ({"to_dict": 1}, {"reviews": 1}, {"save": "x"},
+                     {"_Place__secret": 1}):
+            with self.subTest(body=body):
+                self.assertEqual(self.request("PUT", path, body)[0], 400)
+                self.assertEqual(self.request("POST", "/places", body)[0],
+                                 400)
+                self.assertEqual(self.request(
+                    "PUT", "/places/bulk", [dict(body, id=place["id"])])[0],
+                    400)
+        self.storage.save()
+        self.assertEqual(self.request("GET", path)[1], place)
+        self.assertEqual(len(self.storage.all()), 1)
+
+    def test_crud_on_one_connection(self):
+        status, state = self.request("POST", "/states", {"name": "CA"})
+        self.assertEqual(status, 201)
+        self.assertEqual(state["__class__"], "State")
+        self.assertEqual(self.storage.get(f"State.{state['id']}").name, "CA")
+
+        status, city = self.request("POST", "/cities",
+                                    {"name": "SF", "state_id": state["id"]})
+        self.assertEqual(self.request("GET", f"/states/{state['id']}")[1],
+                         state)
+        status, body = self.request("PUT", f"/states/{state['id']}",
+                                    {"name": "NV", "id": "changed"})
+        self.assertEqual((status, body["name"], body["id"]),
+                         (200, "NV", state["id"]))
+        status, cities = self.request("GET",
+                                      f"/states/{state['id']}/cities")
+        self.assertEqual([c["id"] for c in cities], [city["id"]])
+        self.assertEqual(self.request("GET", "/stats")[1]["cities"], 1)
+
+        path = f"/states/{state['id']}?cascade=1"
+        self.assertEqual(self.request("DELETE", path), (200, {}))
+        self.assertEqual(self.storage.all(), {})
+        with open(self.storage._FileStorage__file_path) as f:
+            self.assertEqual(json.load(f), {})
+
+    def test_pagination_and_filters(self):
+        for i in range(5):
+            self.storage.new(Place(name=f"p{i}", price_by_night=i * 10))
+        self.storage.new(City(name="SF"))
+
+        status, page = self.request("GET", "/places?limit=2&order_by="
+                                    "price_by_night&desc=1")
+        self.assertEqual([p["name"] for p in page["results"]], ["p4", "p3"])
+        self.assertIn("offset=2", page["next"])
+        status, page = self.request("GET", page["next"].split("/v1")[1])
+        self.assertEqual([p["name"] for p in page["results"]], ["p2", "p1"])
+        status, page = self.request("GET", "/places?limit=2&offset=4&"
+                                    "order_by=price_by_night&desc=1")
+        self.assertEqual([p["name"] for p in page["results"]], ["p0"])
+        self.assertIsNone(page["next"])
+
+        status, page = self.request("GET", "/places?where=price_by_night"
+                                    "%20%3E%3D%2020&order_by=name")
+        self.assertEqual([p["name"] for p in page["results"]],
+                         ["p2", "p3", "p4"])
+        status, page = self.request("GET", "/places?name=p1")
+        self.assertEqual([p["name"] for p in page["results"]], ["p1"])
+
+    def test_stream(self):
+        for i in range(600):
+            self.storage.new(State(name=f"s{i:03}"))
+        status, states = self.request("GET", "/states?stream=1&order_by="
+                                      "name")
+        self.assertEqual(status, 200)
+        self.assertEqual([s["name"] for s in states],
+                         [f"s{i:03}" for i in range(600)])
+        self.assertEqual(self.request("GET", "/status")[0], 200)
+
+    def test_etag_revalidation(self):
+        state = State(name="CA")
+        self.storage.new(state)
+        etags = {}
+        for path in (f"/states/{state.id}", "/states", "/stats"):
+            self.request("GET", path)
+            etags[path] = self.response.getheader("ETag")
+            self.assertEqual(self.request("GET", path, headers={
+                "If-None-Match": etags[path]}), (304, None))
+
+        self.request("POST", "/cities", {"name": "SF"})
+        for path, status in ((f"/states/{state.id}", 304),
+                             ("/states", 304), ("/stats", 200)):
+            self.assertEqual(self.request("GET", path, headers={
+                "If-None-Match": etags[path]})[0], status)
+
+        self.request("PUT", f"/states/{state.id}", {"name": "NV"})
+        status, body = self.request("GET", f"/states/{state.id}", headers={
+            "If-None-Match": etags[f"/states/{state.id}"]})
+        self.assertEqual((status, body["name"]), (200, "NV"))
+        status, body = self.request("GET", "/states")
+        self.assertEqual(body["results"][0]["name"], "NV")
+
+    def test_bulk(self):
+        status, states = self.request("POST", "/states/bulk",
+                                      [{"name": "a"}, {"name": "b"}])
+        self.assertEqual((status, len(states)), (201, 2))
+        status, body = self.request("PUT", "/states/bulk",
+                                    [{"id": states[0]["id"], "name": "c"}])
+        self.assertEqual(body[0]["name"], "c")
+        self.assertEqual(self.request("PUT", "/states/bulk",
+                                      [{"id": "missing"}])[0], 404)
+        status, body = self.request("DELETE", "/states/bulk",
+                                    {"ids": [s["id"] for s in states]})
+        self.assertEqual(body, {"removed": 2})
+        self.assertEqual(self.storage.all(), {})
+
+    def test_invalid_bulk_changes_nothing(self):
+        status, _ = self.request("POST", "/states/bulk",
+                                 [{"name": "a"}, {"name": "b"}, {"_x": 1}])
+        self.assertEqual(status, 400)
+        self.assertEqual(self.storage.all(), {})
+
+        state = State(name="a")
+        status, _ = self.request("PUT", "/states/bulk",
+                                 [{"id": state.id, "name": "b"},
+                                  {"id": "missing"}])
+        self.assertEqual(status, 404)
+        status, _ = self.request("PUT", "/states/bulk",
+                                 [{"id": state.id, "name": "b"},
+                                  {"id": state.id, "to_dict": 1}])
+        self.assertEqual(status, 400)
+        self.assertEqual(self.storage.get(f"State.{state.id}").name, "a")
+
+
+if __name__ == "__main__":
+    unittest.main()
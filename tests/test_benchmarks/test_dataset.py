@@ -0,0 +1,80 @@
+#!/usr/bin/python3
+
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+import models
+from benchmarks.dataset import generate
+from models.engine import ids
+from models.engine.file_storage import FileStorage
+
+
+class TestGenerate(unittest.TestCase):
+
+    def setUp(self):
+        models.storage = MagicMock()
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def load(self, name, **options):
+        path = os.path.join(self.directory.name, name)
+        counts = generate(path, 3000, **options)
+        storage = FileStorage()
+        storage._FileStorage__objects = {}
+        storage._FileStorage__file_path = path
+        storage.reload()
+        return counts, storage.all()
+
+    def test_loads_with_consistent_references(self):
+        counts, objects = self.load("data.json", workers=1)
+        self.assertEqual(sum(counts.values()), len(objects))
+        self.assertGreater(counts["Review"], 0)
+        by_class = {}
+        for key, obj in objects.items():
+            self.assertEqual(key, f"{obj.__class__.__name__}.{obj.id}")
+            by_class.setdefault(obj.__class__.__name__, set()).add(obj.id)
+        self.assertEqual({k: len(v) for k, v in by_class.items()}, counts)
+        for obj in objects.values():
+            cls_name = obj.__class__.__name__
+            if cls_name == "City":
+                self.assertIn(obj.state_id, by_class["State"])
+            elif cls_name == "Place":
+                self.assertIn(obj.city_id, by_class["City"])
+                self.assertIn(obj.user_id, by_class["User"])
+                self.assertTrue(set(obj.amenity_ids) <= by_class["Amenity"])
+                self.assertTrue(-90 <= obj.latitude <= 90)
+            elif cls_name == "Review":
+                place = objects[f"Place.{obj.place_id}"]
+                self.assertIn(obj.user_id, by_class["User"])
+                self.assertGreaterEqual(obj.created_at, place.created_at)
+
+    def test_independent_of_workers(self):
+        path = os.path.join(self.directory.name, "a.json")
+        other = os.path.join(self.directory.name, "b.json")
+        generate(path, 3000, seed=7, workers=1)
+        generate(other, 3000, seed=7, workers=2)
+        with open(path, "rb") as a, open(other, "rb") as b:
+            self.assertEqual(a.read(), b.read())
+
+    def test_compressed_shards(self):
+        for name in ("data.json.gz", "data.json.xz", "data.json.zz"):
+            with self.subTest(name=name):
+                counts, objects = self.load(name, workers=2)
+                self.assertEqual(sum(counts.values()), len(objects))
+
+    def test_ulid_ids(self):
+        _, objects = self.load("data.json", id_scheme="ulid", workers=1)
+        for obj in objects.values():
+            self.assertTrue(ids.is_ulid(obj.id))
+            self.assertEqual(ids.timestamp(obj.id),
+                             obj.created_at.replace(
+                                 microsecond=obj.created_at.microsecond //
+                                 1000 * 1000))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+#!/usr/bin/python3
+
+import unittest
+from unittest.mock import MagicMock
+
+import models
+from benchmarks.fixtures import make_objects
+
+
+class TestMakeObjects(unittest.TestCase):
+
+    def setUp(self):
+        models.storage = MagicMock()
+
+    def test_seeded(self):
+        first = [o.to_dict() for o in make_objects(30, seed=1)]
+        again = [o.to_dict() for o in make_objects(30, seed=1)]
+        other = [o.to_dict() for o in make_objects(30, seed=2)]
+        self.assertEqual(first, again)
+        self.assertNotEqual([d["id"] for d in first],
+                            [d["id"] for d in other])
+        self.assertEqual(len({d["id"] for d in first}), 30)
+        self.assertEqual({d["__class__"] for d in first},
+                         {"Place", "Review", "User"})
+
+
+if __name__ == '__main__':
+    unittest.main()
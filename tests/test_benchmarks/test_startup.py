@@ -0,0 +1,46 @@
+#!/usr/bin/python3
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import models
+from benchmarks import startup
+
+
+class TestStartup(unittest.TestCase):
+
+    def setUp(self):
+        models.storage = MagicMock()
+        self.directory = tempfile.TemporaryDirectory()
+        self.baseline = os.path.join(self.directory.name, "startup.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def main(self, seconds, *argv):
+        with patch.object(startup, "run", return_value=seconds), \
+                contextlib.redirect_stdout(io.StringIO()) as out:
+            code = startup.main(["10", "3"] + list(argv))
+        return code, out.getvalue()
+
+    def test_baseline_and_threshold(self):
+        self.assertEqual(self.main(0.1, "--output", self.baseline)[0], 0)
+        with open(self.baseline) as f:
+            results = json.load(f)["results"]
+        self.assertEqual(len(results), len(startup.SCENARIOS))
+        self.assertAlmostEqual(results[0]["p50_us"], 100000.0)
+
+        self.assertEqual(self.main(0.11, "--baseline", self.baseline)[0], 0)
+        code, output = self.main(0.2, "--baseline", self.baseline,
+                                 "--threshold", "0.5")
+        self.assertEqual(code, 1)
+        self.assertIn("slower", output)
+
+
+if __name__ == '__main__':
+    unittest.main()
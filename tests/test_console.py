@@ -0,0 +1,180 @@
+#!/usr/bin/python3
+
+import os
+import unittest
+from io import StringIO
+from unittest.mock import patch
+
+import console
+import models
+from console import HBNBCommand
+from models.engine.file_storage import FileStorage
+
+
+class TestConsole(unittest.TestCase):
+
+    def setUp(self):
+        self.test_file = "test_console.json"
+        self.storage = FileStorage()
+        self.storage._FileStorage__objects = {}
+        self.storage._FileStorage__file_path = self.test_file
+        self.patches = [
+            patch.object(console, "storage", self.storage),
+            patch.object(models, "storage", self.storage),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        if os.path.exists(self.test_file):
+            os.remove(self.test_file)
+
+    def run_cmd(self, line):
+        with patch("sys.stdout", new=StringIO()) as out:
+            HBNBCommand().onecmd(line)
+        return out.getvalue().strip()
+
+    def test_create_and_show(self):
+        obj_id = self.run_cmd("create User")
+        self.assertIn(f"User.{obj_id}", self.storage.all())
+        self.assertIn(obj_id, self.run_cmd(f"show User {obj_id}"))
+
+    def test_single_objects_are_read_by_key(self):
+        obj_id = self.run_cmd("create User")
+        with patch.object(self.storage, "all", side_effect=AssertionError):
+            self.assertIn(obj_id, self.run_cmd(f"show User {obj_id}"))
+            self.assertEqual(self.run_cmd("show User nope"),
+                             "** no instance found **")
+            self.assertEqual(self.run_cmd("update User nope a b"),
+                             "** no instance found **")
+
+    def test_destroy(self):
+        obj_id = self.run_cmd("create State")
+        self.assertEqual(self.run_cmd(f"destroy State {obj_id}"), "")
+        self.assertNotIn(f"State.{obj_id}", self.storage.all())
+        self.assertEqual(self.run_cmd(f"destroy State {obj_id}"),
+                         "** no instance found **")
+
+    def test_destroy_cascade(self):
+        state_id = self.run_cmd("create State")
+        city_id = self.run_cmd(f'create City state_id="{state_id}"')
+        place_id = self.run_cmd(f'create Place city_id="{city_id}"')
+        review_id = self.run_cmd(f'create Review place_id="{place_id}"')
+
+        self.run_cmd(f"destroy State {state_id} --cascade")
+
+        self.assertEqual(self.storage.all(), {})
+        with open(self.test_file) as f:
+            self.assertNotIn(review_id, f.read())
+
+    def test_destroy_errors(self):
+        self.assertEqual(self.run_cmd("destroy"),
+                         "** class name missing **")
+        self.assertEqual(self.run_cmd("destroy Nope 1"),
+                         "** class doesn't exist **")
+        self.assertEqual(self.run_cmd("destroy User --cascade"),
+                         "** instance id missing **")
+
+    def test_search(self):
+        self.run_cmd('create Place name="Sunny_loft"')
+        review_id = self.run_cmd('create Review text="Sunny_and_warm"')
+
+        self.assertIn("Sunny loft", self.run_cmd("search sunny"))
+        output = self.run_cmd("search Review sun --prefix --limit 5")
+        self.assertIn(review_id, output)
+        self.assertNotIn("Sunny loft", output)
+        self.assertEqual(self.run_cmd("search Place"),
+                         "** search terms missing **")
+
+    def test_facet(self):
+        wifi = self.run_cmd('create Amenity name="Wifi"')
+        pool = self.run_cmd('create Amenity name="Pool"')
+        both = self.run_cmd("create Place")
+        only_wifi = self.run_cmd("create Place")
+        self.storage.all()[f"Place.{both}"].amenity_ids = [wifi, pool]
+        self.storage.new(self.storage.all()[f"Place.{both}"])
+        self.storage.all()[f"Place.{only_wifi}"].amenity_ids = [wifi]
+        self.storage.new(self.storage.all()[f"Place.{only_wifi}"])
+
+        output = self.run_cmd(f"facet {wifi} -{pool}")
+        self.assertIn(only_wifi, output)
+        self.assertNotIn(both, output)
+        self.assertEqual(self.run_cmd(f"facet --counts ~{wifi}"),
+                         f"2 {wifi} Wifi\n     1 {pool} Pool")
+
+    def test_top(self):
+        place = self.run_cmd('create Place name="Loft"')
+        for _ in range(2):
+            self.run_cmd(f'create Review place_id="{place}"')
+
+        self.assertEqual(self.run_cmd("top Place reviews 3"),
+                         f"2 {place} Loft")
+        self.assertEqual(self.run_cmd("top Place owners"),
+                         "** relation doesn't exist **")
+        self.assertEqual(self.run_cmd("top Place"), "** relation missing **")
+
+    def test_all_with_query(self):
+        cheap = self.run_cmd("create Place price_by_night=50")
+        pricey = self.run_cmd("create Place price_by_night=500")
+
+        output = self.run_cmd("all Place where price_by_night < 100")
+        self.assertIn(cheap, output)
+        self.assertNotIn(pricey, output)
+        self.assertIn("invalid query",
+                      self.run_cmd("all Place where price_by_night"))
+        self.assertEqual(self.run_cmd("all Nope where x == 1"),
+                         "** class doesn't exist **")
+
+    def test_explain(self):
+        self.run_cmd("create Place price_by_night=50")
+        self.run_cmd("create Place price_by_night=500")
+        output = self.run_cmd(
+            "explain all Place where price_by_night < 100 limit 5")
+        self.assertIn("access: sorted index", output)
+        self.assertIn("rows_examined: 1", output)
+        self.assertEqual(self.run_cmd("explain all"),
+                         "** class name missing **")
+
+    def test_memory(self):
+        self.run_cmd("create User")
+        output = self.run_cmd("memory").splitlines()
+        self.assertIn("saved", output[0])
+        self.assertTrue(output[1].startswith("User"))
+
+    def test_update(self):
+        obj_id = self.run_cmd("create Place")
+        self.assertEqual(self.run_cmd(f'update Place {obj_id} name "Loft"'),
+                         "")
+        self.assertEqual(self.storage.get(f"Place.{obj_id}").name, "Loft")
+        for attr in ("reviews", "amenities", "save", "to_dict",
+                     "__class__"):
+            with self.subTest(attr=attr):
+                self.assertEqual(
+                    self.run_cmd(f"update Place {obj_id} {attr} foo"),
+                    "** attribute can't be set **")
+        place = self.storage.get(f"Place.{obj_id}")
+        self.assertEqual(place.reviews, [])
+        place.save()
+
+    def test_perf(self):
+        self.run_cmd("create User")
+        self.run_cmd("show User missing")
+        output = self.run_cmd("perf").splitlines()
+        self.assertIn("p99 ms", output[0])
+        rows = {line.split()[0]: line.split()[1:] for line in output[1:]}
+        self.assertEqual(rows["console.create"][0], "1")
+        self.assertEqual(rows["console.show"][0], "1")
+        self.assertEqual(rows["storage.save"][0], "1")
+        self.assertIn("storage.bytes_written", rows)
+        self.assertEqual(rows["User"], ["1"])
+
+        output = self.run_cmd("perf --prometheus --reset")
+        self.assertIn('hbnb_operation_duration_seconds_count'
+                      '{operation="console.create"} 1', output)
+        self.assertNotIn("console.create", self.run_cmd("perf"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/python3
+
+import os
+import unittest
+from unittest.mock import MagicMock
+
+import models
+from models.engine.bitmap import BitmapIndex
+from models.engine.file_storage import FileStorage
+from models.place import Place
+
+
+class TestBitmapIndex(unittest.TestCase):
+
+    def setUp(self):
+        models.storage = MagicMock()
+        self.index = BitmapIndex()
+        self.places = {}
+        for name, amenities in (("a", ["wifi", "pool"]),
+                                ("b", ["wifi"]),
+                                ("c", ["pool", "gym"]),
+                                ("d", [])):
+            place = Place(name=name, amenity_ids=amenities)
+            self.places[name] = place
+            self.index.add(f"Place.{name}", place)
+
+    def test_all_of(self):
+        self.assertEqual(self.index.query(all_of=["wifi", "pool"]),
+                         ["Place.a"])
+        self.assertEqual(self.index.query(all_of=["sauna"]), [])
+
+    def test_any_of_and_none_of(self):
+        self.assertEqual(self.index.query(any_of=["wifi", "gym"]),
+                         ["Place.a", "Place.b", "Place.c"])
+        self.assertEqual(self.index.query(none_of=["pool"]),
+                         ["Place.b", "Place.d"])
+        self.assertEqual(self.index.query(all_of=["pool"],
+                                          none_of=["wifi"]), ["Place.c"])
+
+    def test_counts(self):
+        bitmap = self.index.bitmap(any_of=["pool"])
+        self.assertEqual(self.index.counts(bitmap),
+                         {"wifi": 1, "pool": 2, "gym": 1})
+        self.assertEqual(self.index.counts(facets=["wifi", "sauna"]),
+                         {"wifi": 2, "sauna": 0})
+
+    def test_update_and_remove_reuse_ordinals(self):
+        place = self.places["b"]
+        place.amenity_ids = ["gym"]
+        self.index.add("Place.b", place)
+        self.assertEqual(self.index.query(all_of=["wifi"]), ["Place.a"])
+
+        self.index.remove("Place.a")
+        self.assertEqual(self.index.query(any_of=["wifi"]), [])
+        self.index.add("Place.e", Place(amenity_ids=["wifi"]))
+        self.assertEqual(self.index.query(all_of=["wifi"]), ["Place.e"])
+        self.assertEqual(len(self.index), 4)
+
+    def test_bitsets_grow_and_shrink_in_place(self):
+        index = BitmapIndex()
+        places = [Place(amenity_ids=["wifi"] if i % 3 else ["pool"])
+                  for i in range(100)]
+        for i, place in enumerate(places):
+            index.add(f"Place.{i}", place)
+        self.assertEqual(index.counts(), {"wifi": 66, "pool": 34})
+        for i in range(0, 100, 3):
+            index.remove(f"Place.{i}")
+        self.assertEqual(index.counts(), {"wifi": 66})
+        self.assertEqual(index.query(all_of=["wifi"])[-1], "Place.98")
+        self.assertEqual(index.query(none_of=["wifi"]), [])
+
+
+class TestStorageFacets(unittest.TestCase):
+
+    def setUp(self):
+        self.storage = FileStorage()
+        self.storage._FileStorage__objects = {}
+        self.storage._FileStorage__file_path = "test_file.json"
+        models.storage = self.storage
+
+    def tearDown(self):
+        if os.path.exists("test_file.json"):
+            os.remove("test_file.json")
+
+    def test_facets_follow_updates_and_reload(self):
+        wifi = Place(name="wifi", amenity_ids=["w"])
+        both = Place(name="both", amenity_ids=["w", "p"])
+        places, counts = self.storage.facets(all_of=["w"])
+        self.assertEqual(places, [wifi, both])
+        self.assertEqual(counts, {"w": 2, "p": 1})
+
+        both.amenity_ids = ["p"]
+        both.save()
+        self.assertEqual(self.storage.facets(all_of=["w"])[0], [wifi])
+        self.storage.delete(wifi)
+        self.assertEqual(self.storage.facets(any_of=["w"])[0], [])
+
+        storage = FileStorage()
+        storage._FileStorage__objects = {}
+        storage._FileStorage__file_path = "test_file.json"
+        storage.reload()
+        places, _ = storage.facets(all_of=["p"])
+        self.assertEqual([p.id for p in places], [both.id])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+#!/usr/bin/python3
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import models
+from models.engine.cache import ResultCache
+from models.engine.file_storage import FileStorage
+from models.city import City
+from models.state import State
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.storage = FileStorage()
+        self.storage._FileStorage__objects = {}
+        self.storage._FileStorage__file_path = os.path.join(
+            self.directory, "file.json")
+        patcher = patch.object(models, "storage", self.storage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.state = State(name="CA")
+        self.city = City(name="SF", state_id=self.state.id)
+        self.cache = ResultCache(self.storage, maxsize=3)
+        self.calls = 0
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.directory)
+
+    def compute(self):
+        self.calls += 1
+        return self.calls
+
+    def test_hit_until_a_dependency_changes(self):
+        key = f"State.{self.state.id}"
+        first = self.cache.fetch("state", self.compute, (key,))
+        self.cache.fetch("cities", self.compute, ("City",))
+        self.assertIs(self.cache.fetch("state", self.compute, (key,)),
+                      first)
+
+        City(name="LA")
+        self.assertIs(self.cache.fetch("state", self.compute, (key,)),
+                      first)
+        self.assertEqual(self.cache.fetch("cities", self.compute,
+                                          ("City",)).value, 3)
+
+        self.state.name = "NV"
+        self.storage.new(self.state)
+        second = self.cache.fetch("state", self.compute, (key,))
+        self.assertEqual(second.value, 4)
+        self.assertNotEqual(second.etag, first.etag)
+        self.assertEqual(self.cache.stats(), {"entries": 2, "hits": 2,
+                                              "misses": 4,
+                                              "invalidations": 2})
+
+    def test_unpublished_changes_clear_everything(self):
+        self.cache.fetch("state", self.compute, ("State",))
+        self.storage.save()
+        self.storage.reload()
+        self.assertEqual(self.cache.fetch("state", self.compute,
+                                          ("State",)).value, 2)
+
+    def test_least_recently_used_is_evicted(self):
+        for name in "abcd":
+            self.cache.fetch(name, self.compute)
+            self.cache.fetch("a", self.compute)
+        self.assertEqual(len(self.cache), 3)
+        self.assertEqual(self.cache.fetch("a", self.compute).value, 1)
+        self.assertEqual(self.cache.fetch("b", self.compute).value, 5)
+
+    def test_without_change_feed(self):
+        storage = MagicMock(spec=["version"])
+        storage.version = 1
+        cache = ResultCache(storage)
+        self.assertEqual(cache.fetch("k", self.compute).value, 1)
+        self.assertEqual(cache.fetch("k", self.compute).value, 1)
+        storage.version = 2
+        self.assertEqual(cache.fetch("k", self.compute).value, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/python3
+
+import os
+import threading
+import unittest
+
+from models.engine.changes import ChangeFeed, last_seq
+
+
+class TestChangeFeed(unittest.TestCase):
+
+    def setUp(self):
+        self.log_file = "test_changes.log"
+
+    def tearDown(self):
+        if os.path.exists(self.log_file):
+            os.remove(self.log_file)
+
+    def test_inactive_without_consumers(self):
+        feed = ChangeFeed()
+        self.assertFalse(feed.active)
+        callback = feed.subscribe(lambda event: None)
+        self.assertTrue(feed.active)
+        feed.unsubscribe(callback)
+        self.assertFalse(feed.active)
+
+    def test_publish_orders_events(self):
+        feed = ChangeFeed()
+        events = []
+        feed.subscribe(events.append)
+
+        feed.publish("create", "User.1", {"id": "1"})
+        feed.publish("delete", "User.1")
+
+        self.assertEqual([e["seq"] for e in events], [1, 2])
+        self.assertEqual([e["op"] for e in events], ["create", "delete"])
+        self.assertEqual(events[0]["data"], {"id": "1"})
+        self.assertIsNone(events[1]["data"])
+
+    def test_log_read_since(self):
+        feed = ChangeFeed(self.log_file)
+        for i in range(5):
+            feed.publish("create", f"User.{i}")
+        feed.close_log()
+
+        self.assertEqual([e["key"] for e in feed.read(since=3)],
+                         ["User.3", "User.4"])
+        self.assertEqual(last_seq(self.log_file), 5)
+
+    def test_sequence_resumes_after_restart(self):
+        feed = ChangeFeed(self.log_file)
+        feed.publish("create", "User.1")
+        feed.publish("create", "User.2")
+        feed.close_log()
+
+        restarted = ChangeFeed(self.log_file)
+        event = restarted.publish("update", "User.1")
+        restarted.close_log()
+
+        self.assertEqual(event["seq"], 3)
+        self.assertEqual([e["seq"] for e in restarted.read()], [1, 2, 3])
+
+    def test_follow(self):
+        feed = ChangeFeed(self.log_file)
+        feed.publish("create", "User.1")
+        stop = threading.Event()
+        seen = []
+
+        def consume():
+            for event in feed.follow(since=0, interval=0.01, stop=stop):
+                seen.append(event["seq"])
+                if len(seen) == 2:
+                    stop.set()
+
+        thread = threading.Thread(target=consume)
+        thread.start()
+        feed.publish("create", "User.2")
+        thread.join(5)
+        feed.close_log()
+
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(seen, [1, 2])
+
+    def test_last_seq_missing_file(self):
+        self.assertEqual(last_seq(self.log_file), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+#!/usr/bin/python3
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+import models
+from models.engine.cluster import ClusterStorage, HashRing
+from models.engine.file_storage import FileStorage
+from models.engine.server import StorageServer
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
+
+
+class TestHashRing(unittest.TestCase):
+
+    def test_spread_and_stability(self):
+        ring = HashRing(["a", "b", "c"])
+        keys = [f"Place.{i}" for i in range(3000)]
+        before = {key: ring.node_for(key) for key in keys}
+        counts = {n: list(before.values()).count(n) for n in "abc"}
+        self.assertTrue(all(count > 600 for count in counts.values()))
+
+        ring.add("d")
+        moved = [key for key in keys if ring.node_for(key) != before[key]]
+        self.assertTrue(all(ring.node_for(key) == "d" for key in moved))
+        self.assertLess(len(moved), 1200)
+
+        ring.remove("d")
+        self.assertEqual({key: ring.node_for(key) for key in keys}, before)
+
+
+class TestClusterStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.servers = {}
+        for i in range(3):
+            self.start_node(i)
+        self.storage = ClusterStorage(list(self.servers)[:2])
+        patcher = patch.object(models, "storage", self.storage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def start_node(self, i):
+        storage = FileStorage()
+        storage._FileStorage__objects = {}
+        storage._FileStorage__file_path = os.path.join(
+            self.directory, f"node{i}.json")
+        server = StorageServer(os.path.join(self.directory, f"node{i}"),
+                               storage)
+        thread = threading.Thread(target=server.serve_forever,
+                                  args=(0.05,))
+        thread.start()
+        self.servers[server.server_address] = (server, thread, storage)
+
+    def tearDown(self):
+        self.storage.close()
+        for server, thread, _ in self.servers.values():
+            server.shutdown()
+            server.server_close()
+            thread.join()
+        shutil.rmtree(self.directory)
+
+    def stored(self, i):
+        return list(self.servers.values())[i][2].all()
+
+    def test_keys_are_partitioned(self):
+        places = [Place(price_by_night=i) for i in range(40)]
+        self.assertEqual(len(self.storage.all()), 40)
+        self.assertGreater(len(self.stored(0)), 0)
+        self.assertGreater(len(self.stored(1)), 0)
+        self.assertEqual(len(self.stored(0)) + len(self.stored(1)), 40)
+        self.assertEqual(self.storage.get(f"Place.{places[3].id}").id,
+                         places[3].id)
+        keys = [f"Place.{place.id}" for place in places]
+        self.assertEqual(list(self.storage.get_many(keys + ["Place.x"])),
+                         keys)
+
+    def test_query_merges_order_and_limit(self):
+        for i in range(30):
+            Place(price_by_night=i)
+        prices = [p.price_by_night for p in self.storage.query(
+            "Place where price_by_night >= 10 order by price_by_night "
+            "desc limit 5")]
+        self.assertEqual(prices, [29, 28, 27, 26, 25])
+        self.assertEqual(self.storage.explain("Place")["rows_returned"],
+                         30)
+
+    def test_relations_and_top_cross_nodes(self):
+        state = State()
+        cities = [City(state_id=state.id) for _ in range(10)]
+        place = Place()
+        for _ in range(4):
+            Review(place_id=place.id)
+
+        self.assertEqual(len(state.cities), 10)
+        (top, count), = self.storage.top("Place", "reviews")
+        self.assertEqual((top.id, count), (place.id, 4))
+
+        removed = self.storage.delete(state, cascade=True)
+        self.assertEqual(len(removed), 1 + len(cities))
+        self.assertEqual(self.storage.query("City"), [])
+
+    def test_add_and_remove_node(self):
+        for _ in range(60):
+            Place()
+        self.storage.save()
+        moved = self.storage.add_node(list(self.servers)[2])
+        self.assertGreater(moved, 0)
+        self.assertEqual(len(self.stored(2)), moved)
+        self.assertEqual(len(self.storage.all()), 60)
+
+        self.storage.remove_node(list(self.servers)[0])
+        self.assertEqual(self.stored(0), {})
+        self.assertEqual(len(self.storage.all()), 60)
+        self.assertTrue(os.path.exists(os.path.join(self.directory,
+                                                    "node2.json")))
+
+    def test_version_grows_and_last_node_stays(self):
+        versions = [self.storage.version]
+        Place()
+        versions.append(self.storage.version)
+        self.storage.add_node(list(self.servers)[2])
+        versions.append(self.storage.version)
+        for path in list(self.servers)[:2]:
+            self.storage.remove_node(path)
+            versions.append(self.storage.version)
+        self.assertEqual(versions, sorted(set(versions)))
+
+        with self.assertRaises(ValueError):
+            self.storage.remove_node(list(self.servers)[2])
+        self.assertEqual(len(self.storage.all()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+#!/usr/bin/python3
+
+import io
+import json
+import os
+import unittest
+from unittest.mock import MagicMock
+
+import models
+from models.engine import compression
+from models.engine.compression import codec_for, iter_records, \
+    open_compressed
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.user import User
+
+
+class TestCodecSelection(unittest.TestCase):
+
+    def test_extension(self):
+        self.assertEqual(codec_for("file.json.gz"), "gzip")
+        self.assertEqual(codec_for("file.json.xz"), "lzma")
+        self.assertEqual(codec_for("file.json.zz"), "zlib")
+        self.assertIsNone(codec_for("file.json"))
+
+    def test_configuration_wins(self):
+        self.assertEqual(codec_for("file.json", "LZMA"), "lzma")
+        self.assertIsNone(codec_for("file.json.gz", "none"))
+        with self.assertRaises(ValueError):
+            codec_for("file.json", "bz3")
+
+
+class TestIterRecords(unittest.TestCase):
+
+    def test_streams_records_across_chunks(self):
+        data = {f"User.{i}": {"id": str(i), "name": "x" * (i % 50),
+                              "n": i, "ok": True, "v": None}
+                for i in range(300)}
+        original = compression.CHUNK_SIZE
+        compression.CHUNK_SIZE = 7
+        try:
+            records = list(iter_records(io.StringIO(json.dumps(data,
+                                                               indent=1))))
+        finally:
+            compression.CHUNK_SIZE = original
+        self.assertEqual(dict(records), data)
+
+    def test_empty_object(self):
+        self.assertEqual(list(iter_records(io.StringIO(" { } "))), [])
+
+    def test_invalid_json(self):
+        with self.assertRaises(json.JSONDecodeError):
+            list(iter_records(io.StringIO('{"a": 1 "b": 2}')))
+
+
+class TestCompressedStorage(unittest.TestCase):
+
+    def setUp(self):
+        models.storage = MagicMock()
+        self.paths = []
+
+    def tearDown(self):
+        for path in self.paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def roundtrip(self, path, codec=None):
+        self.paths.append(path)
+        storage = FileStorage()
+        storage._FileStorage__objects = {}
+        storage._FileStorage__file_path = path
+        storage._FileStorage__compression = codec
+        objs = [User(), Place()]
+        objs[1].name = "Compressed loft"
+        for obj in objs:
+            storage.new(obj)
+        storage.save()
+
+        storage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual(set(storage.all()),
+                         {f"{o.__class__.__name__}.{o.id}" for o in objs})
+        self.assertEqual(storage.all()[f"Place.{objs[1].id}"].name,
+                         "Compressed loft")
+
+    def test_codecs_by_extension(self):
+        for path in ("test_store.json.gz", "test_store.json.zz",
+                     "test_store.json.xz"):
+            with self.subTest(path=path):
+                self.roundtrip(path)
+                with open(path, "rb") as f:
+                    self.assertNotEqual(f.read(1), b"{")
+
+    def test_codec_by_configuration(self):
+        self.roundtrip("test_store.json", "zlib")
+        with open_compressed("test_store.json", "r", "zlib") as f:
+            self.assertEqual(len(json.load(f)), 2)
+
+    def test_switching_codecs(self):
+        path = "test_store.json"
+        self.paths.append(path)
+        storage = FileStorage()
+        storage._FileStorage__objects = {}
+        storage._FileStorage__file_path = path
+        user = User()
+        storage.new(user)
+        for codec in (None, "gzip", "lzma", "zlib", "none"):
+            with self.subTest(codec=codec):
+                storage._FileStorage__compression = codec
+                storage._FileStorage__objects = {}
+                storage.reload()
+                self.assertEqual(list(storage.all()), [f"User.{user.id}"]
+                                 if codec else [])
+                storage.new(user)
+                storage.save()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,9 @@
 
 import json
 import os
+import subprocess
+import sys
+import time
 import unittest
 from unittest.mock import patch, mock_open
 
@@ -202,6 +205,17 @@ class TestFileStorage(unittest.TestCase):
         self.assertIn(base_key, self.storage._FileStorage__objects)
         self.assertIn(user_key, self.storage._FileStorage__objects)
 
+    def test_reload_ignores_relation_values(self):
+        now = "2023-01-01T00:00:00"
+        with open(self.test_file, "w") as f:
+            json.dump({"Place.1": {"__class__": "Place", "id": "1",
+                                   "created_at": now, "updated_at": now,
+                                   "reviews": "foo", "name": "Loft"}}, f)
+        self.storage.reload()
+        place = self.storage.all()["Place.1"]
+        self.assertEqual(place.name, "Loft")
+        self.assertNotIn("reviews", place.to_dict())
+
     def test_objects_persistence(self):
         user = User()
         user.email = "persist@test.com"
@@ -242,6 +256,306 @@ class TestFileStorage(unittest.TestCase):
         self.storage.reload()
         self.assertEqual(len(self.storage._FileStorage__objects), 0)
 
+    def test_delete_method(self):
+        user = User()
+        self.storage.new(user)
+
+        removed = self.storage.delete(user)
+
+        self.assertEqual(removed, [user])
+        self.assertNotIn(f"User.{user.id}", self.storage.all())
+        self.assertEqual(self.storage.delete(None), [])
+        self.assertEqual(self.storage.delete(user), [])
+
+    def test_delete_without_cascade_keeps_dependents(self):
+        state = State()
+        city = City()
+        city.state_id = state.id
+        self.storage.new(state)
+        self.storage.new(city)
+
+        self.storage.delete(state)
+
+        self.assertIn(f"City.{city.id}", self.storage.all())
+
+    def test_delete_cascade(self):
+        state = State()
+        city = City()
+        city.state_id = state.id
+        user = User()
+        place = Place()
+        place.city_id = city.id
+        place.user_id = user.id
+        review = Review()
+        review.place_id = place.id
+        review.user_id = user.id
+        other = City()
+        other.state_id = "another-state"
+        for obj in (state, city, user, place, review, other):
+            self.storage.new(obj)
+
+        removed = self.storage.delete(state, cascade=True)
+
+        self.assertEqual({o.id for o in removed},
+                         {state.id, city.id, place.id, review.id})
+        self.assertEqual(set(self.storage.all().keys()),
+                         {f"User.{user.id}", f"City.{other.id}"})
+
+    def test_dependents_follow_updates(self):
+        place = Place()
+        review = Review()
+        review.place_id = place.id
+        self.storage.new(place)
+        self.storage.new(review)
+        self.assertEqual(self.storage.dependents(place), [review])
+
+        review.place_id = "elsewhere"
+        self.storage.new(review)
+        self.assertEqual(self.storage.dependents(place), [])
+
+    def test_dependents_after_objects_replaced(self):
+        place = Place()
+        review = Review()
+        review.place_id = place.id
+        self.storage.new(review)
+
+        self.storage._FileStorage__objects = {}
+        self.assertEqual(self.storage.dependents(place), [])
+
+    def test_prefetch_reverse_relation(self):
+        places = [Place(), Place()]
+        reviews = [Review(), Review(), Review()]
+        reviews[0].place_id = places[0].id
+        reviews[1].place_id = places[0].id
+        reviews[2].place_id = places[1].id
+        for obj in places + reviews:
+            self.storage.new(obj)
+
+        result = self.storage.prefetch(places, "reviews")
+
+        self.assertEqual(set(result[places[0].id]), set(reviews[:2]))
+        self.assertEqual(result[places[1].id], [reviews[2]])
+
+    def test_prefetch_forward_relation(self):
+        wifi = Amenity()
+        pool = Amenity()
+        place = Place()
+        place.amenity_ids = [wifi.id, "missing", pool.id]
+        for obj in (wifi, pool, place):
+            self.storage.new(obj)
+
+        result = self.storage.prefetch([place], "amenities")
+
+        self.assertEqual(result[place.id], [wifi, pool])
+
+    def test_prefetch_unknown_relation(self):
+        with self.assertRaises(AttributeError):
+            self.storage.prefetch([State()], "reviews")
+
+    def test_search_follows_updates_and_deletes(self):
+        place = Place()
+        place.name = "Lake cabin"
+        self.storage.new(place)
+        self.assertEqual(self.storage.search("lake"), [place])
+
+        place.name = "Forest cabin"
+        self.storage.new(place)
+        self.assertEqual(self.storage.search("lake"), [])
+        self.assertEqual(self.storage.search("forest", "Place"), [place])
+
+        self.storage.delete(place)
+        self.assertEqual(self.storage.search("cabin"), [])
+
+    def test_search_index_persistence(self):
+        place = Place()
+        place.name = "Harbour view"
+        self.storage.new(place)
+        gone = Place()
+        gone.name = "Harbour shed"
+        self.storage._FileStorage__persist_search = True
+        try:
+            self.storage.new(gone)
+            self.storage.save()
+            self.assertTrue(os.path.exists(self.test_file + ".search"))
+            with open(self.test_file, "w") as f:
+                json.dump({f"Place.{place.id}": place.to_dict()}, f)
+
+            self.storage._FileStorage__objects = {}
+            self.storage.reload()
+
+            self.assertEqual([o.id for o in self.storage.search("harbour")],
+                             [place.id])
+        finally:
+            if os.path.exists(self.test_file + ".search"):
+                os.remove(self.test_file + ".search")
+
+    def test_change_events(self):
+        events = []
+        self.storage.changes.subscribe(events.append)
+        user = User()
+
+        self.storage.new(user)
+        user.first_name = "Ada"
+        self.storage.new(user)
+        self.storage.delete(user)
+
+        key = f"User.{user.id}"
+        self.assertEqual([(e["op"], e["key"]) for e in events],
+                         [("create", key), ("update", key),
+                          ("delete", key)])
+        self.assertEqual(events[1]["data"]["first_name"], "Ada")
+        self.assertEqual([e["seq"] for e in events], [1, 2, 3])
+
+    def test_reload_publishes_no_events(self):
+        self.storage.new(User())
+        self.storage.save()
+        events = []
+        self.storage.changes.subscribe(events.append)
+
+        self.storage._FileStorage__objects = {}
+        self.storage.reload()
+
+        self.assertEqual(len(self.storage.all()), 1)
+        self.assertEqual(events, [])
+
+    def test_top(self):
+        quiet, busy, author = Place(), Place(), User()
+        reviews = [Review(place_id=busy.id, user_id=author.id)
+                   for _ in range(3)]
+        for obj in [quiet, busy, author, Review(place_id=quiet.id)] + \
+                reviews:
+            self.storage.new(obj)
+
+        self.assertEqual(self.storage.top("Place", "reviews"),
+                         [(busy, 3), (quiet, 1)])
+        self.assertEqual(self.storage.top("User", "reviews", 1),
+                         [(author, 3)])
+
+        reviews[0].place_id = quiet.id
+        self.storage.new(reviews[0])
+        self.storage.delete(reviews[1])
+        self.assertEqual(self.storage.top("Place", "reviews", 1),
+                         [(quiet, 2)])
+        self.storage.delete(quiet)
+        self.assertEqual(self.storage.top("Place", "reviews"), [(busy, 1)])
+        with self.assertRaises(AttributeError):
+            self.storage.top("Place", "amenities")
+
+    def test_refresh_applies_only_the_delta(self):
+        kept, changed, removed = State(), State(), State()
+        for obj in (kept, changed, removed):
+            self.storage.new(obj)
+        self.storage.save()
+        self.assertIsNone(self.storage.refresh())
+
+        other = FileStorage()
+        with patch.object(FileStorage, "_FileStorage__objects", {}):
+            other._FileStorage__file_path = self.test_file
+            objects = other.all()
+            objects[f"State.{changed.id}"].name = "Nevada"
+            other.delete(objects[f"State.{removed.id}"])
+            added = City(name="Reno")
+            other.new(added)
+            other.save()
+
+        delta = self.storage.refresh()
+        self.assertEqual(delta, {"added": [f"City.{added.id}"],
+                                 "changed": [f"State.{changed.id}"],
+                                 "removed": [f"State.{removed.id}"]})
+        objects = self.storage.all()
+        self.assertIs(objects[f"State.{kept.id}"], kept)
+        self.assertEqual(objects[f"State.{changed.id}"].name, "Nevada")
+        self.assertNotIn(f"State.{removed.id}", objects)
+        self.assertEqual(self.storage.query("City where name == Reno")[0].id,
+                         added.id)
+        self.assertIsNone(self.storage.refresh())
+
+    def test_refresh_keeps_unsaved_changes(self):
+        saved, doomed = State(), State()
+        for obj in (saved, doomed):
+            self.storage.new(obj)
+        self.storage.save()
+        added = State()
+        self.storage.new(added)
+        saved.name = "Nevada"
+        self.storage.new(saved)
+        self.storage.delete(doomed)
+
+        with open(self.test_file, "a") as f:
+            f.write(" ")
+        self.assertEqual(self.storage.refresh(),
+                         {"added": [], "changed": [], "removed": []})
+        objects = self.storage.all()
+        self.assertIs(objects[f"State.{added.id}"], added)
+        self.assertEqual(objects[f"State.{saved.id}"].name, "Nevada")
+        self.assertNotIn(f"State.{doomed.id}", objects)
+
+    def test_refresh_during_save(self):
+        self.storage.new(State())
+        self.storage.save()
+        late = []
+        real_dump = json.dump
+
+        def dump(data, f):
+            real_dump(data, f)
+            f.flush()
+            late.append(State())
+            self.storage.new(late[-1])
+            late.append(self.storage.refresh())
+
+        with patch("json.dump", side_effect=dump):
+            self.storage.save()
+        obj, delta = late
+        self.assertEqual(delta, {"added": [], "changed": [], "removed": []})
+        self.assertIn(f"State.{obj.id}", self.storage.all())
+        self.assertIsNone(self.storage.refresh())
+        self.storage.save()
+        self.assertIsNone(self.storage.refresh())
+        with open(self.test_file) as f:
+            self.assertIn(f"State.{obj.id}", json.load(f))
+
+    def test_watch(self):
+        self.storage.save()
+        deltas = []
+        self.storage.watch(0.01, deltas.append)
+        self.addCleanup(self.storage.unwatch)
+        with open(self.test_file, "w") as f:
+            json.dump({"User.1": {"__class__": "User", "id": "1"}}, f)
+        for _ in range(500):
+            if deltas:
+                break
+            time.sleep(0.01)
+        self.assertEqual(deltas, [{"added": ["User.1"], "changed": [],
+                                   "removed": []}])
+
+    def test_import_does_not_load(self):
+        code = ("import builtins, models\n"
+                "opened = []\n"
+                "real_open = builtins.open\n"
+                "builtins.open = lambda *a, **k: (opened.append(a[0]),"
+                " real_open(*a, **k))[1]\n"
+                "import console\n"
+                "console.HBNBCommand().onecmd('help quit')\n"
+                "assert not models.storage._FileStorage__loaded\n"
+                "assert 'file.json' not in opened, opened\n"
+                "models.storage.all()\n"
+                "assert models.storage._FileStorage__loaded\n")
+        root = os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__)))))
+        result = subprocess.run([sys.executable, "-c", code], cwd=root,
+                                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+    def test_first_access_loads(self):
+        with open(self.test_file, "w") as f:
+            json.dump({"User.1": {"__class__": "User", "id": "1"}}, f)
+        storage = FileStorage()
+        storage._FileStorage__file_path = self.test_file
+        objects = {}
+        with patch.object(FileStorage, "_FileStorage__objects", objects):
+            self.assertIn("User.1", storage.all())
+            self.assertIs(storage.all(), objects)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+
+import unittest
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import models
+from models.base_model import BaseModel
+from models.engine import ids
+
+
+class TestIds(unittest.TestCase):
+
+    def setUp(self):
+        models.storage = MagicMock()
+
+    def test_encode_decode(self):
+        value = (1 << 127) + 12345
+        self.assertEqual(ids.decode(ids.encode(value)), value)
+        self.assertEqual(len(ids.encode(0)), 26)
+
+    def test_ulid_is_compact_and_ordered(self):
+        generated = [ids.ulid() for _ in range(1000)]
+        self.assertTrue(all(len(i) == 26 for i in generated))
+        self.assertEqual(generated, sorted(generated))
+        self.assertEqual(len(set(generated)), 1000)
+
+    def test_timestamp(self):
+        moment = datetime(2024, 5, 17, 12, 30)
+        value = ids.ulid(moment.timestamp())
+        self.assertEqual(ids.timestamp(value), moment)
+        self.assertIsNone(ids.timestamp(str(uuid.uuid4())))
+
+    def test_lower_bound(self):
+        moment = datetime.now()
+        before = ids.ulid((moment - timedelta(seconds=1)).timestamp())
+        after = ids.ulid((moment + timedelta(seconds=1)).timestamp())
+        self.assertLess(before, ids.lower_bound(moment))
+        self.assertGreaterEqual(after, ids.lower_bound(moment))
+
+    def test_is_ulid(self):
+        self.assertTrue(ids.is_ulid(ids.ulid()))
+        self.assertFalse(ids.is_ulid(str(uuid.uuid4())))
+        self.assertFalse(ids.is_ulid("U" * 26))
+
+    def test_base_model_scheme(self):
+        with patch.object(BaseModel, "id_scheme", "ulid"):
+            model = BaseModel()
+        self.assertTrue(ids.is_ulid(model.id))
+        self.assertEqual(len(BaseModel().id), 36)
+
+    def test_uuid4_ids_still_load(self):
+        legacy = str(uuid.uuid4())
+        with patch.object(BaseModel, "id_scheme", "ulid"):
+            model = BaseModel(id=legacy, __class__="BaseModel")
+        self.assertEqual(model.id, legacy)
+
+
+if __name__ == '__main__':
+    unittest.main()
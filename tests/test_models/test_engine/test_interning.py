@@ -0,0 +1,56 @@
+#!/usr/bin/python3
+
+import unittest
+from unittest.mock import MagicMock
+
+import models
+from models.engine.interning import InternTable, memory_report, table
+from models.place import Place
+from models.city import City
+
+
+class TestInternTable(unittest.TestCase):
+
+    def setUp(self):
+        models.storage = MagicMock()
+
+    def test_intern_shares_equal_strings(self):
+        interned = InternTable()
+        first = interned.intern("".join(["abc", "-123"]))
+        second = interned.intern("".join(["abc", "-", "123"]))
+        self.assertIs(first, second)
+
+    def test_table_is_bounded(self):
+        interned = InternTable(maxsize=2)
+        for value in ("a1", "b2", "c3"):
+            interned.intern(value)
+        self.assertEqual(len(interned), 2)
+        value = "".join(["c", "3"])
+        self.assertIs(interned.intern(value), value)
+
+    def test_reload_shares_foreign_keys(self):
+        city = City()
+        city_id = "".join(list(city.id))
+        kwargs = {"__class__": "Place", "id": "p1", "city_id": city_id}
+        place = Place(**kwargs)
+        self.assertIs(place.city_id, city.id)
+        self.assertIs(table.intern(city_id), city.id)
+
+    def test_memory_report(self):
+        shared = "s" * 40
+        places = {}
+        for i in range(3):
+            place = Place.__new__(Place)
+            place.city_id = shared
+            place.number = i
+            places[f"Place.{i}"] = place
+
+        report = memory_report(places)["Place"]
+
+        self.assertEqual(report["objects"], 3)
+        self.assertEqual(report["strings"], 3)
+        self.assertEqual(report["saved_bytes"], 2 * report["shared_bytes"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+#!/usr/bin/python3
+
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+import models
+from models.engine.file_storage import FileStorage
+from models.engine.metrics import BUCKETS, Metrics, merge, prometheus, \
+    quantile
+from models.place import Place
+from models.user import User
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_observe_and_quantile(self):
+        metrics = Metrics()
+        for _ in range(99):
+            metrics.observe("op", 0.0003)
+        metrics.observe("op", 3.0, error=True)
+        entry = metrics.report()["operations"]["op"]
+        self.assertEqual((entry["count"], entry["errors"]), (100, 1))
+        self.assertAlmostEqual(entry["sum"], 99 * 0.0003 + 3.0)
+        self.assertEqual(sum(entry["buckets"]), 100)
+        self.assertTrue(0.00025 < quantile(entry, 0.5) <= 0.0005)
+        self.assertTrue(2.5 < quantile(entry, 1.0) <= 5.0)
+        self.assertEqual(entry["buckets"][-1], 0)
+        metrics.observe("op", 60.0)
+        entry = metrics.report()["operations"]["op"]
+        self.assertEqual(entry["buckets"][-1], 1)
+        self.assertEqual(quantile(entry, 1.0), BUCKETS[-1])
+
+    def test_timer_records_errors(self):
+        metrics = Metrics()
+        with metrics.timer("ok"):
+            pass
+        with self.assertRaises(KeyError):
+            with metrics.timer("fails"):
+                raise KeyError("x")
+        operations = metrics.report()["operations"]
+        self.assertEqual(operations["ok"]["errors"], 0)
+        self.assertEqual(operations["fails"]["errors"], 1)
+
+    def test_reset(self):
+        metrics = Metrics()
+        metrics.observe("op", 0.1)
+        metrics.count("bytes", 10)
+        report = metrics.report(reset=True)
+        self.assertEqual(report["counters"], {"bytes": 10})
+        report = metrics.report()
+        self.assertEqual(report["operations"]["op"]["count"], 0)
+        self.assertEqual(report["counters"], {})
+
+    def test_threads(self):
+        metrics = Metrics()
+
+        def work():
+            for _ in range(1000):
+                metrics.observe("op", 0.001)
+                metrics.count("calls")
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        report = metrics.report()
+        self.assertEqual(report["operations"]["op"]["count"], 4000)
+        self.assertEqual(report["counters"]["calls"], 4000)
+
+    def test_merge(self):
+        first, second = Metrics(), Metrics()
+        first.observe("op", 0.001)
+        second.observe("op", 0.002)
+        second.count("bytes", 5)
+        reports = [first.report(), second.report()]
+        reports[0]["objects"] = {"User": 2}
+        reports[1]["objects"] = {"User": 1, "Place": 1}
+        total = merge(reports)
+        self.assertEqual(total["operations"]["op"]["count"], 2)
+        self.assertEqual(sum(total["operations"]["op"]["buckets"]), 2)
+        self.assertEqual(total["counters"], {"bytes": 5})
+        self.assertEqual(total["objects"], {"User": 3, "Place": 1})
+
+    def test_prometheus(self):
+        metrics = Metrics()
+        metrics.observe('storage."save"', 0.0002)
+        metrics.observe('storage."save"', 20.0)
+        metrics.count("storage.bytes_written", 42)
+        report = metrics.report()
+        report["objects"] = {"Place": 3}
+        lines = prometheus(report).splitlines()
+        self.assertIn("# TYPE hbnb_operation_duration_seconds histogram",
+                      lines)
+        op = 'operation="storage.\\"save\\""'
+        self.assertIn(f'hbnb_operation_duration_seconds_bucket{{{op},'
+                      f'le="0.00025"}} 1', lines)
+        self.assertIn(f'hbnb_operation_duration_seconds_bucket{{{op},'
+                      f'le="10.0"}} 1', lines)
+        self.assertIn(f'hbnb_operation_duration_seconds_bucket{{{op},'
+                      f'le="+Inf"}} 2', lines)
+        self.assertIn(f'hbnb_operation_duration_seconds_count{{{op}}} 2',
+                      lines)
+        self.assertIn("hbnb_storage_bytes_written_total 42", lines)
+        self.assertIn('hbnb_objects{class="Place"} 3', lines)
+
+
+class TestStorageMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.storage = FileStorage()
+        self.storage._FileStorage__objects = {}
+        self.storage._FileStorage__file_path = os.path.join(
+            self.directory.name, "file.json")
+        patcher = patch.object(models, "storage", self.storage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_perf_report(self):
+        User()
+        Place().save()
+        self.storage.query("Place limit 1")
+        size = os.path.getsize(self.storage._FileStorage__file_path)
+        self.storage.reload()
+        report = self.storage.perf_report()
+        operations = report["operations"]
+        self.assertEqual(operations["storage.new"]["count"], 3)
+        self.assertEqual(operations["storage.save"]["count"], 1)
+        self.assertEqual(operations["storage.reload"]["count"], 1)
+        self.assertEqual(operations["storage.query"]["count"], 1)
+        self.assertEqual(report["counters"], {
+            "storage.bytes_written": size, "storage.bytes_read": size})
+        self.assertEqual(report["objects"], {"User": 1, "Place": 1})
+
+        self.storage.perf_report(reset=True)
+        report = self.storage.perf_report()
+        self.assertEqual(report["operations"]["storage.new"]["count"], 0)
+        self.assertEqual(report["objects"], {"User": 1, "Place": 1})
+
+    def test_object_counts_without_indexes(self):
+        User()
+        self.storage._FileStorage__objects = dict(self.storage.all())
+        self.assertEqual(self.storage.perf_report()["objects"], {"User": 1})
+
+    def test_dump_and_export(self):
+        Place().save()
+        path = os.path.join(self.directory.name, "metrics.prom")
+        self.storage.dump_metrics(path)
+        with open(path, "r") as f:
+            text = f.read()
+        self.assertIn('hbnb_operation_duration_seconds_count'
+                      '{operation="storage.save"} 1', text)
+        os.remove(path)
+
+        self.storage.export_metrics(path, 0.01)
+        self.addCleanup(self.storage.stop_metrics_export)
+        for _ in range(200):
+            if os.path.exists(path):
+                break
+            threading.Event().wait(0.01)
+        self.assertTrue(os.path.exists(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+#!/usr/bin/python3
+
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+import models
+from models.engine.file_storage import FileStorage
+from models.engine.mvcc import VersionedDict
+from models.city import City
+from models.state import State
+from models.user import User
+
+
+class TestVersionedDict(unittest.TestCase):
+
+    def test_write_without_snapshot_is_in_place(self):
+        objects = {"a": 1}
+        versions = VersionedDict(objects)
+        versions.writable()["b"] = 2
+        self.assertIs(versions.objects, objects)
+        self.assertEqual(versions.version, 1)
+
+    def test_snapshot_keeps_its_version(self):
+        versions = VersionedDict({"a": 1})
+        snap = versions.snapshot()
+
+        versions.writable()["b"] = 2
+        versions.writable()["c"] = 3
+
+        self.assertEqual(dict(snap), {"a": 1})
+        self.assertEqual(versions.objects, {"a": 1, "b": 2, "c": 3})
+        self.assertEqual(snap.version, 0)
+        snap.close()
+
+    def test_closed_snapshot_releases_pin(self):
+        versions = VersionedDict({})
+        with versions.snapshot():
+            self.assertEqual(versions.pinned, 1)
+        self.assertEqual(versions.pinned, 0)
+        live = versions.objects
+        versions.writable()["a"] = 1
+        self.assertIs(versions.objects, live)
+
+    def test_garbage_collected_snapshot_releases_pin(self):
+        versions = VersionedDict({})
+        versions.snapshot()
+        self.assertEqual(versions.pinned, 0)
+
+
+class TestStorageSnapshots(unittest.TestCase):
+
+    def setUp(self):
+        models.storage = MagicMock()
+        self.storage = FileStorage()
+        self.storage._FileStorage__objects = {}
+
+    def test_snapshot_isolated_from_writes(self):
+        user = User()
+        self.storage.new(user)
+        snap = self.storage.snapshot()
+
+        other = User()
+        self.storage.new(other)
+        self.storage.delete(user)
+
+        self.assertEqual(list(snap), [f"User.{user.id}"])
+        self.assertEqual(list(self.storage.all()), [f"User.{other.id}"])
+        self.assertEqual(list(self.storage._FileStorage__objects),
+                         [f"User.{other.id}"])
+        snap.close()
+
+    def test_cascade_is_atomic_for_readers(self):
+        state = State()
+        city = City()
+        city.state_id = state.id
+        self.storage.new(state)
+        self.storage.new(city)
+
+        with self.storage.snapshot() as before:
+            self.storage.delete(state, cascade=True)
+            with self.storage.snapshot() as after:
+                self.assertEqual(len(before), 2)
+                self.assertEqual(len(after), 0)
+
+    def test_indexes_survive_copy_on_write(self):
+        state = State()
+        self.storage.new(state)
+        with self.storage.snapshot():
+            city = City()
+            city.state_id = state.id
+            self.storage.new(city)
+        self.assertEqual(self.storage.dependents(state), [city])
+
+    def test_version_increases(self):
+        version = self.storage.version
+        self.storage.new(User())
+        self.assertGreater(self.storage.version, version)
+
+    def test_scan_while_writing(self):
+        for _ in range(200):
+            self.storage.new(User())
+        stop = threading.Event()
+
+        def write():
+            while not stop.is_set():
+                user = User()
+                self.storage.new(user)
+                self.storage.delete(user)
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        try:
+            for _ in range(50):
+                with self.storage.snapshot() as snap:
+                    self.assertEqual(
+                        sum(1 for key in snap if snap[key] is not None),
+                        len(snap))
+        finally:
+            stop.set()
+            writer.join()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+#!/usr/bin/python3
+
+import unittest
+from unittest.mock import MagicMock
+
+import models
+from models.engine.file_storage import FileStorage
+from models.engine.query import Query, QueryError
+from models.place import Place
+from models.user import User
+
+
+class TestQueryParse(unittest.TestCase):
+
+    def test_parse_full_query(self):
+        query = Query.parse('Place where price_by_night < 100 and '
+                            'city_id == "abc-1" order by price_by_night '
+                            'desc limit 20')
+
+        self.assertEqual(query.cls_name, "Place")
+        self.assertEqual(query.conditions,
+                         [("price_by_night", "<", 100),
+                          ("city_id", "==", "abc-1")])
+        self.assertEqual(query.order_by, "price_by_night")
+        self.assertTrue(query.descending)
+        self.assertEqual(query.limit, 20)
+
+    def test_parse_class_only(self):
+        query = Query.parse("User")
+        self.assertEqual(query.cls_name, "User")
+        self.assertEqual(query.conditions, [])
+        self.assertIsNone(query.limit)
+
+    def test_parse_quoted_values(self):
+        query = Query.parse(r'Place where name == "Big \"blue\" house"')
+        self.assertEqual(query.conditions,
+                         [("name", "==", 'Big "blue" house')])
+        self.assertEqual(Query.parse(str(query)).conditions,
+                         query.conditions)
+
+    def test_parse_errors(self):
+        for text in ("Place where", "Place where name ==",
+                     "Place where name", "Place order name",
+                     "Place limit -1", "Place limit x",
+                     "Place extra"):
+            with self.assertRaises(QueryError):
+                Query.parse(text)
+
+    def test_numeric_match_coerces_values(self):
+        place = Place.__new__(Place)
+        place.price_by_night = "80"
+        query = Query()
+        self.assertTrue(query.matches(place, ("price_by_night", "<", 100)))
+        self.assertFalse(query.matches(place, ("name", "<", 100)))
+        self.assertFalse(query.matches(place, ("missing", "==", "x")))
+
+
+class TestQueryPlanner(unittest.TestCase):
+
+    def setUp(self):
+        models.storage = MagicMock()
+        self.storage = FileStorage()
+        self.storage._FileStorage__objects = {}
+        self.places = []
+        for i in range(20):
+            place = Place()
+            place.city_id = "city-a" if i % 4 == 0 else "city-b"
+            place.price_by_night = i * 10
+            place.name = f"Place {i:02d}"
+            self.storage.new(place)
+            self.places.append(place)
+        for _ in range(5):
+            self.storage.new(User())
+
+    def test_class_partition(self):
+        plan = self.storage.explain("User")
+        self.assertEqual(plan["access"], "class partition")
+        self.assertEqual(plan["rows_examined"], 5)
+        self.assertEqual(len(self.storage.query("User")), 5)
+
+    def test_key_lookup(self):
+        place = self.places[3]
+        plan = self.storage.explain(f'Place where id == "{place.id}"')
+        self.assertEqual(plan["access"], "key lookup")
+        self.assertEqual(plan["rows_examined"], 1)
+        self.assertEqual(self.storage.query(f'Place where id == '
+                                            f'"{place.id}"'), [place])
+
+    def test_hash_index(self):
+        query = 'Place where city_id == "city-a" and price_by_night > 50'
+        plan = self.storage.explain(query)
+
+        self.assertEqual(plan["access"], "hash index")
+        self.assertEqual(plan["index"], "Place.city_id")
+        self.assertEqual(plan["rows_examined"], 5)
+        self.assertEqual(plan["filter"], ["price_by_night > 50"])
+        self.assertEqual(
+            {p.id for p in self.storage.query(query)},
+            {p.id for p in self.places[4::4] if p.price_by_night > 50})
+
+    def test_sorted_index(self):
+        query = "Place where price_by_night < 30 order by price_by_night"
+        plan = self.storage.explain(query)
+
+        self.assertEqual(plan["access"], "sorted index")
+        self.assertEqual(plan["rows_examined"], 3)
+        self.assertEqual(self.storage.query(query), self.places[:3])
+
+    def test_ordered_index_scan_stops_at_limit(self):
+        query = "Place order by price_by_night desc limit 2"
+        plan = self.storage.explain(query)
+
+        self.assertEqual(plan["access"], "sorted index scan")
+        self.assertEqual(plan["rows_examined"], 2)
+        self.assertEqual(self.storage.query(query), self.places[:-3:-1])
+
+    def test_non_numeric_values_sort_last(self):
+        self.places[0].price_by_night = "free"
+        self.storage.new(self.places[0])
+        self.assertEqual(
+            self.storage.query("Place order by price_by_night limit 20")[-1],
+            self.places[0])
+        self.assertEqual(
+            self.storage.query("Place order by price_by_night")[-1],
+            self.places[0])
+
+    def test_full_scan(self):
+        plan = self.storage.explain("where name == \"Place 01\"")
+        self.assertEqual(plan["access"], "full scan")
+        self.assertEqual(plan["rows_examined"], 25)
+        self.assertEqual(plan["rows_returned"], 1)
+
+    def test_index_follows_updates(self):
+        place = self.places[0]
+        place.price_by_night = 1000
+        self.storage.new(place)
+        self.assertEqual(
+            self.storage.query("Place where price_by_night >= 1000"),
+            [place])
+        self.storage.delete(place)
+        self.assertEqual(
+            self.storage.query("Place where price_by_night >= 1000"), [])
+
+    def test_create_index(self):
+        self.storage.create_index("Place", "name")
+        plan = self.storage.explain('Place where name == "Place 05"')
+        self.assertEqual(plan["access"], "hash index")
+        self.assertEqual(plan["rows_examined"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,198 @@
+#!/usr/bin/python3
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import models
+from models.engine.changes import ChangeFeed
+from models.engine.client_storage import ClientStorage
+from models.engine.file_storage import FileStorage
+from models.engine.protocol import SnapshotRequired
+from models.engine.replication import Follower, ReplicationLog
+from models.engine.server import StorageServer
+from models.place import Place
+from models.state import State
+
+
+class TestReplicationLog(unittest.TestCase):
+
+    def test_since(self):
+        feed = ChangeFeed()
+        log = ReplicationLog(feed, maxlen=3, epoch="e")
+        for i in range(4):
+            feed.publish("create", f"Place.{i}")
+
+        self.assertEqual([e["seq"] for e in log.since(2, epoch="e")],
+                         [3, 4])
+        self.assertEqual(log.since(4, epoch="e"), [])
+        for seq, epoch in ((0, "e"), (5, "e"), (3, "other")):
+            with self.assertRaises(SnapshotRequired):
+                log.since(seq, epoch=epoch)
+
+    def test_since_waits_for_events(self):
+        feed = ChangeFeed()
+        log = ReplicationLog(feed)
+        timer = threading.Timer(0.05, feed.publish, ("delete", "Place.1"))
+        timer.start()
+        events = log.since(0, timeout=5, epoch=log.epoch)
+        timer.join()
+        self.assertEqual([e["key"] for e in events], ["Place.1"])
+
+
+class TestReplication(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.servers = []
+        self.primary_storage = self.make_storage("primary.json")
+        self.primary = self.serve("primary", self.primary_storage,
+                                  primary=True)
+        self.client = ClientStorage(self.primary.server_address)
+        patcher = patch.object(models, "storage", self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.client.close()
+        for server, thread in self.servers:
+            if thread.is_alive():
+                server.shutdown()
+                server.server_close()
+                thread.join()
+        shutil.rmtree(self.directory)
+
+    def make_storage(self, name):
+        storage = FileStorage()
+        storage._FileStorage__objects = {}
+        storage._FileStorage__file_path = os.path.join(self.directory, name)
+        return storage
+
+    def serve(self, name, storage, **kwargs):
+        server = StorageServer(os.path.join(self.directory, name), storage,
+                               **kwargs)
+        thread = threading.Thread(target=server.serve_forever, args=(0.05,))
+        thread.start()
+        self.servers.append((server, thread))
+        return server
+
+    def stop(self, server):
+        for running, thread in self.servers:
+            if running is server:
+                server.shutdown()
+                server.server_close()
+                thread.join()
+
+    def test_follower_applies_changes(self):
+        state = State(name="CA")
+        replica = self.make_storage("replica.json")
+        follower = Follower(replica, self.primary.server_address)
+        follower.poll()
+        self.assertIn(f"State.{state.id}", replica.all())
+
+        place = Place(name="Loft")
+        state.name = "Nevada"
+        state.save()
+        self.client.delete(place)
+        follower.poll()
+        self.assertEqual(replica.all()[f"State.{state.id}"].name, "Nevada")
+        self.assertNotIn(f"Place.{place.id}", replica.all())
+        status = follower.status()
+        self.assertEqual(status["lag"], 0)
+        self.assertEqual(status["seq"], status["primary_seq"])
+        follower.stop()
+
+    def test_client_has_no_change_feed(self):
+        epoch = self.primary.replication.epoch
+        reply = self.client.replication_changes(0, epoch=epoch)
+        self.assertEqual(reply["epoch"], epoch)
+        self.assertIsNone(getattr(self.client, "changes", None))
+
+    def test_restart_catches_up_from_checkpoint(self):
+        State()
+        checkpoint = os.path.join(self.directory, "replica.seq")
+        follower = Follower(self.make_storage("replica.json"),
+                            self.primary.server_address, checkpoint)
+        follower.poll()
+        follower.save()
+        follower.stop()
+        State()
+
+        replica = FileStorage()
+        replica._FileStorage__file_path = os.path.join(self.directory,
+                                                       "replica.json")
+        with patch.object(FileStorage, "_FileStorage__objects", {}):
+            follower = Follower(replica, self.primary.server_address,
+                                checkpoint)
+            with patch.object(ClientStorage, "replication_snapshot") as snap:
+                follower.poll()
+            snap.assert_not_called()
+            self.assertEqual(len(replica.all()), 2)
+        follower.stop()
+
+    def test_falls_back_to_snapshot(self):
+        replica = self.make_storage("replica.json")
+        follower = Follower(replica, self.primary.server_address)
+        follower.poll()
+        self.primary.replication = ReplicationLog(
+            self.primary_storage.changes, maxlen=2,
+            epoch=self.primary.replication.epoch)
+        for _ in range(5):
+            State()
+        follower.poll()
+        self.assertEqual(len(replica.all()), 5)
+        follower.stop()
+
+    def test_reload_on_primary_resyncs_followers(self):
+        state = State(name="CA")
+        replica = self.make_storage("replica.json")
+        follower = Follower(replica, self.primary.server_address)
+        follower.poll()
+        epoch = self.primary.replication.epoch
+
+        self.client.save()
+        path = self.primary_storage._FileStorage__file_path
+        with open(path) as f:
+            data = json.load(f)
+        data[f"State.{state.id}"]["name"] = "Nevada"
+        with open(path, "w") as f:
+            json.dump(data, f)
+        self.client.reload()
+
+        self.assertNotEqual(self.primary.replication.epoch, epoch)
+        follower.poll()
+        self.assertEqual(replica.all()[f"State.{state.id}"].name, "Nevada")
+        self.assertEqual(follower.epoch, self.primary.replication.epoch)
+        follower.stop()
+
+    def test_read_only_follower_and_promotion(self):
+        state = State()
+        replica = self.make_storage("replica.json")
+        server = self.serve("replica", replica,
+                            follow=self.primary.server_address)
+        deadline = time.monotonic() + 5
+        while f"State.{state.id}" not in replica.all() and \
+                time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertIn(f"State.{state.id}", replica.all())
+
+        reader = ClientStorage(server.server_address)
+        self.assertEqual(reader.status()["role"], "follower")
+        with self.assertRaises(PermissionError):
+            reader.new(state)
+
+        self.stop(self.primary)
+        self.assertEqual(reader.promote()["role"], "primary")
+        with patch.object(models, "storage", reader):
+            State()
+        self.assertEqual(len(replica.all()), 2)
+        reader.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
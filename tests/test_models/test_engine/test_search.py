@@ -0,0 +1,96 @@
+#!/usr/bin/python3
+
+import os
+import unittest
+from unittest.mock import MagicMock
+
+import models
+from models.engine.search import SearchIndex
+from models.place import Place
+from models.review import Review
+from models.user import User
+
+
+class TestSearchIndex(unittest.TestCase):
+
+    def setUp(self):
+        models.storage = MagicMock()
+        self.index = SearchIndex()
+        self.test_file = "test_search.json"
+
+    def tearDown(self):
+        if os.path.exists(self.test_file):
+            os.remove(self.test_file)
+
+    def make_place(self, name, description=""):
+        place = Place()
+        place.name = name
+        place.description = description
+        key = f"Place.{place.id}"
+        self.index.add(key, place)
+        return key
+
+    def test_tokenize_case_folds(self):
+        self.assertEqual(SearchIndex.tokenize("Cozy LOFT, near-beach"),
+                         ["cozy", "loft", "near", "beach"])
+
+    def test_only_text_classes_indexed(self):
+        self.index.add("User.1", User())
+        self.assertEqual(len(self.index), 0)
+
+    def test_search_ranks_by_relevance(self):
+        beach = self.make_place("Beach house", "Beach view, beach access")
+        loft = self.make_place("City loft", "Close to the beach")
+        self.make_place("Cabin", "Mountains")
+
+        hits = self.index.search("beach")
+
+        self.assertEqual([key for key, _ in hits], [beach, loft])
+        self.assertGreater(hits[0][1], hits[1][1])
+
+    def test_prefix_search(self):
+        key = self.make_place("Swimming pool")
+        self.assertEqual(self.index.search("swim"), [])
+        self.assertEqual([k for k, _ in self.index.search("swim",
+                                                          prefix=True)],
+                         [key])
+
+    def test_class_filter_and_limit(self):
+        self.make_place("Quiet place")
+        review = Review()
+        review.text = "Very quiet"
+        self.index.add("Review.1", review)
+
+        self.assertEqual([k for k, _ in self.index.search("quiet",
+                                                          "Review")],
+                         ["Review.1"])
+        self.assertEqual(len(self.index.search("quiet", limit=1)), 1)
+
+    def test_incremental_update_and_remove(self):
+        place = Place()
+        place.name = "Old name"
+        self.index.add("Place.1", place)
+        place.name = "New name"
+        self.index.add("Place.1", place)
+
+        self.assertEqual(self.index.search("old"), [])
+        self.assertEqual(len(self.index.search("new")), 1)
+
+        self.index.remove("Place.1")
+        self.assertEqual(self.index.search("new"), [])
+        self.assertEqual(len(self.index), 0)
+
+    def test_dump_and_load(self):
+        key = self.make_place("Garden flat")
+        self.index.dump(self.test_file)
+
+        loaded = SearchIndex()
+        loaded.load(self.test_file)
+
+        self.assertEqual([k for k, _ in loaded.search("garden")], [key])
+        self.assertEqual(loaded.search("gar", prefix=True),
+                         self.index.search("gar", prefix=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import models
+from models.base_model import BaseModel
+from models.engine.interning import table
+from models.engine.serializers import decoder
+from models.place import Place
+from models.user import User
+
+
+class TestSerializers(unittest.TestCase):
+
+    def setUp(self):
+        models.storage = MagicMock()
+
+    def test_generated_once_per_class(self):
+        self.assertIs(decoder(Place), decoder(Place))
+        self.assertIsNot(decoder(Place), decoder(User))
+
+    def test_subclass_to_dict_is_kept(self):
+        class Tagged(Place):
+            def to_dict(self):
+                return dict(super().to_dict(), tagged=True)
+
+        self.assertTrue(Tagged().to_dict()["tagged"])
+        self.assertEqual(Place().to_dict()["__class__"], "Place")
+
+    def test_decoder_roundtrip(self):
+        place = Place()
+        place.city_id = "city-1"
+        place.price_by_night = 90
+        data = place.to_dict()
+
+        clone = Place.from_dict(data)
+
+        self.assertEqual(clone.__dict__, place.__dict__)
+        self.assertNotIn("__class__", clone.__dict__)
+        self.assertEqual(data["__class__"], "Place")
+        models.storage.new.assert_called_once_with(place)
+
+    def test_decoder_interns_declared_fields(self):
+        city_id = "".join(["c"] * 40)
+        name = "".join(["N", "ice"])
+        description = "d" * 100
+        place = Place.from_dict({"__class__": "Place", "id": "p",
+                                 "city_id": city_id, "name": name,
+                                 "description": description,
+                                 "amenity_ids": ["".join(["a", "1"])]})
+        self.assertIs(place.city_id, table.intern(city_id))
+        self.assertIs(place.name, table.intern(name))
+        self.assertIs(place.amenity_ids[0], table.intern("a1"))
+        self.assertIs(place.description, description)
+
+    def test_decoder_assigns_properties(self):
+        class Priced(Place):
+            @property
+            def price(self):
+                return self.__dict__["price"]
+
+            @price.setter
+            def price(self, value):
+                self.__dict__["price"] = int(value)
+
+        priced = Priced.from_dict({"__class__": "Priced", "id": "p",
+                                   "price": "90"})
+        self.assertEqual(priced.price, 90)
+        place = Place.from_dict({"__class__": "Place", "id": "p",
+                                 "reviews": 1})
+        self.assertNotIn("reviews", place.__dict__)
+
+    def test_decoder_without_timestamps(self):
+        model = BaseModel.from_dict({"__class__": "BaseModel", "id": "1"})
+        self.assertEqual(model.__dict__, {"id": "1"})
+
+
+if __name__ == '__main__':
+    unittest.main()
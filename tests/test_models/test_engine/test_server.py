@@ -0,0 +1,152 @@
+#!/usr/bin/python3
+
+import io
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+import models
+from models.engine.client_storage import ClientStorage
+from models.engine.file_storage import FileStorage
+from models.engine.protocol import HEADER, ProtocolError, pack, \
+    read_message
+from models.engine.query import QueryError
+from models.engine.server import StorageServer
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.city import City
+
+
+class TestProtocol(unittest.TestCase):
+
+    def test_round_trip(self):
+        stream = io.BytesIO(pack(7, 3, ["User.1", True]) + pack(8, 1, None))
+        self.assertEqual(read_message(stream), (7, 3, ["User.1", True]))
+        self.assertEqual(read_message(stream), (8, 1, None))
+        self.assertIsNone(read_message(stream))
+
+    def test_truncated(self):
+        message = pack(1, 1, "pong")
+        with self.assertRaises(ProtocolError):
+            read_message(io.BytesIO(message[:-1]))
+        with self.assertRaises(ProtocolError):
+            read_message(io.BytesIO(message[:HEADER.size - 1]))
+
+
+class TestStorageServer(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.file_storage = FileStorage()
+        self.file_storage._FileStorage__objects = {}
+        self.file_storage._FileStorage__file_path = os.path.join(
+            self.directory, "file.json")
+        self.server = StorageServer(os.path.join(self.directory, "sock"),
+                                    self.file_storage)
+        self.thread = threading.Thread(target=self.server.serve_forever,
+                                       args=(0.05,))
+        self.thread.start()
+        self.storage = ClientStorage(self.server.server_address)
+        patcher = patch.object(models, "storage", self.storage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.storage.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        shutil.rmtree(self.directory)
+
+    def test_new_all_and_save(self):
+        place = Place(name="Loft", price_by_night=80)
+        place.save()
+
+        self.assertTrue(self.storage.ping())
+        self.assertIn(f"Place.{place.id}", self.file_storage.all())
+        copy = self.storage.all()[f"Place.{place.id}"]
+        self.assertIsNot(copy, place)
+        self.assertEqual(copy.to_dict(), place.to_dict())
+        self.assertTrue(os.path.exists(
+            self.file_storage._FileStorage__file_path))
+
+    def test_queries_and_relations(self):
+        state = State(name="CA")
+        city = City(name="SF", state_id=state.id)
+        place = Place(name="Loft", city_id=city.id, price_by_night=80)
+        Review(place_id=place.id, text="sunny loft")
+
+        self.assertEqual([c.id for c in state.cities], [city.id])
+        self.assertEqual([p.id for p in self.storage.query(
+            "Place where price_by_night < 100")], [place.id])
+        self.assertEqual(self.storage.explain("Place")["access"],
+                         "class partition")
+        self.assertEqual(len(self.storage.search("sunny")), 1)
+        (top, count), = self.storage.top("Place", "reviews")
+        self.assertEqual((top.id, count), (place.id, 1))
+
+    def test_perf_report(self):
+        Place().save()
+        report = self.storage.perf_report()
+        self.assertEqual(report["operations"]["storage.save"]["count"], 1)
+        self.assertEqual(report["objects"], {"Place": 1})
+
+    def test_delete_cascade(self):
+        state = State()
+        City(state_id=state.id)
+        removed = self.storage.delete(state, cascade=True)
+        self.assertEqual(len(removed), 2)
+        self.assertEqual(self.file_storage.all(), {})
+
+    def test_errors_are_raised_locally(self):
+        with self.assertRaises(QueryError):
+            self.storage.query("Place where")
+        with self.assertRaises(AttributeError):
+            self.storage.top("Place", "owners")
+        self.assertTrue(self.storage.ping())
+
+    def test_pipeline(self):
+        now = "2024-01-01T00:00:00"
+        places = [Place.from_dict({"id": str(i), "created_at": now,
+                                   "updated_at": now})
+                  for i in range(3)]
+        with self.storage.pipeline() as pipe:
+            for place in places:
+                pipe.new(place)
+            pipe.call("version")
+        self.assertEqual(pipe.results[:3], [None] * 3)
+        self.assertEqual(len(self.file_storage.all()), 3)
+
+    def test_get_many(self):
+        places = [Place(name=str(i)) for i in range(3)]
+        keys = [f"Place.{place.id}" for place in places] + ["Place.none"]
+        found = self.storage.get_many(keys)
+        self.assertEqual(list(found), keys[:3])
+        self.assertEqual([obj.name for obj in found.values()],
+                         ["0", "1", "2"])
+
+    def test_pool_is_shared_by_threads(self):
+        errors = []
+
+        def work():
+            try:
+                for _ in range(20):
+                    Place()
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(self.file_storage.all()), 160)
+
+
+if __name__ == "__main__":
+    unittest.main()
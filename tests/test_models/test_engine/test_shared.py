@@ -0,0 +1,76 @@
+#!/usr/bin/python3
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+import models
+from models.engine.file_storage import FileStorage
+from models.engine.shared import SharedSnapshot, write_snapshot
+from models.city import City
+from models.place import Place
+
+
+class TestSharedSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        models.storage = MagicMock()
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "snapshot.bin")
+        self.places = [Place(name=f"p{i}", price_by_night=i)
+                       for i in range(5)]
+        self.city = City(name="SF")
+        self.objects = {f"Place.{p.id}": p for p in self.places}
+        self.objects[f"City.{self.city.id}"] = self.city
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_lookup_and_prefix_scan(self):
+        self.assertEqual(write_snapshot(self.objects, self.path), 1)
+        with SharedSnapshot(self.path) as snapshot:
+            self.assertEqual(len(snapshot), 6)
+            place = snapshot.get(f"Place.{self.places[2].id}")
+            self.assertIsInstance(place, Place)
+            self.assertEqual(place.to_dict(), self.places[2].to_dict())
+            self.assertIsNone(snapshot.get("Place.missing"))
+            self.assertNotIn("City.missing", snapshot)
+            self.assertEqual(list(snapshot.keys("City.")),
+                             [f"City.{self.city.id}"])
+            names = sorted(obj.name for _, obj in snapshot.items("Place."))
+            self.assertEqual(names, [f"p{i}" for i in range(5)])
+
+    def test_refresh_maps_new_generation(self):
+        write_snapshot(self.objects, self.path)
+        snapshot = SharedSnapshot(self.path)
+        self.assertFalse(snapshot.refresh())
+
+        del self.objects[f"City.{self.city.id}"]
+        self.assertEqual(write_snapshot(self.objects, self.path), 2)
+        self.assertIn(f"City.{self.city.id}", snapshot)
+        self.assertTrue(snapshot.refresh())
+        self.assertEqual(snapshot.generation, 2)
+        self.assertNotIn(f"City.{self.city.id}", snapshot)
+        snapshot.close()
+
+    def test_storage_publish_to_other_process(self):
+        storage = FileStorage()
+        storage._FileStorage__objects = dict(self.objects)
+        storage.publish(self.path)
+        key = f"Place.{self.places[0].id}"
+        code = ("import sys\n"
+                "from models.engine.shared import SharedSnapshot\n"
+                "print(SharedSnapshot(sys.argv[1]).get(sys.argv[2]).name)\n")
+        root = os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__)))))
+        result = subprocess.run([sys.executable, "-c", code, self.path, key],
+                                cwd=root, capture_output=True, text=True)
+        self.assertEqual(result.stdout.strip(), "p0", result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
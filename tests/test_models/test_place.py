@@ -5,7 +5,10 @@ from unittest.mock import MagicMock
 import uuid
 from datetime import datetime
 import models
+from models.amenity import Amenity
+from models.engine.file_storage import FileStorage
 from models.place import Place
+from models.review import Review
 from models.base_model import BaseModel
 
 
@@ -181,6 +184,20 @@ class TestPlace(unittest.TestCase):
         self.assertIn("pool", place.amenity_ids)
         self.assertIn("gym", place.amenity_ids)
 
+    def test_relationship_properties(self):
+        models.storage = FileStorage()
+        models.storage._FileStorage__objects = {}
+        wifi = Amenity()
+        place = Place()
+        place.amenity_ids = [wifi.id]
+        review = Review()
+        review.place_id = place.id
+        models.storage.new(review)
+
+        self.assertEqual(place.reviews, [review])
+        self.assertEqual(place.amenities, [wifi])
+        self.assertNotIn('reviews', place.to_dict())
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -5,6 +5,8 @@ from unittest.mock import MagicMock
 import uuid
 from datetime import datetime
 import models
+from models.city import City
+from models.engine.file_storage import FileStorage
 from models.state import State
 from models.base_model import BaseModel
 
@@ -75,6 +77,17 @@ class TestState(unittest.TestCase):
 
         self.assertEqual(state.name, "New York")
 
+    def test_cities_property(self):
+        models.storage = FileStorage()
+        models.storage._FileStorage__objects = {}
+        state = State()
+        city = City()
+        city.state_id = state.id
+        models.storage.new(city)
+        City().state_id = "elsewhere"
+
+        self.assertEqual(state.cities, [city])
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,128 @@
+#!/usr/bin/python3
+
+import gzip
+import os
+import re
+import shutil
+import tempfile
+import unittest
+
+from web_static.assets import Pipeline, minify_css
+
+PAGE = """<html>
+<head>
+    <link rel="stylesheet" href="styles/{0}-common.css">
+    <link rel="stylesheet" href="styles/{0}-header.css">
+    <link rel="stylesheet" href="https://example.com/font.css">
+</head>
+<body></body>
+</html>
+"""
+
+
+class TestMinify(unittest.TestCase):
+
+    def test_minify_css(self):
+        css = """/* header */
+header  h1 > a ,
+p::after {
+    color : #222222; /* contrast */
+    content: "a  ;}  b";
+    margin: 0 auto !important;
+}
+
+@media (max-width: 800px) and (min-width: 100px) {
+    a:hover { width: calc(100% - 2px); }
+}
+"""
+        self.assertEqual(
+            minify_css(css),
+            'header h1>a,p::after{color :#222222;content:"a  ;}  b";'
+            'margin:0 auto!important}@media (max-width:800px) and '
+            '(min-width:100px){a:hover{width:calc(100% - 2px)}}')
+
+
+class TestPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.source = tempfile.mkdtemp()
+        self.output = os.path.join(self.source, "public")
+        os.makedirs(os.path.join(self.source, "styles"))
+        os.makedirs(os.path.join(self.source, "images"))
+        self.write("1-index.html", PAGE.format(1))
+        self.write("2-index.html", PAGE.format(1))
+        self.write("3-index.html", PAGE.format(3))
+        for n in (1, 3):
+            self.write(f"styles/{n}-common.css", "body { margin: 0; }\n")
+            self.write(f"styles/{n}-header.css",
+                       '.logo { background: url("../images/icon.png"); }')
+        self.write("images/icon.png", "png")
+
+    def tearDown(self):
+        shutil.rmtree(self.source)
+
+    def write(self, name, text):
+        with open(os.path.join(self.source, name), "w") as f:
+            f.write(text)
+
+    def read(self, name):
+        with open(os.path.join(self.output, name)) as f:
+            return f.read()
+
+    def bundle(self, page):
+        return re.search(r'href="assets/(bundle-\w+\.css)"',
+                         self.read(page)).group(1)
+
+    def test_build(self):
+        result = Pipeline(self.source, self.output).build()
+        page = self.read("1-index.html")
+        self.assertEqual(page.count('rel="stylesheet"'), 2)
+        self.assertIn('href="https://example.com/font.css"', page)
+        bundle = self.bundle("1-index.html")
+        self.assertEqual(bundle, self.bundle("3-index.html"))
+        css = self.read(f"assets/{bundle}")
+        icon = re.search(r'url\("(icon-\w+\.png)"\)', css).group(1)
+        self.assertEqual(css, 'body{margin:0}.logo{background:url("'
+                         f'{icon}")}}')
+        self.assertEqual(self.read(f"assets/{icon}"), "png")
+        with gzip.open(os.path.join(self.output, "assets",
+                                    bundle + ".gz"), "rt") as f:
+            self.assertEqual(f.read(), css)
+        self.assertTrue(os.path.exists(os.path.join(self.output,
+                                                    "1-index.html.gz")))
+        self.assertEqual(result["written"].count(f"assets/{bundle}"), 1)
+
+    def test_rebuilds_only_changed_outputs(self):
+        Pipeline(self.source, self.output).build()
+        old = self.bundle("3-index.html")
+        self.assertEqual(Pipeline(self.source, self.output).build(),
+                         {"written": [], "unchanged": 3, "removed": []})
+
+        self.write("styles/3-common.css", "body { margin: 1px; }")
+        result = Pipeline(self.source, self.output).build()
+        new = self.bundle("3-index.html")
+        self.assertEqual(result["written"], [f"assets/{new}",
+                                             "3-index.html"])
+        self.assertEqual(result["removed"], [])
+        self.assertEqual(self.bundle("1-index.html"), old)
+
+        os.remove(os.path.join(self.source, "1-index.html"))
+        os.remove(os.path.join(self.source, "2-index.html"))
+        result = Pipeline(self.source, self.output).build()
+        self.assertEqual(result["removed"], ["1-index.html", "2-index.html",
+                                             f"assets/{old}"])
+        self.assertFalse(os.path.exists(os.path.join(
+            self.output, "assets", old + ".gz")))
+
+    def test_changed_image_gets_new_name(self):
+        Pipeline(self.source, self.output).build()
+        css = self.read(f"assets/{self.bundle('1-index.html')}")
+        self.write("images/icon.png", "new png")
+        result = Pipeline(self.source, self.output).build()
+        new_css = self.read(f"assets/{self.bundle('1-index.html')}")
+        self.assertNotEqual(css, new_css)
+        self.assertEqual(len(result["removed"]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
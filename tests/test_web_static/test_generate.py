@@ -0,0 +1,124 @@
+#!/usr/bin/python3
+
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+import models
+from models.engine.file_storage import FileStorage
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+from web_static import generate
+from web_static.generate import build, long_date
+
+
+class TestGenerate(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.output = os.path.join(self.directory, "site")
+        self.storage = FileStorage()
+        self.storage._FileStorage__objects = {}
+        self.storage._FileStorage__file_path = os.path.join(
+            self.directory, "file.json")
+        patcher = patch.object(models, "storage", self.storage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        state = State(name="Kigali")
+        City(name="Niboye", state_id=state.id)
+        self.tv = Amenity(name="TV")
+        self.user = User(first_name="John", last_name="Doe")
+        self.places = [Place(name=f"Place <{i}>", price_by_night=i,
+                             max_guest=1, user_id=self.user.id,
+                             amenity_ids=[self.tv.id])
+                       for i in range(5)]
+        Review(place_id=self.places[0].id, user_id=self.user.id,
+               text="Great & quiet")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def read(self, name):
+        with open(os.path.join(self.output, name), encoding="utf-8") as f:
+            return f.read()
+
+    def test_renders_pages_from_storage(self):
+        result = build(self.output, self.storage, page_size=2)
+        self.assertEqual(result["rendered"],
+                         ["index.html", "page-2.html", "page-3.html"])
+        page = self.read("index.html")
+        self.assertIn("<h3>Kigali</h3>", page)
+        self.assertIn('<li role="menuitem">Niboye</li>', page)
+        self.assertIn("<h3>Place &lt;0&gt;</h3>", page)
+        self.assertIn("<p>1 Guest</p>", page)
+        self.assertIn("<strong>Owner:</strong> John Doe", page)
+        self.assertIn("📺</span>TV</li>", page)
+        self.assertIn("<p>Great &amp; quiet</p>", page)
+        self.assertIn('<a rel="next" href="page-2.html">', page)
+        self.assertNotIn("Place &lt;2&gt;", page)
+        self.assertIn("Place &lt;4&gt;", self.read("page-3.html"))
+        static = os.path.relpath(generate.ROOT, self.output)
+        self.assertIn(f'href="{static}/styles/103-common.css"', page)
+
+    def test_rebuilds_only_changed_pages(self):
+        build(self.output, self.storage, page_size=2)
+        result = build(self.output, self.storage, page_size=2)
+        self.assertEqual((result["rendered"], result["unchanged"]), ([], 3))
+
+        self.places[3].name = "Renamed"
+        self.storage.new(self.places[3])
+        result = build(self.output, self.storage, page_size=2)
+        self.assertEqual(result["rendered"], ["page-2.html"])
+        self.assertIn("Renamed", self.read("page-2.html"))
+
+        os.remove(os.path.join(self.output, "index.html"))
+        self.storage.delete(self.places[4])
+        result = build(self.output, self.storage, page_size=2)
+        self.assertEqual(result["rendered"], ["index.html", "page-2.html"])
+        self.assertEqual(result["removed"], ["page-3.html"])
+        self.assertFalse(os.path.exists(os.path.join(self.output,
+                                                     "page-3.html")))
+
+        self.tv.name = "Cable TV"
+        self.storage.new(self.tv)
+        result = build(self.output, self.storage, page_size=2)
+        self.assertEqual(len(result["rendered"]), 2)
+
+    def test_parallel_build_matches_serial(self):
+        serial = os.path.join(self.directory, "serial")
+        build(serial, self.storage, page_size=1, workers=1)
+        with patch.object(generate, "PARALLEL_THRESHOLD", 2):
+            result = build(self.output, self.storage, page_size=1,
+                           workers=2)
+        self.assertEqual(len(result["rendered"]), 5)
+        for name in os.listdir(serial):
+            with open(os.path.join(serial, name), encoding="utf-8") as f:
+                self.assertEqual(f.read(), self.read(name))
+
+    def test_non_string_values(self):
+        Place(name=5, description=None, user_id=self.user.id)
+        State(name=7)
+        Amenity(name=None)
+        User(first_name=3, last_name="Roe")
+        build(self.output, self.storage, page_size=10)
+        page = self.read("index.html")
+        self.assertIn("<h3>5</h3>", page)
+        self.assertIn("<h3>7</h3>", page)
+
+    def test_long_date(self):
+        self.assertEqual(long_date(datetime(2017, 1, 27)),
+                         "27th January 2017")
+        self.assertEqual(long_date(datetime(2017, 3, 1)), "1st March 2017")
+        self.assertEqual(long_date(datetime(2017, 3, 12)), "12th March 2017")
+        self.assertEqual(long_date(datetime(2017, 3, 22)), "22nd March 2017")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,5 @@
+#!/usr/bin/python3
+"""
+Web static package
+Static pages of the AirBnB clone and their generator
+"""
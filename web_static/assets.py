@@ -0,0 +1,273 @@
+#!/usr/bin/python3
+"""
+Assets module
+Bundles, minifies, fingerprints and precompresses the pages' stylesheets
+
+Usage: python3 -m web_static.assets [source_directory] [output_directory]
+
+The stylesheets linked by each page of source are concatenated in
+order into one minified bundle named after its content hash (e.g.
+assets/bundle-3f2a9c1e7b04.css), and the page is rewritten to link
+only that bundle. Images referenced with url() are copied under
+fingerprinted names too, so every asset can be cached forever. CSS and
+HTML outputs get a gzip-compressed .gz twin. The manifest records the
+hash of each page's inputs, so unchanged pages and bundles are not
+built again.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ASSETS = "assets"
+MANIFEST = "assets.json"
+VERSION = "1"
+LINK = re.compile(r'[ \t]*<link\b[^>]*\brel=["\']stylesheet["\'][^>]*>'
+                  r'[ \t]*\n?', re.I)
+HREF = re.compile(r'\bhref=["\']([^"\']+)["\']', re.I)
+URL = re.compile(r'url\(\s*(["\']?)([^"\')]+)\1\s*\)')
+CSS_TOKENS = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')'
+                        r'|(/\*.*?\*/|\s+)|([^"\'/\s]+|/)', re.S)
+COMPRESSED = (".css", ".html", ".svg", ".js")
+
+
+def minify_css(text):
+    """Return text without comments and needless whitespace"""
+    out = []
+    space = False
+    for string, blank, other in CSS_TOKENS.findall(text):
+        if blank:
+            space = True
+            continue
+        token = string or other.replace(";}", "}")
+        if out and token[0] == "}" and out[-1].endswith(";") and \
+                not string:
+            out[-1] = out[-1][:-1]
+        if space and out and out[-1][-1] not in "{};,:>(" and \
+                token[0] not in "{};,>!)":
+            out.append(" ")
+        space = False
+        out.append(token)
+    return "".join(out)
+
+
+def fingerprint(name, data, length=12):
+    """Return name with the content hash of data before its extension"""
+    stem, ext = os.path.splitext(os.path.basename(name))
+    return f"{stem}-{hashlib.sha256(data).hexdigest()[:length]}{ext}"
+
+
+def is_local(url):
+    """Return True if url is a relative reference to a file"""
+    return not re.match(r"^([a-z][a-z0-9+.-]*:|/|#)", url, re.I)
+
+
+class Pipeline:
+    """Builds the assets of the pages of source into output"""
+
+    def __init__(self, source=ROOT, output=None):
+        """Initialize a pipeline writing into output (source/public by
+        default)
+        """
+        self.source = os.path.abspath(source)
+        self.output = os.path.abspath(output or
+                                      os.path.join(self.source, "public"))
+        self.__manifest = self.__load_manifest()
+        self.__written = []
+
+    def __load_manifest(self):
+        """Return the manifest of the last build"""
+        try:
+            with open(os.path.join(self.output, MANIFEST), "r") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+        if manifest.get("version") != VERSION:
+            manifest = {}
+        manifest.setdefault("pages", {})
+        manifest.setdefault("bundles", {})
+        return manifest
+
+    def build(self):
+        """Build every page and return the {"written", "unchanged",
+        "removed"} output file names
+        """
+        pages = {}
+        bundles = {}
+        unchanged = 0
+        for name in sorted(os.listdir(self.source)):
+            if not name.endswith(".html"):
+                continue
+            with open(os.path.join(self.source, name), "rb") as f:
+                html = f.read().decode("utf-8")
+            bundle = self.__bundle(name, html, bundles)
+            key = hashlib.sha256(
+                f"{VERSION}\0{bundle}\0{html}".encode("utf-8")).hexdigest()
+            pages[name] = key
+            path = os.path.join(self.output, name)
+            if self.__manifest["pages"].get(name) == key and \
+                    os.path.exists(path):
+                unchanged += 1
+                continue
+            self.__write(name, self.__rewrite(html, bundle).encode("utf-8"))
+        removed = self.__clean(pages, bundles)
+        self.__manifest = {"version": VERSION, "pages": pages,
+                           "bundles": bundles}
+        with open(os.path.join(self.output, MANIFEST), "w") as f:
+            json.dump(self.__manifest, f, indent=1, sort_keys=True)
+        return {"written": self.__written, "unchanged": unchanged,
+                "removed": removed}
+
+    def __stylesheets(self, page, html):
+        """Return the paths of the local stylesheets html links, in
+        order
+        """
+        paths = []
+        for tag in LINK.findall(html):
+            href = HREF.search(tag)
+            if href is not None and is_local(href.group(1)):
+                paths.append(os.path.normpath(os.path.join(
+                    self.source, os.path.dirname(page), href.group(1))))
+        return paths
+
+    def __bundle(self, page, html, bundles):
+        """Return the file name (under assets/) of the bundle of page's
+        stylesheets, building it unless an identical one exists
+        """
+        paths = self.__stylesheets(page, html)
+        if not paths:
+            return None
+        sources = []
+        for path in paths:
+            with open(path, "rb") as f:
+                sources.append((path, f.read().decode("utf-8")))
+        key = hashlib.sha256(VERSION.encode("utf-8"))
+        for path, text in sources:
+            key.update(text.encode("utf-8") + b"\0")
+            for match in URL.finditer(text):
+                data = self.__read(path, match.group(2))
+                if data is not None:
+                    key.update(hashlib.sha256(data).digest())
+        key = key.hexdigest()
+        entry = bundles.get(key) or self.__manifest["bundles"].get(key)
+        if entry is not None and all(
+                os.path.exists(os.path.join(self.output, ASSETS, name))
+                for name in [entry["file"], entry["file"] + ".gz"] +
+                entry["images"]):
+            bundles[key] = entry
+            return entry["file"]
+        images = []
+        css = minify_css("\n".join(self.__rebase(path, text, images)
+                                   for path, text in sources))
+        data = css.encode("utf-8")
+        name = fingerprint("bundle.css", data)
+        self.__write(f"{ASSETS}/{name}", data)
+        bundles[key] = {"file": name, "images": sorted(set(images))}
+        return name
+
+    def __rebase(self, path, text, images):
+        """Return the CSS text of path with its url() references
+        pointing at fingerprinted copies next to the bundle, adding
+        their names to images
+        """
+        def replace(match):
+            """Return the url() of the fingerprinted copy"""
+            data = self.__read(path, match.group(2))
+            if data is None:
+                return match.group(0)
+            name = fingerprint(match.group(2).split("?")[0], data)
+            if not os.path.exists(os.path.join(self.output, ASSETS, name)):
+                self.__write(f"{ASSETS}/{name}", data)
+            images.append(name)
+            return f'url("{name}")'
+        return URL.sub(replace, text)
+
+    @staticmethod
+    def __read(path, url):
+        """Return the content of the local file url refers to from the
+        stylesheet at path, or None
+        """
+        url = url.strip()
+        if not is_local(url):
+            return None
+        target = os.path.join(os.path.dirname(path), url.split("?")[0])
+        try:
+            with open(target, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def __rewrite(self, html, bundle):
+        """Return html linking bundle instead of its stylesheets"""
+        if bundle is None:
+            return html
+        state = {"first": True}
+
+        def replace(match):
+            """Keep the first local stylesheet link, pointing at bundle"""
+            href = HREF.search(match.group(0))
+            if href is None or not is_local(href.group(1)):
+                return match.group(0)
+            if not state["first"]:
+                return ""
+            state["first"] = False
+            return match.group(0).replace(href.group(0),
+                                          f'href="{ASSETS}/{bundle}"')
+        return LINK.sub(replace, html)
+
+    def __write(self, name, data):
+        """Write an output file (and its .gz twin) atomically"""
+        path = os.path.join(self.output, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        outputs = [(path, data)]
+        if name.endswith(COMPRESSED):
+            outputs.append((path + ".gz", gzip.compress(data, 9, mtime=0)))
+        for target, content in outputs:
+            tmp_path = f"{target}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, target)
+        self.__written.append(name)
+
+    def __clean(self, pages, bundles):
+        """Remove the pages and assets of earlier builds that are no
+        longer produced
+        """
+        keep = set(pages)
+        for entry in bundles.values():
+            keep.update(f"{ASSETS}/{name}"
+                        for name in [entry["file"]] + entry["images"])
+        removed = []
+        stale = [name for name in self.__manifest["pages"]
+                 if name not in keep]
+        directory = os.path.join(self.output, ASSETS)
+        if os.path.isdir(directory):
+            stale.extend(f"{ASSETS}/{name}" for name in os.listdir(directory)
+                         if not name.endswith(".gz") and
+                         f"{ASSETS}/{name}" not in keep)
+        for name in sorted(stale):
+            for path in (os.path.join(self.output, name),
+                         os.path.join(self.output, name) + ".gz"):
+                if os.path.exists(path):
+                    os.remove(path)
+            removed.append(name)
+        return removed
+
+
+def main(argv):
+    """Build the assets and print what was written"""
+    source = argv[0] if argv else ROOT
+    output = argv[1] if len(argv) > 1 else None
+    pipeline = Pipeline(source, output)
+    result = pipeline.build()
+    print(f"{len(result['written'])} written, "
+          f"{result['unchanged']} unchanged, "
+          f"{len(result['removed'])} removed in {pipeline.output}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
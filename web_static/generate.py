@@ -0,0 +1,294 @@
+#!/usr/bin/python3
+"""
+Generate module
+Renders the places pages of web_static from models.storage
+
+Usage: python3 -m web_static.generate [output_directory] [--force]
+
+Each page (index.html, page-2.html, ...) shows the States/Cities and
+Amenities filters and one page of Place cards, oldest first, linked to
+the previous and next pages: editing a place only changes its own
+page, and a new place only the last ones. The data of a page is
+hashed together with the templates, and the hashes are kept in a
+manifest: a build only renders the pages whose hash changed, in
+parallel worker processes that each compile the templates once.
+"""
+
+import hashlib
+import html
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from string import Template
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+TEMPLATES = os.path.join(ROOT, "templates")
+MANIFEST = "manifest.json"
+PAGE_SIZE = 24
+PARALLEL_THRESHOLD = 8
+EMOJIS = {
+    "TV": "📺",
+    "WiFi": "📡",
+    "Pet friendly": "🐶",
+    "Swimming pool": "🏊‍♂️",
+}
+
+_templates = None
+
+
+def load_templates(directory=TEMPLATES):
+    """Return the compiled templates of directory, by name"""
+    templates = {}
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".html"):
+            with open(os.path.join(directory, name), "r") as f:
+                templates[name[:-5]] = Template(f.read().rstrip("\n"))
+    return templates
+
+
+def templates_digest(directory=TEMPLATES):
+    """Return a hash of every template of directory"""
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".html"):
+            digest.update(name.encode("utf-8"))
+            with open(os.path.join(directory, name), "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+def page_name(number):
+    """Return the file name of page number"""
+    return "index.html" if number == 1 else f"page-{number}.html"
+
+
+def plural(count, word):
+    """Return "<count> <word>" with word in the plural unless count is 1"""
+    return f"{count} {word}" if count == 1 else f"{count} {word}s"
+
+
+def long_date(moment):
+    """Return moment as e.g. "27th January 2017" """
+    day = moment.day
+    suffix = "th" if 11 <= day <= 13 else \
+        {1: "st", 2: "nd", 3: "rd"}.get(day % 10, "th")
+    return f"{day}{suffix} {moment:%B %Y}"
+
+
+def summary(names, count=2):
+    """Return the first count names followed by an ellipsis"""
+    text = ", ".join(names[:count])
+    return text + " ..." if len(names) > count else text
+
+
+def text(value):
+    """Return value as displayed text: None is empty, anything else
+    goes through str() (the API stores whatever JSON it is given)
+    """
+    return "" if value is None else str(value)
+
+
+def escape(value):
+    """Return value as HTML-escaped text"""
+    return html.escape(text(value))
+
+
+def full_name(user):
+    """Return the displayed name of a User, or an empty string"""
+    if user is None:
+        return ""
+    return " ".join(text(n) for n in (user.first_name, user.last_name)
+                    if n)
+
+
+def collect(objects):
+    """Return the stored objects grouped by class name"""
+    groups = {}
+    for key, obj in objects.items():
+        groups.setdefault(key.split(".", 1)[0], []).append(obj)
+    return groups
+
+
+def page_contexts(objects, page_size=PAGE_SIZE, static="../"):
+    """Return (file name, context) for every page of objects
+
+    A context holds only the plain values a page shows, so it can be
+    hashed and sent to a worker process.
+    """
+    groups = collect(objects)
+    cities = {}
+    for city in groups.get("City", ()):
+        cities.setdefault(city.state_id, []).append(text(city.name))
+    reviews = {}
+    for review in groups.get("Review", ()):
+        reviews.setdefault(review.place_id, []).append(review)
+    users = {user.id: user for user in groups.get("User", ())}
+    amenities = {a.id: text(a.name) for a in groups.get("Amenity", ())}
+    states = sorted(groups.get("State", ()),
+                    key=lambda s: (text(s.name), s.id))
+
+    filters = {
+        "states": [{"name": text(s.name),
+                    "cities": sorted(cities.get(s.id, ()))}
+                   for s in states],
+        "amenities": sorted(amenities.values()),
+    }
+    cards = []
+    places = sorted(groups.get("Place", ()),
+                    key=lambda p: (p.created_at, p.id))
+    for place in places:
+        place_reviews = sorted(reviews.get(place.id, ()),
+                               key=lambda r: r.created_at, reverse=True)
+        cards.append({
+            "name": text(place.name),
+            "price_by_night": place.price_by_night,
+            "max_guest": place.max_guest,
+            "number_rooms": place.number_rooms,
+            "number_bathrooms": place.number_bathrooms,
+            "owner": full_name(users.get(place.user_id)),
+            "description": text(place.description),
+            "amenities": [amenities[a] for a in place.amenity_ids or ()
+                          if a in amenities],
+            "reviews": [{"author": full_name(users.get(r.user_id)),
+                         "date": long_date(r.created_at),
+                         "text": text(r.text)} for r in place_reviews],
+        })
+    count = max(1, -(-len(cards) // page_size))
+    return [(page_name(number), dict(
+        filters, title="AirBnB Clone", static=static,
+        previous=page_name(number - 1) if number > 1 else None,
+        next=page_name(number + 1) if number < count else None,
+        places=cards[(number - 1) * page_size:number * page_size]))
+        for number in range(1, count + 1)]
+
+
+def digest(context, templates_hash):
+    """Return the content hash of a page"""
+    data = json.dumps(context, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256((templates_hash + data).encode("utf-8")) \
+        .hexdigest()
+
+
+def render(context):
+    """Return the HTML of a page context"""
+    global _templates
+    if _templates is None:
+        _templates = load_templates()
+    t = _templates
+    e = escape
+    states = "\n".join(t["state"].substitute(
+        name=e(state["name"]),
+        cities="\n".join(t["city"].substitute(name=e(city))
+                         for city in state["cities"]))
+        for state in context["states"])
+    amenities = "\n".join(t["amenity"].substitute(name=e(name))
+                          for name in context["amenities"])
+    places = "\n".join(t["place"].substitute(
+        name=e(place["name"]),
+        price_by_night=e(place["price_by_night"]),
+        max_guest=plural(place["max_guest"], "Guest"),
+        number_rooms=plural(place["number_rooms"], "Bedroom"),
+        number_bathrooms=plural(place["number_bathrooms"], "Bathroom"),
+        owner=e(place["owner"]),
+        description=e(place["description"]),
+        amenities="\n".join(t["place_amenity"].substitute(
+            emoji=EMOJIS.get(name, ""), name=e(name))
+            for name in place["amenities"]),
+        reviews="\n".join(t["review"].substitute(
+            author=e(review["author"]), date=review["date"],
+            text=e(review["text"]))
+            for review in place["reviews"]))
+        for place in context["places"])
+    links = [t["page_link"].substitute(rel=rel, href=context[name],
+                                       label=label)
+             for name, rel, label in (("previous", "prev", "Previous"),
+                                      ("next", "next", "Next"))
+             if context[name]]
+    pagination = t["pagination"].substitute(links="\n".join(links)) \
+        if links else ""
+    return t["page"].substitute(
+        title=e(context["title"]), static=context["static"],
+        states_summary=e(summary([s["name"] for s in context["states"]])),
+        states=states,
+        amenities_summary=e(summary(context["amenities"])),
+        amenities=amenities, places=places, pagination=pagination)
+
+
+def load_manifest(output):
+    """Return the manifest of the last build in output"""
+    try:
+        with open(os.path.join(output, MANIFEST), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_file(path, text):
+    """Write text to path atomically"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def build(output, storage=None, page_size=PAGE_SIZE, workers=None,
+          force=False):
+    """Render the pages of storage (models.storage by default) into
+    output and return the {"rendered", "unchanged", "removed"} page
+    names
+
+    Only the pages whose content hash differs from the manifest (or
+    whose file is missing) are rendered, unless force is set.
+    """
+    if storage is None:
+        from models import storage
+    os.makedirs(output, exist_ok=True)
+    static = os.path.relpath(ROOT, os.path.abspath(output))
+    static = "" if static == "." else static.replace(os.sep, "/") + "/"
+    with storage.snapshot() as objects:
+        contexts = page_contexts(objects, page_size, static)
+    templates_hash = templates_digest()
+    previous = load_manifest(output).get("pages", {})
+    hashes = {}
+    pending = []
+    for name, context in contexts:
+        hashes[name] = digest(context, templates_hash)
+        if force or previous.get(name) != hashes[name] or \
+                not os.path.exists(os.path.join(output, name)):
+            pending.append((name, context))
+    if len(pending) >= PARALLEL_THRESHOLD and workers != 1:
+        with ProcessPoolExecutor(workers) as pool:
+            pages = list(pool.map(render, [c for _, c in pending],
+                                  chunksize=4))
+    else:
+        pages = [render(context) for _, context in pending]
+    for (name, _), page in zip(pending, pages):
+        write_file(os.path.join(output, name), page)
+    removed = sorted(name for name in previous if name not in hashes)
+    for name in removed:
+        try:
+            os.remove(os.path.join(output, name))
+        except FileNotFoundError:
+            pass
+    write_file(os.path.join(output, MANIFEST),
+               json.dumps({"pages": hashes}, indent=1, sort_keys=True))
+    return {
+        "rendered": [name for name, _ in pending],
+        "unchanged": len(contexts) - len(pending),
+        "removed": removed,
+    }
+
+
+def main(argv):
+    """Build the pages and print what was rendered"""
+    args = [a for a in argv if a != "--force"]
+    output = args[0] if args else os.path.join(ROOT, "dist")
+    result = build(output, force="--force" in argv)
+    print(f"{len(result['rendered'])} rendered, "
+          f"{result['unchanged']} unchanged, "
+          f"{len(result['removed'])} removed in {output}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])